@@ -6,24 +6,47 @@ A comprehensive MCP server for analyzing text documents with sentiment analysis,
 keyword extraction, readability scoring, and document management capabilities.
 """
 
+import argparse
+import asyncio
+import atexit
+import gc
+import hashlib
+import heapq
 import json
+import math
 import os
 import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter, OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from functools import wraps
+from itertools import chain
+from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
 
 # Import analysis libraries
 import nltk
 from textblob import TextBlob
 import textstat
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
 import numpy as np
 import pandas as pd
 
 # Import FastMCP
 from fastmcp import FastMCP
+from fastmcp.server.middleware import Middleware
+
+# Code shared with the other MCP servers in this repository
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "shared"))
+from server_support import (ChangeLog, SingleFlightCache, ToolMetrics, ToolProfiler,
+                            ACTION_CREATED, ACTION_DELETED, ACTION_UPDATED, MAX_PAGE_SIZE, PROFILE_MAX_FILES, PROFILE_SORT_KEYS,
+                            check_fields, check_page, page_info)
 
 # Initialize FastMCP server
 mcp = FastMCP("Document Analyzer 📄")
@@ -35,37 +58,381 @@ documents_data = {}
 # Download required NLTK data
 try:
     nltk.data.find('tokenizers/punkt')
+    nltk.data.find('tokenizers/punkt_tab')
     nltk.data.find('corpora/stopwords')
     nltk.data.find('taggers/averaged_perceptron_tagger')
 except LookupError:
     nltk.download('punkt', quiet=True)
+    nltk.download('punkt_tab', quiet=True)
     nltk.download('stopwords', quiet=True)
     nltk.download('averaged_perceptron_tagger', quiet=True)
 
-def load_documents():
-    """Load documents from JSON file"""
-    global documents_data
+# Fallback sentence splitter when the Punkt model cannot be loaded
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+class NLPResources:
+    """NLP models and word lists, loaded once per process
+    
+    The stop word set, Punkt sentence model, word tokenizer and sentiment
+    lexicon are loaded at startup (before serve_workers forks, so workers
+    share them copy-on-write) instead of on every call. Load times and
+    errors are kept for get_server_metrics; a resource that fails to load
+    falls back to a simpler stand-in where there is one.
+    """
+    
+    def __init__(self):
+        self.stop_words: frozenset = ENGLISH_STOP_WORDS
+        self.sentence_tokenizer = None
+        self.word_tokenizer = None
+        self.sentiment_analyzer = None
+        self.load_seconds: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.loaded = False
+        self._lock = threading.Lock()
+    
+    def _load(self, name: str, loader):
+        started = time.perf_counter()
+        try:
+            loader()
+        except Exception as e:
+            # NLTK wraps its messages in banners of asterisks
+            lines = [line.strip() for line in str(e).splitlines() if any(c.isalnum() for c in line)]
+            self.errors[name] = lines[0] if lines else type(e).__name__
+        self.load_seconds[name] = time.perf_counter() - started
+    
+    def load(self):
+        """Load every resource (once)"""
+        with self._lock:
+            if self.loaded:
+                return
+            self._load("stopwords", self._load_stop_words)
+            self._load("punkt", self._load_sentence_tokenizer)
+            self._load("word_tokenizer", self._load_word_tokenizer)
+            self._load("sentiment_lexicon", self._load_sentiment_analyzer)
+            self.loaded = True
+    
+    def _load_stop_words(self):
+        self.stop_words = frozenset(nltk.corpus.stopwords.words('english'))
+    
+    def _load_sentence_tokenizer(self):
+        try:
+            from nltk.tokenize import PunktTokenizer
+        except ImportError:
+            # NLTK < 3.9 ships the pickled model
+            self.sentence_tokenizer = nltk.data.load('tokenizers/punkt/english.pickle')
+        else:
+            self.sentence_tokenizer = PunktTokenizer('english')
+    
+    def _load_word_tokenizer(self):
+        from nltk.tokenize import NLTKWordTokenizer
+        self.word_tokenizer = NLTKWordTokenizer()
+    
+    def _load_sentiment_analyzer(self):
+        from textblob.sentiments import PatternAnalyzer
+        analyzer = PatternAnalyzer()
+        # The lexicon loads on first use
+        analyzer.analyze("good")
+        self.sentiment_analyzer = analyzer
+    
+    def sentences(self, text: str) -> List[str]:
+        if not self.loaded:
+            self.load()
+        if self.sentence_tokenizer is None:
+            return [sentence for sentence in SENTENCE_PATTERN.split(text.strip()) if sentence]
+        return self.sentence_tokenizer.tokenize(text)
+    
+    def words(self, text: str, sentences: Optional[List[str]] = None) -> List[str]:
+        """Word tokens as nltk.word_tokenize splits them (pass sentences if already split)"""
+        if sentences is None:
+            sentences = self.sentences(text)
+        return [token for sentence in sentences for token in self.word_tokenizer.tokenize(sentence)]
+    
+    def sentiment(self, text: str) -> Tuple[float, float]:
+        """(polarity, subjectivity) as TextBlob(text).sentiment computes them"""
+        if not self.loaded:
+            self.load()
+        if self.sentiment_analyzer is None:
+            return TextBlob(text).sentiment
+        polarity, subjectivity = self.sentiment_analyzer.analyze(text)
+        return polarity, subjectivity
+
+nlp = NLPResources()
+
+# zlib uses at most the last 32 KiB of a preset dictionary
+CONTENT_DICTIONARY_SIZE = 32 * 1024
+# Documents sampled to train the dictionary
+CONTENT_TRAINING_DOCS = 2000
+CONTENT_COMPRESSION_LEVEL = 6
+# Longer bodies are compressed in blocks of this many bytes, each on its own,
+# so a snippet decompresses only the blocks under its window
+CONTENT_BLOCK_SIZE = 16 * 1024
+# Decompressed bodies kept for analysis and snippets
+CONTENT_CACHE_SIZE = 64
+# Rewrite the store once dropped bodies take this many bytes and this share of its file
+CONTENT_COMPACTION_MIN_BYTES = 64 * 1024
+CONTENT_COMPACTION_RATIO = 0.5
+# A word with the punctuation and space that follow it
+CONTENT_PIECE_PATTERN = re.compile(r"\w+\W*")
+
+def train_dictionary(texts: List[str], size: int = CONTENT_DICTIONARY_SIZE) -> bytes:
+    """Preset zlib dictionary of the corpus's most valuable recurring pieces
+    
+    Pieces are scored by occurrences times length; the best go last, where
+    zlib reaches them at the shortest distances.
+    """
+    sample = texts[::max(1, len(texts) // CONTENT_TRAINING_DOCS)]
+    counts = Counter(piece for text in sample for piece in CONTENT_PIECE_PATTERN.findall(text))
+    chosen, total = [], 0
+    for piece, count in sorted(counts.items(), key=lambda item: item[1] * len(item[0]), reverse=True):
+        if count < 2:
+            continue
+        encoded = piece.encode("utf-8")
+        if total + len(encoded) > size:
+            break
+        chosen.append(encoded)
+        total += len(encoded)
+    return b"".join(reversed(chosen))
+
+def content_digest(raw: bytes) -> bytes:
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+class StoredContent:
+    """Handle to a compressed document body (see document_content)"""
+    __slots__ = ("store", "offset", "length", "size", "digest", "blocks")
+    
+    def __init__(self, store: "ContentStore", offset: int, length: int, size: int, digest: bytes,
+                 blocks: Optional[array] = None):
+        self.store = store
+        self.offset = offset
+        self.length = length
+        # Of the uncompressed text: its UTF-8 size, and a digest to tell
+        # whether a reloaded body changed
+        self.size = size
+        self.digest = digest
+        # Compressed end offset of each CONTENT_BLOCK_SIZE block, for bodies
+        # longer than one block (None: compressed whole)
+        self.blocks = blocks
+
+class ContentStore:
+    """Document bodies compressed with a shared dictionary, in an unlinked temporary file
+    
+    Stored documents hold a StoredContent handle instead of their content
+    string; bodies are read back by offset. The file is append-only, so
+    handles stay valid for as long as they are referenced, and forked
+    workers read it positionally without sharing a file offset. Bodies
+    of replaced and deleted documents are reclaimed by rewriting the live
+    ones into a new store (see maybe_compact_content).
+    
+    With a path, the file is a named one that several processes open: that
+    of a published generation (see publish_shared_state).
+    """
+    
+    def __init__(self, texts: List[str], dictionary: Optional[bytes] = None, path: Optional[Path] = None):
+        self.dictionary = train_dictionary(texts) if dictionary is None else dictionary
+        self.path = path
+        if path is None:
+            self.file = tempfile.TemporaryFile(buffering=0)
+        else:
+            self.file = open(os.open(path, os.O_RDWR | os.O_CREAT), "r+b", buffering=0)
+        # Everything written, including bodies no document uses any more
+        self.file_bytes = os.fstat(self.file.fileno()).st_size
+        # Bodies of registered documents (see retain)
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self._lock = threading.Lock()
+    
+    def put(self, text: str) -> StoredContent:
+        raw = text.encode("utf-8")
+        if len(raw) <= CONTENT_BLOCK_SIZE:
+            return self._append(self._compress(raw), len(raw), content_digest(raw))
+        pieces = [self._compress(raw[i:i + CONTENT_BLOCK_SIZE]) for i in range(0, len(raw), CONTENT_BLOCK_SIZE)]
+        blocks = array('I')
+        for piece in pieces:
+            blocks.append((blocks[-1] if blocks else 0) + len(piece))
+        return self._append(b"".join(pieces), len(raw), content_digest(raw), blocks)
+    
+    def _compress(self, raw: bytes) -> bytes:
+        compressor = zlib.compressobj(CONTENT_COMPRESSION_LEVEL, zdict=self.dictionary)
+        return compressor.compress(raw) + compressor.flush()
+    
+    def _decompress(self, data: bytes) -> bytes:
+        decompressor = zlib.decompressobj(zdict=self.dictionary)
+        return decompressor.decompress(data) + decompressor.flush()
+    
+    def copy(self, content: StoredContent) -> StoredContent:
+        """The same body in this store, which must share content's dictionary"""
+        return self._append(self._read_bytes(content), content.size, content.digest, content.blocks)
+    
+    def _append(self, data: bytes, size: int, digest: bytes, blocks: Optional[array] = None) -> StoredContent:
+        with self._lock:
+            offset = self.file_bytes
+            if hasattr(os, "pwrite"):
+                os.pwrite(self.file.fileno(), data, offset)
+            else:
+                self.file.seek(offset)
+                self.file.write(data)
+            self.file_bytes += len(data)
+        return StoredContent(self, offset, len(data), size, digest, blocks)
+    
+    def refresh(self):
+        """Take in the size of a named file other processes appended to"""
+        with self._lock:
+            self.file_bytes = max(self.file_bytes, os.fstat(self.file.fileno()).st_size)
+    
+    def retain(self, content: Any, count: int = 1):
+        """Count a document's body in the live totals (count=-1: out again)"""
+        if isinstance(content, StoredContent) and content.store is self:
+            self.raw_bytes += count * content.size
+            self.stored_bytes += count * content.length
+    
+    def _read_bytes(self, content: StoredContent, start: int = 0, end: Optional[int] = None) -> bytes:
+        """Compressed bytes [start, end) of a body"""
+        length = (content.length if end is None else end) - start
+        if hasattr(os, "pread"):
+            return os.pread(content.store.file.fileno(), length, content.offset + start)
+        with content.store._lock:
+            content.store.file.seek(content.offset + start)
+            return content.store.file.read(length)
+    
+    def read(self, content: StoredContent) -> str:
+        return self.read_range(content, 0, content.size).decode("utf-8")
+    
+    def read_range(self, content: StoredContent, start: int, end: int) -> bytes:
+        """UTF-8 bytes [start, end) of a body, decompressing only the blocks holding them"""
+        if content.blocks is None:
+            return self._decompress(self._read_bytes(content))[start:end]
+        first = start // CONTENT_BLOCK_SIZE
+        last = max(first, (end - 1) // CONTENT_BLOCK_SIZE)
+        bounds = [content.blocks[first - 1] if first else 0] + list(content.blocks[first:last + 1])
+        data = self._read_bytes(content, bounds[0], bounds[-1])
+        raw = b"".join(self._decompress(data[lo - bounds[0]:hi - bounds[0]]) for lo, hi in zip(bounds, bounds[1:]))
+        base = first * CONTENT_BLOCK_SIZE
+        return raw[start - base:end - base]
+
+content_store = ContentStore([])
+content_cache: "OrderedDict[StoredContent, str]" = OrderedDict()
+content_cache_lock = threading.Lock()
+
+def document_content(doc: Dict[str, Any], cache: bool = True) -> str:
+    """A document's full text, decompressed on demand
+    
+    Recent bodies are kept in a small LRU; bulk readers such as index
+    builds pass cache=False so they do not flush it.
+    """
+    content = doc.get("content", "")
+    if isinstance(content, str):
+        return content
+    with content_cache_lock:
+        text = content_cache.get(content)
+        if text is not None:
+            content_cache.move_to_end(content)
+    if cache:
+        metrics.count_cache("document_content", text is not None)
+    if text is None:
+        text = content.store.read(content)
+        if cache:
+            with content_cache_lock:
+                content_cache[content] = text
+                if len(content_cache) > CONTENT_CACHE_SIZE:
+                    content_cache.popitem(last=False)
+    return text
+
+def document_bytes(doc: Dict[str, Any], start: int, end: Optional[int] = None) -> bytes:
+    """UTF-8 bytes [start, end) of a document's text, without decompressing the rest"""
+    content = doc.get("content", "")
+    if isinstance(content, str):
+        return content.encode("utf-8")[start:end]
+    return content.store.read_range(content, start, content.size if end is None else end)
+
+def stored_text(value: Any) -> str:
+    """json.dump default: writes StoredContent handles as their text"""
+    if isinstance(value, StoredContent):
+        return value.store.read(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def stored_handle(value: Any) -> Dict[str, Any]:
+    """json.dump default: writes StoredContent handles as their place in a named store"""
+    if isinstance(value, StoredContent):
+        handle = {"offset": value.offset, "length": value.length, "size": value.size, "digest": value.digest.hex()}
+        if value.blocks is not None:
+            handle["blocks"] = value.blocks.tolist()
+        return handle
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def published_content(store: "ContentStore", handle: Dict[str, Any]) -> StoredContent:
+    """A handle written by stored_handle, for a body in store"""
+    blocks = handle.get("blocks")
+    return StoredContent(store, handle["offset"], handle["length"], handle["size"], bytes.fromhex(handle["digest"]),
+                         None if blocks is None else array('I', blocks))
+
+def read_documents(path: Path) -> Tuple[Dict[str, Any], "ContentStore", Dict[str, Dict[str, Any]], "CollectionStats"]:
+    """Parse a documents file and build its derived state, without touching the live one"""
     try:
-        with open(DOCUMENTS_FILE, 'r', encoding='utf-8') as f:
-            documents_data = json.load(f)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
     except FileNotFoundError:
-        documents_data = {"documents": []}
+        data = {"documents": []}
     except json.JSONDecodeError:
-        documents_data = {"documents": []}
+        data = {"documents": []}
+    
+    # Content moves into a fresh compressed store
+    documents = data.get("documents", [])
+    store = ContentStore([doc.get("content", "") for doc in documents])
+    for doc in documents:
+        doc["content"] = store.put(doc.get("content", ""))
+        store.retain(doc["content"])
+    
+    # Derived state: ID map and running stats
+    by_id = {}
+    stats = CollectionStats()
+    for doc in documents:
+        by_id[doc["id"]] = doc
+        stats.add(doc)
+    return data, store, by_id, stats
+
+def install_documents(data: Dict[str, Any], store: "ContentStore", by_id: Dict[str, Dict[str, Any]],
+                      stats: "CollectionStats", index: Optional["SearchIndex"] = None):
+    """Swap in state from read_documents; callers hold documents_lock and index_lock
+    
+    Readers do not lock, but each global is replaced whole, so they see the
+    old collection or the new one, never a partly built one. Without an
+    index, the search index is rebuilt on first use.
+    """
+    global documents_data, content_store, documents_by_id, collection_stats, search_index, documents_version
+    documents_data, content_store, documents_by_id, collection_stats = data, store, by_id, stats
+    search_index = index
+    documents_version += 1
+    with analysis_cache_lock:
+        analysis_cache.clear()
+    with content_cache_lock:
+        content_cache.clear()
+
+def load_documents():
+    """Load documents from DOCUMENTS_FILE, replacing the collection"""
+    global documents_signature
+    signature = file_signature(DOCUMENTS_FILE)
+    state = read_documents(DOCUMENTS_FILE)
+    with documents_lock, index_lock:
+        install_documents(*state)
+        documents_signature = signature
+        change_log.reset()
 
 def save_documents():
-    """Save documents to JSON file"""
+    """Save documents to JSON file, replacing it atomically"""
+    global documents_signature
     try:
-        with open(DOCUMENTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(documents_data, f, indent=2, ensure_ascii=False)
+        tmp_path = DOCUMENTS_FILE.with_name(DOCUMENTS_FILE.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(documents_data, f, indent=2, ensure_ascii=False, default=stored_text)
+        os.replace(tmp_path, DOCUMENTS_FILE)
+        # Our own write is not an external edit
+        documents_signature = file_signature(DOCUMENTS_FILE)
     except Exception as e:
         raise Exception(f"Failed to save documents: {str(e)}")
 
 def calculate_sentiment(text: str) -> Dict[str, Any]:
     """Calculate sentiment analysis for text"""
-    blob = TextBlob(text)
-    polarity = blob.sentiment.polarity
-    subjectivity = blob.sentiment.subjectivity
+    polarity, subjectivity = nlp.sentiment(text)
     
     # Determine sentiment label
     if polarity > 0.1:
@@ -83,52 +450,29 @@ def calculate_sentiment(text: str) -> Dict[str, Any]:
     }
 
 def extract_keywords_tfidf(text: str, limit: int = 10) -> List[Dict[str, Any]]:
-    """Extract keywords using TF-IDF"""
-    try:
-        # Preprocess text
-        words = nltk.word_tokenize(text.lower())
-        stop_words = set(nltk.corpus.stopwords.words('english'))
-        words = [word for word in words if word.isalpha() and word not in stop_words and len(word) > 2]
-        
-        if not words:
-            return []
-        
-        # Create TF-IDF vectorizer
-        vectorizer = TfidfVectorizer(max_features=limit*2, ngram_range=(1, 2))
-        
-        # Fit and transform the text
-        tfidf_matrix = vectorizer.fit_transform([' '.join(words)])
-        feature_names = vectorizer.get_feature_names_out()
-        tfidf_scores = tfidf_matrix.toarray()[0]
-        
-        # Get top keywords
-        keyword_scores = list(zip(feature_names, tfidf_scores))
-        keyword_scores.sort(key=lambda x: x[1], reverse=True)
-        
-        keywords = []
-        for word, score in keyword_scores[:limit]:
-            if score > 0:
-                keywords.append({
-                    "keyword": word,
-                    "score": round(score, 4),
-                    "frequency": words.count(word) if ' ' not in word else 0
-                })
-        
-        return keywords
-    except Exception as e:
-        # Fallback to simple frequency-based extraction
-        words = nltk.word_tokenize(text.lower())
-        stop_words = set(nltk.corpus.stopwords.words('english'))
-        words = [word for word in words if word.isalpha() and word not in stop_words and len(word) > 2]
-        
-        word_freq = {}
-        for word in words:
-            word_freq[word] = word_freq.get(word, 0) + 1
-        
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        
-        return [{"keyword": word, "score": freq/len(words), "frequency": freq} 
-                for word, freq in sorted_words[:limit]]
+    """Extract keywords using TF-IDF
+    
+    Within a single document every IDF is 1, so the scores are the
+    L2-normalized counts of the unigrams and bigrams left after stop word
+    removal, over the limit * 2 most frequent: the scores fitting a
+    TfidfVectorizer(max_features=limit * 2, ngram_range=(1, 2)) gives,
+    without building one per call.
+    """
+    words = [word for word in nlp.words(text.lower())
+             if word.isalpha() and word not in nlp.stop_words and len(word) > 2]
+    if not words:
+        return []
+    
+    counts = Counter(words)
+    counts.update(f"{first} {second}" for first, second in zip(words, words[1:]))
+    # Among terms tied at the cutoff, the alphabetically first are kept
+    features = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit * 2]
+    norm = math.sqrt(sum(count * count for _, count in features))
+    
+    return [
+        {"keyword": term, "score": round(count / norm, 4), "frequency": count if ' ' not in term else 0}
+        for term, count in features[:limit]
+    ]
 
 def calculate_readability(text: str) -> Dict[str, Any]:
     """Calculate readability scores"""
@@ -152,8 +496,8 @@ def calculate_readability(text: str) -> Dict[str, Any]:
 
 def calculate_basic_stats(text: str) -> Dict[str, Any]:
     """Calculate basic text statistics"""
-    sentences = nltk.sent_tokenize(text)
-    words = nltk.word_tokenize(text)
+    sentences = nlp.sentences(text)
+    words = nlp.words(text, sentences)
     
     # Count different types of words
     word_chars = [word for word in words if word.isalpha()]
@@ -167,61 +511,1085 @@ def calculate_basic_stats(text: str) -> Dict[str, Any]:
         "average_characters_per_word": round(len(''.join(word_chars)) / len(word_chars), 2) if word_chars else 0
     }
 
+# Fields callers can select with `fields` (search hits also have the scoring fields)
+DOCUMENT_FIELDS = ("id", "title", "author", "category", "date", "word_count", "tags")
+SEARCH_FIELDS = DOCUMENT_FIELDS + ("similarity_score", "snippet", "content", "metadata")
+DEFAULT_SEARCH_FIELDS = DOCUMENT_FIELDS + ("similarity_score", "snippet")
+
+# Values reported for fields a stored document lacks
+FIELD_DEFAULTS = {"author": "Unknown", "category": "Uncategorized", "date": "Unknown", "tags": (), "metadata": {}}
+
+def document_summary(doc: Dict[str, Any], fields: Tuple[str, ...] = DOCUMENT_FIELDS) -> Dict[str, Any]:
+    """The selected stored fields of a document, without copying the rest"""
+    summary = {}
+    for name in fields:
+        if name == "word_count":
+            summary[name] = doc.get("metadata", {}).get("word_count", 0)
+        elif name == "content":
+            summary[name] = document_content(doc)
+        elif name in doc or name in FIELD_DEFAULTS:
+            summary[name] = doc.get(name, FIELD_DEFAULTS.get(name))
+    return summary
+
 def get_document_by_id(doc_id: str) -> Optional[Dict[str, Any]]:
     """Get document by ID"""
-    for doc in documents_data.get("documents", []):
-        if doc["id"] == doc_id:
-            return doc
-    return None
+    return documents_by_id.get(doc_id)
 
-def search_documents_by_content(query: str, limit: int = 10) -> List[Dict[str, Any]]:
-    """Search documents by content using TF-IDF similarity"""
-    docs = documents_data.get("documents", [])
-    if not docs or not query.strip():
-        return []
+# Positional search index
+TOKEN_PATTERN = re.compile(r"\w+")
+PHRASE_PATTERN = re.compile(r'"([^"]*)"')
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Score multiplier reaches 1 + PROXIMITY_BOOST when all query terms are adjacent
+PROXIMITY_BOOST = 0.5
+# Snippet window size in tokens, and the markers placed around matched terms
+SNIPPET_TOKENS = 30
+HIGHLIGHT_START = "**"
+HIGHLIGHT_END = "**"
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """Lowercased word tokens with their character offsets"""
+    return [(match.group().lower(), match.start(), match.end()) for match in TOKEN_PATTERN.finditer(text)]
+
+def utf8_spans(text: str, tokens: List[Tuple[str, int, int]]) -> array:
+    """Token start and end offsets in the UTF-8 encoding of text, interleaved"""
+    spans = array('I')
+    if text.isascii():
+        for _, start, end in tokens:
+            spans.append(start)
+            spans.append(end)
+        return spans
+    char_pos = byte_pos = 0
+    for _, start, end in tokens:
+        byte_pos += len(text[char_pos:start].encode("utf-8"))
+        spans.append(byte_pos)
+        byte_pos += len(text[start:end].encode("utf-8"))
+        spans.append(byte_pos)
+        char_pos = end
+    return spans
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """Split a query into scoring terms and "quoted phrases"
     
-    try:
-        # Prepare documents for search
-        doc_contents = [doc["content"] for doc in docs]
-        doc_contents.append(query)
+    Stop words are dropped from the scoring terms unless nothing else is
+    left; phrases keep every token.
+    """
+    phrases = [[token for token, _, _ in tokenize(phrase)] for phrase in PHRASE_PATTERN.findall(query)]
+    phrases = [phrase for phrase in phrases if phrase]
+    words = [token for token, _, _ in tokenize(PHRASE_PATTERN.sub(" ", query))]
+    words += [token for phrase in phrases for token in phrase]
+    terms = list(dict.fromkeys(word for word in words if word not in ENGLISH_STOP_WORDS))
+    return terms or list(dict.fromkeys(words)), phrases
+
+# Facets documents can be filtered and counted by; "month" buckets the date as YYYY-MM
+FACET_FIELDS = ("category", "author", "tags", "month")
+# Most frequent values reported per facet
+FACET_LIMIT = 20
+
+def facet_values(doc: Dict[str, Any], facet: str) -> List[str]:
+    """The values a document has for a facet"""
+    if facet == "tags":
+        return list(doc.get("tags", []))
+    if facet == "month":
+        date = str(doc.get("date", ""))
+        return [date[:7]] if re.match(r"\d{4}-\d{2}", date) else []
+    return [doc.get(facet, FIELD_DEFAULTS[facet])]
+
+class FacetIndex:
+    """NumPy bool bitmaps per facet value: entry i is set when document i has the value
+    
+    Filters and result-set counts are bitmap intersections; arrays grow by
+    doubling as documents are added.
+    """
+    
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        # Documents that are not tombstoned
+        self.live = np.zeros(capacity, dtype=bool)
+        self.bitmaps: Dict[str, Dict[str, np.ndarray]] = {facet: {} for facet in FACET_FIELDS}
+    
+    def add(self, doc_num: int, doc: Dict[str, Any]):
+        if doc_num >= self.capacity:
+            self._grow(max(doc_num + 1, self.capacity * 2))
+        for facet, values in self.bitmaps.items():
+            for value in facet_values(doc, facet):
+                bitmap = values.get(value)
+                if bitmap is None:
+                    bitmap = values[value] = np.zeros(self.capacity, dtype=bool)
+                bitmap[doc_num] = True
+        self.live[doc_num] = True
+    
+    def remove(self, doc_num: int, doc: Dict[str, Any]):
+        for facet, values in self.bitmaps.items():
+            for value in facet_values(doc, facet):
+                bitmap = values.get(value)
+                if bitmap is not None:
+                    bitmap[doc_num] = False
+                    if not bitmap.any():
+                        del values[value]
+        self.live[doc_num] = False
+    
+    def _grow(self, capacity: int):
+        def grown(bitmap: np.ndarray) -> np.ndarray:
+            result = np.zeros(capacity, dtype=bool)
+            result[:self.capacity] = bitmap
+            return result
+        
+        self.live = grown(self.live)
+        for values in self.bitmaps.values():
+            for value in values:
+                values[value] = grown(values[value])
+        self.capacity = capacity
+    
+    def mask(self, doc_nums: Optional[List[int]] = None) -> np.ndarray:
+        """Bitmap of the given documents (all live documents by default)"""
+        if doc_nums is None:
+            return self.live.copy()
+        mask = np.zeros(self.capacity, dtype=bool)
+        mask[doc_nums] = True
+        return mask
+    
+    def match(self, filters: Dict[str, List[str]]) -> np.ndarray:
+        """Documents matching every facet filter (any of the values within one facet)"""
+        mask = self.mask()
+        for facet, values in filters.items():
+            selected = np.zeros(self.capacity, dtype=bool)
+            for value in values:
+                bitmap = self.bitmaps[facet].get(value)
+                if bitmap is not None:
+                    selected |= bitmap
+            mask &= selected
+        return mask
+    
+    def counts(self, mask: np.ndarray, facets: List[str], limit: int = FACET_LIMIT) -> Dict[str, Dict[str, int]]:
+        """Per-value document counts within a result set, most frequent first"""
+        result = {}
+        for facet in facets:
+            counts = [
+                (value, int(np.count_nonzero(bitmap & mask)))
+                for value, bitmap in self.bitmaps[facet].items()
+            ]
+            counts = sorted((item for item in counts if item[1]), key=lambda item: (-item[1], item[0]))
+            result[facet] = dict(counts[:limit])
+        return result
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Tuple[Dict[str, List[str]], Optional[str]]:
+    """Facet filters as lists of values, or an error message"""
+    normalized = {}
+    for facet, values in (filters or {}).items():
+        if facet not in FACET_FIELDS:
+            return {}, f"Unknown facet '{facet}'. Must be one of: {list(FACET_FIELDS)}"
+        values = [values] if isinstance(values, str) else values
+        if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+            return {}, f"Filter for '{facet}' must be a string or a list of strings"
+        normalized[facet] = values
+    return normalized, None
+
+class SearchIndex:
+    """Positional inverted index over document content
+    
+    For each term, the token positions per document; for each document, the
+    UTF-8 byte span of every token. Ranking is BM25 with a proximity boost,
+    phrases are matched on positions, and snippets are cut from the token
+    window holding the most query terms, so producing one costs time in the
+    number of term hits and the snippet size, not the document length.
+    """
+    
+    def __init__(self):
+        # By document number; None once tombstoned
+        self.docs: List[Optional[Dict[str, Any]]] = []
+        self.doc_numbers: Dict[str, int] = {}
+        self.tombstones = 0
+        # Changes made while a compacted copy is being built (see compact_search_index)
+        self.journal: Optional[List[Tuple[str, Any]]] = None
+        self.lengths = array('I')
+        # Per document: token start and end offsets, interleaved
+        self.spans: List[array] = []
+        self.postings: Dict[str, Dict[int, array]] = {}
+        self.total_length = 0
+        self.facets = FacetIndex()
+    
+    @classmethod
+    def build(cls, docs: List[Dict[str, Any]]) -> "SearchIndex":
+        index = cls()
+        for doc in docs:
+            index.add(doc)
+        return index
+    
+    def add(self, doc: Dict[str, Any]) -> int:
+        """Index a document; returns its document number"""
+        if self.journal is not None:
+            self.journal.append(("add", doc))
+        doc_num = len(self.docs)
+        self.doc_numbers[doc["id"]] = doc_num
+        text = document_content(doc, cache=False)
+        tokens = tokenize(text)
+        spans = utf8_spans(text, tokens)
+        for position, (token, _, _) in enumerate(tokens):
+            by_doc = self.postings.get(token)
+            if by_doc is None:
+                by_doc = self.postings[token] = {}
+            positions = by_doc.get(doc_num)
+            if positions is None:
+                positions = by_doc[doc_num] = array('I')
+            positions.append(position)
+        self.docs.append(doc)
+        self.facets.add(doc_num, doc)
+        self.lengths.append(len(tokens))
+        self.spans.append(spans)
+        self.total_length += len(tokens)
+        return doc_num
+    
+    def remove(self, doc_id: str) -> bool:
+        """Tombstone a document
         
-        # Create TF-IDF vectorizer
-        vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
-        tfidf_matrix = vectorizer.fit_transform(doc_contents)
+        Its postings stay in place until the index is compacted; searches
+        skip it, and document frequencies leave it out.
+        """
+        doc_num = self.doc_numbers.pop(doc_id, None)
+        if doc_num is None:
+            return False
+        if self.journal is not None:
+            self.journal.append(("remove", doc_id))
+        self.facets.remove(doc_num, self.docs[doc_num])
+        self.total_length -= self.lengths[doc_num]
+        self.docs[doc_num] = None
+        self.spans[doc_num] = EMPTY_POSITIONS
+        self.tombstones += 1
+        return True
+    
+    def live_docs(self) -> List[Dict[str, Any]]:
+        return [doc for doc in self.docs if doc is not None]
+    
+    def needs_compaction(self) -> bool:
+        return (self.tombstones >= COMPACTION_MIN_TOMBSTONES
+                and self.tombstones > COMPACTION_RATIO * len(self.docs))
+    
+    def document_frequency(self, by_doc) -> int:
+        """Live documents among a term's postings"""
+        if not self.tombstones:
+            return len(by_doc)
+        live = self.facets.live
+        return sum(1 for doc_num in by_doc if live[doc_num])
+    
+    def positions(self, term: str, doc_num: int) -> array:
+        return self.postings.get(term, {}).get(doc_num, EMPTY_POSITIONS)
+    
+    def has_phrase(self, doc_num: int, phrase: List[str]) -> bool:
+        """Whether the tokens of a phrase occur consecutively in a document"""
+        following = [set(self.positions(token, doc_num)) for token in phrase[1:]]
+        return any(
+            all(start + offset + 1 in positions for offset, positions in enumerate(following))
+            for start in self.positions(phrase[0], doc_num)
+        )
+    
+    def search(self, terms: List[str], phrases: List[List[str]],
+               within: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """(document number, score) for every match, best first, optionally within a facet bitmap"""
+        count = len(self.doc_numbers)
+        if not count:
+            return []
+        scored = list(dict.fromkeys(terms + [token for phrase in phrases for token in phrase]))
+        if phrases:
+            # Phrases are required: start from documents holding every phrase token
+            candidates = None
+            for token in (token for phrase in phrases for token in phrase):
+                docs = self.postings.get(token, {}).keys()
+                candidates = set(docs) if candidates is None else candidates & docs
+            candidates = {doc_num for doc_num in candidates
+                          if all(self.has_phrase(doc_num, phrase) for phrase in phrases)}
+        else:
+            candidates = set()
+            for term in terms:
+                candidates.update(self.postings.get(term, ()))
+        # Facet filters include only live documents; otherwise skip tombstones here
+        within = self.facets.live if within is None else within
+        candidates = [doc_num for doc_num in candidates if within[doc_num]]
         
-        # Calculate similarity
-        query_vector = tfidf_matrix[-1]
-        doc_vectors = tfidf_matrix[:-1]
+        average_length = self.total_length / count or 1
+        idfs = {}
+        for term in scored:
+            by_doc = self.postings.get(term)
+            if by_doc:
+                frequency = self.document_frequency(by_doc)
+                idfs[term] = (by_doc, math.log(1 + (count - frequency + 0.5) / (frequency + 0.5)))
+        scores = []
+        for doc_num in candidates:
+            length_norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[doc_num] / average_length)
+            score = 0.0
+            for by_doc, idf in idfs.values():
+                frequency = len(by_doc.get(doc_num, ()))
+                if frequency:
+                    score += idf * frequency * (BM25_K1 + 1) / (frequency + length_norm)
+            matched, span = self._best_window(self._hits(doc_num, scored), self.lengths[doc_num] or 1)
+            if matched > 1:
+                score *= 1 + PROXIMITY_BOOST * (matched - 1) / span
+            scores.append((doc_num, score))
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores
+    
+    def _hits(self, doc_num: int, terms: List[str]) -> List[Tuple[int, str]]:
+        """(position, term) for every occurrence of the terms, in position order"""
+        return list(heapq.merge(*(
+            [(position, term) for position in self.positions(term, doc_num)] for term in terms
+        )))
+    
+    @staticmethod
+    def _best_window(hits: List[Tuple[int, str]], width: int) -> Tuple[int, int]:
+        """Most distinct terms within `width` tokens, and the tightest span achieving it
         
-        similarities = cosine_similarity(query_vector, doc_vectors).flatten()
+        Returns (distinct terms, span in tokens); hits must be position-ordered.
+        """
+        best_matched, best_span = 0, width
+        window: Dict[str, int] = {}
+        left = 0
+        for position, term in hits:
+            window[term] = window.get(term, 0) + 1
+            while position - hits[left][0] >= width:
+                dropped = hits[left][1]
+                window[dropped] -= 1
+                if not window[dropped]:
+                    del window[dropped]
+                left += 1
+            # Shrink from the left while every distinct term stays covered
+            while window[hits[left][1]] > 1:
+                window[hits[left][1]] -= 1
+                left += 1
+            span = position - hits[left][0] + 1
+            if len(window) > best_matched or (len(window) == best_matched and span < best_span):
+                best_matched, best_span = len(window), span
+        return best_matched, best_span
+    
+    def snippet(self, doc_num: int, terms: List[str], size: int = SNIPPET_TOKENS) -> str:
+        """The window of `size` tokens with the most query terms, with matches highlighted"""
+        length = self.lengths[doc_num]
+        if not length:
+            return ""
+        hits = self._hits(doc_num, terms)
         
-        # Get top matches
-        doc_similarities = list(zip(docs, similarities))
-        doc_similarities.sort(key=lambda x: x[1], reverse=True)
+        # Anchor on the hit that opens the densest window
+        first = 0
+        best = (0, 0)
+        window: Dict[str, int] = {}
+        left = 0
+        for right, (position, term) in enumerate(hits):
+            window[term] = window.get(term, 0) + 1
+            while position - hits[left][0] >= size:
+                dropped = hits[left][1]
+                window[dropped] -= 1
+                if not window[dropped]:
+                    del window[dropped]
+                left += 1
+            if (len(window), right - left + 1) > best:
+                best = (len(window), right - left + 1)
+                first = left
         
-        results = []
-        for doc, similarity in doc_similarities[:limit]:
-            if similarity > 0:
-                result = doc.copy()
-                result["similarity_score"] = round(similarity, 4)
-                results.append(result)
+        if hits:
+            # Center the matched tokens within the window
+            anchor, last = hits[first][0], hits[first + best[1] - 1][0]
+            start = max(0, min(anchor - (size - (last - anchor + 1)) // 2, length - size))
+        else:
+            start = 0
+        end = min(length, start + size) - 1
         
-        return results
-    except Exception as e:
-        # Fallback to simple text search
-        results = []
-        query_lower = query.lower()
-        for doc in docs:
-            if query_lower in doc["content"].lower() or query_lower in doc["title"].lower():
-                results.append(doc)
-        return results[:limit]
+        # Only the window's bytes are read, sliced at token boundaries
+        spans = self.spans[doc_num]
+        last = end < length - 1
+        base = cursor = int(spans[2 * start]) if start > 0 else 0
+        window = document_bytes(self.docs[doc_num], base, int(spans[2 * end + 1]) if last else None)
+        parts = []
+        for position, _ in hits:
+            if start <= position <= end:
+                token_start, token_end = int(spans[2 * position]), int(spans[2 * position + 1])
+                parts.append(window[cursor - base:token_start - base].decode("utf-8"))
+                parts.append(HIGHLIGHT_START + window[token_start - base:token_end - base].decode("utf-8") + HIGHLIGHT_END)
+                cursor = token_end
+        parts.append(window[cursor - base:].decode("utf-8"))
+        return ("…" if start > 0 else "") + "".join(parts).strip() + ("…" if last else "")
+
+EMPTY_POSITIONS = array('I')
+
+# Compact the search index once tombstones reach this many and this share of it
+COMPACTION_MIN_TOMBSTONES = 8
+COMPACTION_RATIO = 0.2
+
+# Built on first search and kept current by add/update/delete_document;
+# index_lock guards it against the compaction thread
+search_index: Optional[SearchIndex] = None
+index_lock = threading.RLock()
+compaction_thread: Optional[threading.Thread] = None
+
+def get_search_index() -> SearchIndex:
+    global search_index
+    with index_lock:
+        if search_index is None:
+            search_index = SearchIndex.build(documents_data.get("documents", []))
+        return search_index
+
+def compact_search_index():
+    """Rebuild the search index without tombstones and swap it in
+    
+    The rebuild runs without the lock; changes made meanwhile are journaled
+    on the old index and replayed onto the new one before the swap.
+    """
+    global search_index
+    with index_lock:
+        old = search_index
+        if old is None:
+            return
+        live = old.live_docs()
+        old.journal = []
+    
+    fresh = SearchIndex.build(live)
+    
+    with index_lock:
+        journal, old.journal = old.journal, None
+        if search_index is not old:
+            # Reloaded while compacting
+            return
+        for operation, argument in journal:
+            if operation == "add":
+                fresh.add(argument)
+            else:
+                fresh.remove(argument)
+        search_index = fresh
+
+def maybe_compact():
+    """Start a background compaction when enough of the index is tombstoned"""
+    global compaction_thread
+    with index_lock:
+        if search_index is None or not search_index.needs_compaction():
+            return
+        if compaction_thread is not None and compaction_thread.is_alive():
+            return
+        compaction_thread = threading.Thread(target=compact_search_index, name="search-index-compaction", daemon=True)
+        compaction_thread.start()
+
+class CollectionStats:
+    """Running totals behind get_document_stats, updated per document"""
+    
+    def __init__(self):
+        self.clear()
+    
+    def clear(self):
+        self.total_documents = 0
+        self.total_words = 0
+        self.categories: Counter = Counter()
+        self.authors: Counter = Counter()
+    
+    def add(self, doc: Dict[str, Any], sign: int = 1):
+        self.total_documents += sign
+        self.total_words += sign * doc.get("metadata", {}).get("word_count", 0)
+        for counts, key in ((self.categories, doc.get("category", "Uncategorized")),
+                            (self.authors, doc.get("author", "Unknown"))):
+            counts[key] += sign
+            if not counts[key]:
+                del counts[key]
+    
+    def remove(self, doc: Dict[str, Any]):
+        self.add(doc, -1)
+    
+    def copy(self) -> "CollectionStats":
+        stats = CollectionStats()
+        stats.total_documents, stats.total_words = self.total_documents, self.total_words
+        stats.categories, stats.authors = self.categories.copy(), self.authors.copy()
+        return stats
+
+# Most recent analyze_document results kept, by document ID
+ANALYSIS_CACHE_SIZE = 256
+
+# Derived document state, rebuilt by load_documents and maintained per change;
+# documents_version counts the changes
+documents_by_id: Dict[str, Dict[str, Any]] = {}
+documents_version = 0
+# Held while documents are added, updated, deleted or reloaded
+documents_lock = threading.RLock()
+# File signature of DOCUMENTS_FILE as last loaded or saved (see reload_changed_documents)
+documents_signature: Optional[Tuple[int, int]] = None
+collection_stats = CollectionStats()
+analysis_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+analysis_cache_lock = threading.Lock()
+
+# Changes by document ID, for get_changes_since; callers hold documents_lock
+change_log = ChangeLog()
+
+def holding_documents_lock(func):
+    """Run a document-changing tool under documents_lock"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with documents_lock:
+            return func(*args, **kwargs)
+    return wrapper
+
+def register_document(doc: Dict[str, Any]):
+    """Add a stored document to every derived structure"""
+    global documents_version
+    documents_version += 1
+    documents_by_id[doc["id"]] = doc
+    collection_stats.add(doc)
+    content_store.retain(doc.get("content"))
+    with index_lock:
+        if search_index is not None:
+            search_index.add(doc)
+
+def unregister_document(doc: Dict[str, Any]):
+    """Remove a document from every derived structure"""
+    global documents_version
+    documents_version += 1
+    documents_by_id.pop(doc["id"], None)
+    collection_stats.remove(doc)
+    content_store.retain(doc.get("content"), -1)
+    with analysis_cache_lock:
+        analysis_cache.pop(doc["id"], None)
+    with index_lock:
+        if search_index is not None:
+            search_index.remove(doc["id"])
+    maybe_compact()
+
+def maybe_compact_content():
+    """Rewrite the live bodies into a fresh store once dropped ones dominate the file
+    
+    Bodies are copied still compressed. Callers hold documents_lock; handles
+    already taken by readers keep the old store's file open until released.
+    """
+    global content_store
+    store = content_store
+    if store.path is not None:
+        # A published store: the writer's next base generation rewrites it
+        return
+    dropped = store.file_bytes - store.stored_bytes
+    if dropped < CONTENT_COMPACTION_MIN_BYTES or dropped < store.file_bytes * CONTENT_COMPACTION_RATIO:
+        return
+    fresh = ContentStore([], dictionary=store.dictionary)
+    for doc in documents_by_id.values():
+        content = doc.get("content")
+        if isinstance(content, StoredContent):
+            doc["content"] = fresh.copy(content)
+            fresh.retain(doc["content"])
+    content_store = fresh
+    with content_cache_lock:
+        content_cache.clear()
+
+def file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a file, or None if it cannot be read"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def same_document(doc: Dict[str, Any], record: Dict[str, Any]) -> bool:
+    """Whether a stored document matches a record read from JSON
+    
+    Content is compared by digest, so unchanged bodies are never decompressed.
+    """
+    if doc.keys() != record.keys():
+        return False
+    for name, value in doc.items():
+        if name == "content" and isinstance(value, StoredContent):
+            if value.digest != content_digest(record[name].encode("utf-8")):
+                return False
+        elif value != record[name]:
+            return False
+    return True
+
+def reload_changed_documents() -> Optional[Dict[str, int]]:
+    """Apply external edits of DOCUMENTS_FILE by document ID
+    
+    The file is parsed whole, but only added, changed and removed documents
+    are compressed, indexed and counted, and only their caches are dropped.
+    The new ID map and stats are built aside and swapped in together with
+    the index changes, so readers see the file before or after the edit.
+    Returns the number of each, or None when the file has not changed (or
+    could not be read, or documents changed meanwhile; a later call retries).
+    """
+    global documents_signature, documents_data, documents_by_id, collection_stats, documents_version
+    signature = file_signature(DOCUMENTS_FILE)
+    if signature is None or signature == documents_signature:
+        return None
+    version = documents_version
+    try:
+        with open(DOCUMENTS_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        # Possibly caught mid-write
+        return None
+    
+    with documents_lock:
+        if documents_version != version:
+            return None
+        records = data.get("documents", [])
+        seen = set()
+        documents, added, updated = [], [], []
+        for record in records:
+            seen.add(record["id"])
+            old = documents_by_id.get(record["id"])
+            if old is not None and same_document(old, record):
+                documents.append(old)
+                continue
+            doc = dict(record, content=content_store.put(record.get("content", "")))
+            documents.append(doc)
+            (added if old is None else updated).append((old, doc))
+        removed = [doc for doc_id, doc in documents_by_id.items() if doc_id not in seen]
+        dropped = removed + [old for old, _ in updated]
+        stored = [doc for _, doc in added + updated]
+        
+        by_id = {doc["id"]: doc for doc in documents}
+        stats = collection_stats.copy()
+        for doc in dropped:
+            stats.remove(doc)
+        for doc in stored:
+            stats.add(doc)
+        with index_lock:
+            if search_index is not None:
+                for doc in dropped:
+                    search_index.remove(doc["id"])
+                for doc in stored:
+                    search_index.add(doc)
+            documents_data, documents_by_id, collection_stats = dict(data, documents=documents), by_id, stats
+            documents_version += 1
+        
+        for doc in dropped:
+            content_store.retain(doc.get("content"), -1)
+            with analysis_cache_lock:
+                analysis_cache.pop(doc["id"], None)
+        for doc in stored:
+            content_store.retain(doc.get("content"))
+        for doc in removed:
+            change_log.record(doc["id"], ACTION_DELETED)
+        for old, doc in added + updated:
+            change_log.record(doc["id"], ACTION_CREATED if old is None else ACTION_UPDATED)
+        maybe_compact()
+        maybe_compact_content()
+        documents_signature = signature
+    return {"added": len(added), "updated": len(updated), "removed": len(removed)}
+
+def watch_documents(interval: float, reload=reload_changed_documents) -> threading.Thread:
+    """Poll DOCUMENTS_FILE every interval seconds in a daemon thread and apply external edits"""
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                changes = reload()
+            except Exception as e:
+                print(f"Reloading {DOCUMENTS_FILE} failed: {e}", file=sys.stderr)
+                continue
+            if changes and any(changes.values()):
+                print(f"Reloaded {DOCUMENTS_FILE}: {changes}", file=sys.stderr)
+    
+    thread = threading.Thread(target=run, name="documents-watcher", daemon=True)
+    thread.start()
+    return thread
+
+class MappedTermPostings:
+    """One term's postings in a MappedSearchIndex, read like {doc_num: positions}
+    
+    Documents added since mapping have their positions in a dict beside
+    the mapped ones (see MappedPostings.added).
+    """
+    
+    def __init__(self, postings: "MappedPostings", term: str, term_id: int):
+        self.index = postings.index
+        self.postings = postings
+        self.term = term
+        self.start = int(self.index.term_offsets[term_id])
+        self.docs = self.index.posting_docs[self.start:int(self.index.term_offsets[term_id + 1])]
+        self.added = postings.added.get(term, {})
+    
+    def __len__(self) -> int:
+        return len(self.docs) + len(self.added)
+    
+    def __iter__(self):
+        return chain(self.docs.tolist(), self.added)
+    
+    def keys(self) -> set:
+        return set(self.docs.tolist()).union(self.added)
+    
+    def get(self, doc_num: int, default=None):
+        if doc_num >= self.index.base_docs:
+            return self.added.get(doc_num, default)
+        i = int(np.searchsorted(self.docs, doc_num))
+        if i == len(self.docs) or self.docs[i] != doc_num:
+            return default
+        offsets = self.index.position_offsets
+        return self.index.positions_flat[offsets[self.start + i]:offsets[self.start + i + 1]]
+    
+    def __setitem__(self, doc_num: int, positions: array):
+        self.added = self.postings.added.setdefault(self.term, self.added)
+        self.added[doc_num] = positions
 
-# Initialize documents on startup
+class MappedPostings:
+    """Term lookup by binary search over the mapped, sorted vocabulary"""
+    
+    def __init__(self, index: "MappedSearchIndex"):
+        self.index = index
+        # Postings of documents added since mapping, as in SearchIndex.postings
+        self.added: Dict[str, Dict[int, array]] = {}
+    
+    def get(self, term: str, default=None):
+        terms = self.index.terms
+        i = int(np.searchsorted(terms, term))
+        if i == len(terms) or terms[i] != term:
+            return self.added.get(term, default)
+        return MappedTermPostings(self, term, i)
+    
+    def __setitem__(self, term: str, by_doc: Dict[int, array]):
+        self.added[term] = by_doc
+
+class MappedRows:
+    """Row i of a CSR-packed array: values[offsets[i]:offsets[i + 1]], then appended rows"""
+    
+    def __init__(self, offsets: np.ndarray, values: np.ndarray):
+        self.offsets = offsets
+        self.values = values
+        self.count = len(offsets) - 1
+        self.appended: List[array] = []
+    
+    def __getitem__(self, i: int):
+        if i >= self.count:
+            return self.appended[i - self.count]
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+    
+    def __setitem__(self, i: int, row: array):
+        # Mapped rows are read-only; a tombstoned one stays until the next base generation
+        if i >= self.count:
+            self.appended[i - self.count] = row
+    
+    def append(self, row: array):
+        self.appended.append(row)
+
+# Arrays of a published index generation, all loaded with mmap_mode="r"
+MAPPED_ARRAYS = ("terms", "term_offsets", "posting_docs", "position_offsets", "positions_flat",
+                 "lengths", "span_offsets", "spans_flat")
+
+class MappedSearchIndex(SearchIndex):
+    """SearchIndex over memory-mapped CSR arrays, with later changes in memory
+    
+    Written by write_mapped_index and shared by every worker process: the
+    vocabulary, postings, positions, token spans and facet bitmaps are pages
+    of the same files, and until something is tombstoned document
+    frequencies (hence IDF) come straight from the postings offsets. Each
+    worker applies the changes published since (see sync_shared_state) on
+    top: added documents are indexed in memory beside the mapped ones,
+    removed ones are tombstoned, and facet bitmaps are mapped copy-on-write
+    so only the pages touched are copied. The writer replaces the whole
+    index by publishing a new base generation once enough has changed (see
+    needs_merge).
+    """
+    
+    def __init__(self, directory: Path, documents: Dict[str, Dict[str, Any]]):
+        self.directory = directory
+        for name in MAPPED_ARRAYS:
+            setattr(self, name, np.load(directory / f"{name}.npy", mmap_mode="r"))
+        with open(directory / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        
+        # Documents missing from the loaded JSON count as deleted
+        self.docs = [documents.get(doc_id) for doc_id in meta["ids"]]
+        self.doc_numbers = {doc_id: num for num, doc_id in enumerate(meta["ids"]) if self.docs[num] is not None}
+        self.base_docs = len(self.docs)
+        self.tombstones = self.docs.count(None)
+        self.journal = None
+        self.postings = MappedPostings(self)
+        self.spans = MappedRows(self.span_offsets, self.spans_flat)
+        # Copied so added documents can be appended: 4 bytes per document
+        self.lengths = array('I', self.lengths.astype(np.uint32).tobytes())
+        self.total_length = meta["total_length"] - sum(
+            self.lengths[num] for num, doc in enumerate(self.docs) if doc is None)
+        
+        self.facets = FacetIndex(max(1, len(self.docs)))
+        self.facets.live[:len(self.docs)] = [doc is not None for doc in self.docs]
+        for facet, values in meta["facets"].items():
+            matrix = np.load(directory / f"facet_{facet}.npy", mmap_mode="c")
+            self.facets.bitmaps[facet] = {value: matrix[row] for row, value in enumerate(values)}
+    
+    def needs_compaction(self) -> bool:
+        """Never: the writer publishes a new base generation instead"""
+        return False
+    
+    def needs_merge(self) -> bool:
+        """Whether the documents changed since mapping call for a new base generation"""
+        changed = self.tombstones + len(self.docs) - self.base_docs
+        return changed >= COMPACTION_MIN_TOMBSTONES and changed > COMPACTION_RATIO * len(self.docs)
+
+def write_mapped_index(index: SearchIndex, directory: Path):
+    """Write the live part of an index as CSR arrays for MappedSearchIndex"""
+    directory.mkdir(parents=True)
+    live = [num for num, doc in enumerate(index.docs) if doc is not None]
+    renumber = {old: new for new, old in enumerate(live)}
+    terms = sorted(term for term, by_doc in index.postings.items() if any(num in renumber for num in by_doc))
+    
+    term_offsets, posting_docs, position_offsets, positions_flat = [0], [], [0], []
+    for term in terms:
+        by_doc = index.postings[term]
+        for old in sorted(num for num in by_doc if num in renumber):
+            posting_docs.append(renumber[old])
+            positions_flat.extend(by_doc[old])
+            position_offsets.append(len(positions_flat))
+        term_offsets.append(len(posting_docs))
+    
+    span_offsets, spans_flat = [0], []
+    for old in live:
+        spans_flat.extend(index.spans[old])
+        span_offsets.append(len(spans_flat))
+    
+    arrays = {
+        "terms": np.array(terms, dtype=str) if terms else np.array([], dtype="<U1"),
+        "term_offsets": np.array(term_offsets, dtype=np.int64),
+        "posting_docs": np.array(posting_docs, dtype=np.int32),
+        "position_offsets": np.array(position_offsets, dtype=np.int64),
+        "positions_flat": np.array(positions_flat, dtype=np.int32),
+        "lengths": np.array([index.lengths[old] for old in live], dtype=np.int32),
+        "span_offsets": np.array(span_offsets, dtype=np.int64),
+        "spans_flat": np.array(spans_flat, dtype=np.int32)
+    }
+    for name, values in arrays.items():
+        np.save(directory / f"{name}.npy", values)
+    
+    facets = {}
+    for facet, bitmaps in index.facets.bitmaps.items():
+        values = sorted(bitmaps)
+        matrix = np.zeros((len(values), max(1, len(live))), dtype=bool)
+        for row, value in enumerate(values):
+            matrix[row, :len(live)] = bitmaps[value][live]
+        np.save(directory / f"facet_{facet}.npy", matrix)
+        facets[facet] = values
+    
+    with open(directory / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "ids": [index.docs[old]["id"] for old in live],
+            "total_length": sum(arrays["lengths"].tolist()),
+            "facets": facets
+        }, f, ensure_ascii=False)
+
+# Shared state for multi-process serving (see serve_workers): each base
+# generation is a directory of mapped index arrays, the compressed bodies and
+# the documents it indexes, plus a log of the changes published since.
+# CURRENT names the newest generation and how much of its log to apply.
+INDEX_DIR = DOCUMENTS_FILE.with_suffix(".index")
+WRITE_LOCK_FILE = DOCUMENTS_FILE.with_suffix(".lock")
+mapped_generation: Optional[str] = None
+# Bytes of the generation's deltas.jsonl applied to this process's state
+mapped_deltas = 0
+# Held while catching up with or publishing shared state
+sync_lock = threading.Lock()
+
+def read_current_generation() -> Optional[Dict[str, Any]]:
+    """CURRENT as {"generation": name, "deltas": bytes of its deltas.jsonl}"""
+    try:
+        return json.loads((INDEX_DIR / "CURRENT").read_text())
+    except FileNotFoundError:
+        return None
+
+def write_current_generation(generation: str, deltas: int):
+    tmp_path = INDEX_DIR / "CURRENT.tmp"
+    tmp_path.write_text(json.dumps({"generation": generation, "deltas": deltas}))
+    os.replace(tmp_path, INDEX_DIR / "CURRENT")
+
+def published_ahead() -> Optional[Dict[str, Any]]:
+    """CURRENT if it holds anything this process has not applied yet"""
+    current = read_current_generation()
+    if current is None or (current["generation"], current["deltas"]) == (mapped_generation, mapped_deltas):
+        return None
+    return current
+
+def map_generation(generation: str):
+    """Load a base generation's documents and change log, and map its index and bodies"""
+    global mapped_generation, mapped_deltas, change_log
+    directory = INDEX_DIR / generation
+    store = ContentStore([], dictionary=(directory / "dictionary.bin").read_bytes(), path=directory / "content.bin")
+    with open(directory / "documents.json", encoding="utf-8") as f:
+        data = json.load(f)
+    by_id = {}
+    stats = CollectionStats()
+    for doc in data.get("documents", []):
+        doc["content"] = published_content(store, doc["content"])
+        store.retain(doc["content"])
+        by_id[doc["id"]] = doc
+        stats.add(doc)
+    index = MappedSearchIndex(directory, by_id)
+    with open(directory / "changes.json", encoding="utf-8") as f:
+        log = ChangeLog.from_dict(json.load(f))
+    with documents_lock, index_lock:
+        install_documents(data, store, by_id, stats, index)
+        change_log = log
+        mapped_generation, mapped_deltas = generation, 0
+
+def apply_published_change(change: Dict[str, Any]):
+    """Apply one change from a deltas.jsonl line, as the writing tool did; callers hold documents_lock"""
+    old = documents_by_id.get(change["id"])
+    doc = change.get("document")
+    if doc is not None:
+        doc = dict(doc, content=published_content(content_store, doc["content"]))
+    docs = documents_data.setdefault("documents", [])
+    if old is not None:
+        position = next(i for i, stored in enumerate(docs) if stored is old)
+        if doc is None:
+            del docs[position]
+        else:
+            docs[position] = doc
+        unregister_document(old)
+    elif doc is not None:
+        docs.append(doc)
+    if doc is not None:
+        register_document(doc)
+    change_log.record(change["id"], change["action"])
+
+def sync_shared_state():
+    """Catch up with the newest published state: map a new base generation
+    if another process wrote one, then apply the changes published since"""
+    global mapped_deltas
+    with sync_lock:
+        current = published_ahead()
+        if current is None:
+            return
+        if current["generation"] != mapped_generation:
+            map_generation(current["generation"])
+        if current["deltas"] > mapped_deltas:
+            with open(INDEX_DIR / mapped_generation / "deltas.jsonl", "rb") as f:
+                f.seek(mapped_deltas)
+                lines = f.read(current["deltas"] - mapped_deltas).splitlines()
+            with documents_lock:
+                content_store.refresh()
+                for line in lines:
+                    apply_published_change(json.loads(line))
+                mapped_deltas = current["deltas"]
+
+def publish_base_generation():
+    """Write the current documents as a new base generation and switch every worker to it
+    
+    This reindexes every document, so it runs only once enough changes piled
+    up (see MappedSearchIndex.needs_merge). Live bodies are copied still
+    compressed; dropped ones are left behind. The previous generation is
+    kept for workers still switching over.
+    """
+    with documents_lock:
+        data = dict(documents_data, documents=list(documents_data.get("documents", [])))
+        changes = change_log.to_dict()
+        dictionary = content_store.dictionary
+    
+    generation = str(time.time_ns())
+    directory = INDEX_DIR / generation
+    write_mapped_index(SearchIndex.build(data["documents"]), directory)
+    (directory / "dictionary.bin").write_bytes(dictionary)
+    store = ContentStore([], dictionary=dictionary, path=directory / "content.bin")
+    data["documents"] = [
+        dict(doc, content=store.copy(doc["content"]) if isinstance(doc["content"], StoredContent)
+             else store.put(doc["content"]))
+        for doc in data["documents"]
+    ]
+    with open(directory / "documents.json", "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, default=stored_handle)
+    with open(directory / "changes.json", "w", encoding="utf-8") as f:
+        json.dump(changes, f)
+    (directory / "deltas.jsonl").touch()
+    
+    previous = read_current_generation()
+    write_current_generation(generation, 0)
+    for stale in INDEX_DIR.iterdir():
+        if stale.is_dir() and stale.name not in (generation, previous and previous["generation"]):
+            shutil.rmtree(stale, ignore_errors=True)
+    map_generation(generation)
+
+def publish_shared_state(since: Optional[int] = None):
+    """Publish the changes logged after change-log version `since` to every worker
+    
+    They go out as lines appended to the generation's deltas.jsonl, holding
+    only the changed documents, whose bodies this process already appended
+    to the generation's content file. A new base generation is written
+    instead when there is none yet (or no `since`), when the index has taken
+    enough changes, or when bodies moved out of the published content file.
+    Callers hold the cross-process write lock (or run before workers start).
+    """
+    global mapped_deltas
+    with sync_lock:
+        index = search_index
+        if (since is None or mapped_generation is None or not isinstance(index, MappedSearchIndex)
+                or index.needs_merge() or content_store.path is None or since < change_log.floor):
+            publish_base_generation()
+            return
+        with documents_lock:
+            lines = []
+            for version, doc_id, action in change_log.entries:
+                if version <= since:
+                    continue
+                change = {"id": doc_id, "action": action}
+                doc = documents_by_id.get(doc_id)
+                if action != ACTION_DELETED and doc is not None:
+                    change["document"] = doc
+                lines.append(json.dumps(change, ensure_ascii=False, default=stored_handle) + "\n")
+        with open(INDEX_DIR / mapped_generation / "deltas.jsonl", "ab") as f:
+            f.write("".join(lines).encode("utf-8"))
+            deltas = f.tell()
+        write_current_generation(mapped_generation, deltas)
+        mapped_deltas = deltas
+
+def rank_documents(query: str) -> List[Tuple[Dict[str, Any], float]]:
+    """All documents matching the query with their scores, best first"""
+    terms, phrases = parse_query(query)
+    with index_lock:
+        index = get_search_index()
+        return [(index.docs[doc_num], score) for doc_num, score in index.search(terms, phrases)]
+
+def search_documents_by_content(query: str, limit: int = 10, offset: int = 0,
+                                fields: Tuple[str, ...] = DEFAULT_SEARCH_FIELDS,
+                                filters: Optional[Dict[str, List[str]]] = None,
+                                facets: Optional[List[str]] = None
+                                ) -> Tuple[List[Dict[str, Any]], int, Dict[str, Dict[str, int]]]:
+    """One page of search hits with the selected fields, the total number of hits
+    and per-value counts over all hits for the requested facets
+    
+    Hits carry a highlighted snippet instead of the full content unless
+    "content" is among the fields.
+    """
+    terms, phrases = parse_query(query)
+    highlighted = list(dict.fromkeys(terms + [token for phrase in phrases for token in phrase]))
+    results = []
+    # Held throughout so documents cannot be tombstoned mid-page
+    with index_lock:
+        index = get_search_index()
+        within = index.facets.match(filters) if filters else None
+        ranked = index.search(terms, phrases, within)
+        facet_counts = index.facets.counts(index.facets.mask([doc_num for doc_num, _ in ranked]), facets) if facets else {}
+        for doc_num, score in ranked[offset:offset + limit]:
+            result = document_summary(index.docs[doc_num], fields)
+            if "similarity_score" in fields:
+                result["similarity_score"] = round(score, 4)
+            if "snippet" in fields:
+                result["snippet"] = index.snippet(doc_num, highlighted)
+            results.append(result)
+    return results, len(ranked), facet_counts
+
+# Sampled profiling is off unless PROFILE_SAMPLE_RATE is set or configure_profiling is called
+profiler = ToolProfiler(
+    os.environ.get("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "document-analyzer-profiles")),
+    float(os.environ.get("PROFILE_SAMPLE_RATE", "0")),
+    [tool for tool in os.environ.get("PROFILE_TOOLS", "").split(",") if tool],
+    int(os.environ.get("PROFILE_MAX_FILES", PROFILE_MAX_FILES))
+)
+
+# Process-wide tool metrics; set METRICS_PROMETHEUS_FILE to also dump Prometheus text
+metrics = ToolMetrics(os.environ.get("METRICS_PROMETHEUS_FILE"), prefix="document_analyzer", profiler=profiler)
+if metrics.dump_file is not None:
+    atexit.register(metrics.dump_prometheus)
+
+# analyze_document results already live in analysis_cache, so its calls are only coalesced
+analysis_flights = SingleFlightCache("document_analysis_flights", lambda: documents_version, ttl=0, metrics=metrics)
+# Served until it expires or any document changes
+search_results = SingleFlightCache("search_results", lambda: documents_version, metrics=metrics)
+
+# Load NLP resources and documents on startup
+nlp.load()
+for name, seconds in nlp.load_seconds.items():
+    metrics.record_load(name, seconds, nlp.errors.get(name))
+started = time.perf_counter()
 load_documents()
+metrics.record_load("documents", time.perf_counter() - started)
 
-# MCP Tools Implementation
+# MCP Tools Implementation (each tool is wrapped by metrics.instrument)
 
 @mcp.tool
+@metrics.instrument
 def analyze_document(document_id: str) -> Dict[str, Any]:
     """
     Perform comprehensive analysis of a document by ID.
@@ -236,7 +1604,20 @@ def analyze_document(document_id: str) -> Dict[str, Any]:
     if not doc:
         return {"error": f"Document with ID '{document_id}' not found"}
     
-    content = doc["content"]
+    with analysis_cache_lock:
+        cached = analysis_cache.get(document_id)
+        if cached is not None:
+            analysis_cache.move_to_end(document_id)
+    metrics.count_cache("document_analysis", cached is not None)
+    if cached is not None:
+        return cached
+    return analysis_flights.run(document_id, lambda: analyze_stored_document(doc))
+
+def analyze_stored_document(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Full analysis of a stored document, cached until the document changes"""
+    version = documents_version
+    document_id = doc["id"]
+    content = document_content(doc)
     
     # Perform all analyses
     sentiment = calculate_sentiment(content)
@@ -244,7 +1625,7 @@ def analyze_document(document_id: str) -> Dict[str, Any]:
     readability = calculate_readability(content)
     basic_stats = calculate_basic_stats(content)
     
-    return {
+    result = {
         "document_id": document_id,
         "title": doc["title"],
         "author": doc.get("author", "Unknown"),
@@ -257,8 +1638,18 @@ def analyze_document(document_id: str) -> Dict[str, Any]:
         },
         "metadata": doc.get("metadata", {})
     }
+    
+    # Cached until the document changes (see unregister_document), unless it
+    # already did while this ran
+    with analysis_cache_lock:
+        if documents_version == version:
+            analysis_cache[document_id] = result
+            if len(analysis_cache) > ANALYSIS_CACHE_SIZE:
+                analysis_cache.popitem(last=False)
+    return result
 
 @mcp.tool
+@metrics.instrument
 def get_sentiment(text: str) -> Dict[str, Any]:
     """
     Analyze sentiment of any text.
@@ -275,6 +1666,7 @@ def get_sentiment(text: str) -> Dict[str, Any]:
     return calculate_sentiment(text)
 
 @mcp.tool
+@metrics.instrument
 def extract_keywords(text: str, limit: int = 10) -> Dict[str, Any]:
     """
     Extract top keywords from text.
@@ -299,7 +1691,27 @@ def extract_keywords(text: str, limit: int = 10) -> Dict[str, Any]:
         "limit_applied": limit
     }
 
+# Fields update_document may change; source and language live under metadata
+UPDATABLE_FIELDS = ("title", "content", "author", "category", "date", "tags", "source", "language")
+
+def check_document_fields(values: Dict[str, Any]) -> Optional[str]:
+    """Error message for an invalid value among UPDATABLE_FIELDS, if any"""
+    for name in UPDATABLE_FIELDS:
+        if name not in values:
+            continue
+        value = values[name]
+        if name == "tags":
+            if not isinstance(value, list) or not all(isinstance(tag, str) for tag in value):
+                return "Field 'tags' must be a list of strings"
+        elif not isinstance(value, str):
+            return f"Field '{name}' must be a string"
+        elif name in ("title", "content") and not value.strip():
+            return f"Field '{name}' cannot be empty"
+    return None
+
 @mcp.tool
+@metrics.instrument
+@holding_documents_lock
 def add_document(document_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Add a new document to the collection.
@@ -310,15 +1722,16 @@ def add_document(document_data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Success message with document ID
     """
-    required_fields = ["title", "content"]
-    for field in required_fields:
-        if field not in document_data or not document_data[field].strip():
+    for field in ("title", "content"):
+        if field not in document_data:
             return {"error": f"Required field '{field}' is missing or empty"}
+    error = check_document_fields(document_data)
+    if error:
+        return {"error": error}
     
     # Generate new document ID
-    existing_ids = [doc["id"] for doc in documents_data.get("documents", [])]
     doc_num = 1
-    while f"doc_{doc_num:03d}" in existing_ids:
+    while f"doc_{doc_num:03d}" in documents_by_id:
         doc_num += 1
     
     new_doc_id = f"doc_{doc_num:03d}"
@@ -327,7 +1740,7 @@ def add_document(document_data: Dict[str, Any]) -> Dict[str, Any]:
     new_doc = {
         "id": new_doc_id,
         "title": document_data["title"],
-        "content": document_data["content"],
+        "content": content_store.put(document_data["content"]),
         "author": document_data.get("author", "Unknown"),
         "category": document_data.get("category", "Uncategorized"),
         "date": document_data.get("date", datetime.now().strftime("%Y-%m-%d")),
@@ -348,71 +1761,251 @@ def add_document(document_data: Dict[str, Any]) -> Dict[str, Any]:
     # Save to file
     try:
         save_documents()
-        return {
-            "success": True,
-            "message": f"Document added successfully with ID: {new_doc_id}",
-            "document_id": new_doc_id
-        }
     except Exception as e:
         # Remove the document if save failed
-        documents_data["documents"] = [doc for doc in documents_data["documents"] if doc["id"] != new_doc_id]
+        documents_data["documents"].pop()
+        return {"error": f"Failed to save document: {str(e)}"}
+    
+    register_document(new_doc)
+    change_log.record(new_doc_id, ACTION_CREATED)
+    return {
+        "success": True,
+        "message": f"Document added successfully with ID: {new_doc_id}",
+        "document_id": new_doc_id
+    }
+
+@mcp.tool
+@metrics.instrument
+@holding_documents_lock
+def update_document(document_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Update fields of an existing document.
+    
+    Args:
+        document_id: The ID of the document to update
+        updates: New values for any of title, content, author, category, date, tags,
+            source and language
+    
+    Returns:
+        Success message with the updated fields
+    """
+    doc = get_document_by_id(document_id)
+    if not doc:
+        return {"error": f"Document with ID '{document_id}' not found"}
+    
+    if not updates:
+        return {"error": "No updates provided"}
+    
+    unknown = [name for name in updates if name not in UPDATABLE_FIELDS]
+    if unknown:
+        return {"error": f"Fields {unknown} cannot be updated. Must be among: {list(UPDATABLE_FIELDS)}"}
+    
+    error = check_document_fields(updates)
+    if error:
+        return {"error": error}
+    
+    # Documents are replaced, not mutated, so derived structures can drop the old version
+    updated = dict(doc)
+    updated["metadata"] = dict(doc.get("metadata", {}))
+    for name, value in updates.items():
+        if name in ("source", "language"):
+            updated["metadata"][name] = value
+        else:
+            updated[name] = value
+    if "content" in updates:
+        updated["content"] = content_store.put(updates["content"])
+        updated["metadata"]["word_count"] = len(updates["content"].split())
+    
+    docs = documents_data["documents"]
+    position = next(i for i, stored in enumerate(docs) if stored is doc)
+    docs[position] = updated
+    
+    try:
+        save_documents()
+    except Exception as e:
+        docs[position] = doc
         return {"error": f"Failed to save document: {str(e)}"}
+    
+    unregister_document(doc)
+    register_document(updated)
+    change_log.record(document_id, ACTION_UPDATED)
+    maybe_compact_content()
+    return {
+        "success": True,
+        "message": f"Document {document_id} updated successfully",
+        "document_id": document_id,
+        "updated_fields": list(updates)
+    }
+
+@mcp.tool
+@metrics.instrument
+@holding_documents_lock
+def delete_document(document_id: str) -> Dict[str, Any]:
+    """
+    Delete a document from the collection.
+    
+    Args:
+        document_id: The ID of the document to delete
+    
+    Returns:
+        Success message
+    """
+    doc = get_document_by_id(document_id)
+    if not doc:
+        return {"error": f"Document with ID '{document_id}' not found"}
+    
+    docs = documents_data["documents"]
+    position = next(i for i, stored in enumerate(docs) if stored is doc)
+    del docs[position]
+    
+    try:
+        save_documents()
+    except Exception as e:
+        docs.insert(position, doc)
+        return {"error": f"Failed to save documents: {str(e)}"}
+    
+    unregister_document(doc)
+    change_log.record(document_id, ACTION_DELETED)
+    maybe_compact_content()
+    return {
+        "success": True,
+        "message": f"Document {document_id} deleted successfully",
+        "document_id": document_id
+    }
 
 @mcp.tool
-def search_documents(query: str, limit: int = 10) -> Dict[str, Any]:
+@metrics.instrument
+def search_documents(query: str, limit: int = 10, offset: int = 0,
+                     fields: Optional[List[str]] = None, filters: Optional[Dict[str, Any]] = None,
+                     facets: Optional[List[str]] = None) -> Dict[str, Any]:
     """
-    Search documents by content using semantic similarity.
+    Search documents by content, ranked by BM25 relevance.
     
     Args:
         query: Search query text
         limit: Maximum number of results to return (default: 10)
+        offset: Number of results to skip, for paging (default: 0)
+        fields: Fields to return per hit (default: metadata, similarity_score and snippet;
+            add "content" for the full text)
+        filters: Facet filters, e.g. {"category": "Technology", "tags": ["ai", "ethics"]};
+            facets are category, author, tags and month (YYYY-MM). A list matches any of
+            its values; different facets must all match
+        facets: Facets to count over all matching documents (default: none)
     
     Returns:
-        List of matching documents with similarity scores
+        One page of matching documents with similarity scores and snippets, and facet counts.
+        similarity_score is the BM25 score: higher is more relevant, but it is not bounded
+        to 0-1 and is only comparable between hits of the same query
     """
     if not query.strip():
         return {"error": "Search query cannot be empty"}
     
-    if limit < 1 or limit > 50:
-        return {"error": "Limit must be between 1 and 50"}
+    error = (check_page(offset, limit) or check_fields(fields, SEARCH_FIELDS)
+             or check_fields(facets, FACET_FIELDS))
+    if error:
+        return {"error": error}
     
-    results = search_documents_by_content(query, limit)
+    filters, error = normalize_filters(filters)
+    if error:
+        return {"error": error}
     
-    return {
+    fields = tuple(fields or DEFAULT_SEARCH_FIELDS)
+    key = (query, limit, offset, fields, tuple(sorted((facet, tuple(values)) for facet, values in filters.items())),
+           tuple(facets or ()))
+    return search_results.run(key, lambda: search_response(query, limit, offset, fields, filters, facets))
+
+def search_response(query: str, limit: int, offset: int, fields: Tuple[str, ...],
+                    filters: Dict[str, List[str]], facets: Optional[List[str]]) -> Dict[str, Any]:
+    """One page of search results as returned by search_documents"""
+    results, total, facet_counts = search_documents_by_content(query, limit, offset, fields, filters, facets)
+    
+    response = {
         "query": query,
         "results": results,
-        "total_found": len(results),
-        "limit_applied": limit
+        "limit_applied": limit,
+        **page_info(total, offset, len(results))
     }
+    if filters:
+        response["filters"] = filters
+    if facets:
+        response["facet_counts"] = facet_counts
+    return response
 
 @mcp.tool
-def get_document_list() -> Dict[str, Any]:
+@metrics.instrument
+def get_document_list(offset: int = 0, limit: int = 50, fields: Optional[List[str]] = None) -> Dict[str, Any]:
     """
-    Get a list of all available documents with basic information.
+    Get a page of available documents with basic information.
+    
+    Args:
+        offset: Number of documents to skip (default: 0)
+        limit: Maximum number of documents to return (default: 50)
+        fields: Fields to return per document (default: id, title, author, category,
+            date, word_count, tags)
     
     Returns:
-        List of all documents with metadata
+        One page of documents with metadata
     """
-    docs = documents_data.get("documents", [])
+    error = check_page(offset, limit) or check_fields(fields, DOCUMENT_FIELDS)
+    if error:
+        return {"error": error}
     
-    document_list = []
-    for doc in docs:
-        document_list.append({
-            "id": doc["id"],
-            "title": doc["title"],
-            "author": doc.get("author", "Unknown"),
-            "category": doc.get("category", "Uncategorized"),
-            "date": doc.get("date", "Unknown"),
-            "word_count": doc.get("metadata", {}).get("word_count", 0),
-            "tags": doc.get("tags", [])
-        })
+    docs = documents_data.get("documents", [])
+    selected = tuple(fields or DOCUMENT_FIELDS)
+    document_list = [document_summary(doc, selected) for doc in docs[offset:offset + limit]]
     
     return {
         "documents": document_list,
-        "total_count": len(document_list)
+        **page_info(len(docs), offset, len(document_list))
     }
 
 @mcp.tool
+@metrics.instrument
+def get_changes_since(version: int, limit: int = 50, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Get the documents added, updated or deleted after a version, to sync
+    deltas instead of re-reading get_document_list.
+    
+    Args:
+        version: The version returned by the previous call (0 to start)
+        limit: Maximum number of changes to return (default: 50)
+        fields: Fields to return per changed document, as in get_document_list
+    
+    Returns:
+        Each changed document once, at its latest change, and the version to
+        continue from. With resync true the changes since that version are no
+        longer kept: re-read the full list, then continue from the returned version
+    """
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        return {"error": f"Limit must be between 1 and {MAX_PAGE_SIZE}"}
+    
+    error = check_fields(fields, DOCUMENT_FIELDS)
+    if error:
+        return {"error": error}
+    
+    selected = tuple(fields or DOCUMENT_FIELDS)
+    with documents_lock:
+        changes = change_log.since(version)
+        if changes is None:
+            return {"version": change_log.version, "resync": True, "changes": [], "has_more": False}
+        
+        page = changes[:limit]
+        items = []
+        for change_version, doc_id, action in page:
+            item = {"version": change_version, "document_id": doc_id, "action": action}
+            if action != ACTION_DELETED:
+                item["document"] = document_summary(documents_by_id[doc_id], selected)
+            items.append(item)
+        has_more = len(changes) > limit
+        return {
+            "version": page[-1][0] if has_more else change_log.version,
+            "resync": False,
+            "changes": items,
+            "has_more": has_more
+        }
+
+@mcp.tool
+@metrics.instrument
 def get_document_stats() -> Dict[str, Any]:
     """
     Get overall statistics about the document collection.
@@ -420,24 +2013,14 @@ def get_document_stats() -> Dict[str, Any]:
     Returns:
         Statistics about the document collection
     """
-    docs = documents_data.get("documents", [])
-    
-    if not docs:
+    if not collection_stats.total_documents:
         return {"message": "No documents found"}
     
-    # Calculate statistics
-    total_docs = len(docs)
-    total_words = sum(doc.get("metadata", {}).get("word_count", 0) for doc in docs)
-    
-    categories: Dict[str, int] = {}
-    authors: Dict[str, int] = {}
-    
-    for doc in docs:
-        category = doc.get("category", "Uncategorized")
-        author = doc.get("author", "Unknown")
-        
-        categories[category] = categories.get(category, 0) + 1
-        authors[author] = authors.get(author, 0) + 1
+    # Statistics are maintained incrementally as documents change
+    total_docs = collection_stats.total_documents
+    total_words = collection_stats.total_words
+    categories = collection_stats.categories
+    authors = collection_stats.authors
     
     return {
         "total_documents": total_docs,
@@ -446,10 +2029,19 @@ def get_document_stats() -> Dict[str, Any]:
         "categories": dict(sorted(categories.items(), key=lambda x: x[1], reverse=True)),
         "authors": dict(sorted(authors.items(), key=lambda x: x[1], reverse=True)),
         "top_category": max(categories.items(), key=lambda x: x[1])[0] if categories else None,
-        "most_prolific_author": max(authors.items(), key=lambda x: x[1])[0] if authors else None
+        "most_prolific_author": max(authors.items(), key=lambda x: x[1])[0] if authors else None,
+        "content_storage": {
+            "raw_bytes": content_store.raw_bytes,
+            "compressed_bytes": content_store.stored_bytes,
+            "compression_ratio": round(content_store.raw_bytes / content_store.stored_bytes, 2)
+                                 if content_store.stored_bytes else 0,
+            "file_bytes": content_store.file_bytes,
+            "dictionary_bytes": len(content_store.dictionary)
+        }
     }
 
 @mcp.tool
+@metrics.instrument
 def analyze_text_batch(texts: List[str], analysis_type: str = "all") -> Dict[str, Any]:
     """
     Analyze multiple texts in batch.
@@ -504,6 +2096,212 @@ def analyze_text_batch(texts: List[str], analysis_type: str = "all") -> Dict[str
         "results": results
     }
 
+@mcp.tool
+def get_server_metrics(format: str = "json") -> Dict[str, Any]:
+    """
+    Get per-tool call counts, latency percentiles, errors, payload sizes and cache hit rates.
+    
+    Args:
+        format: "json" (default) or "prometheus" for Prometheus text format
+    
+    Returns:
+        Server metrics since startup
+    """
+    if format == "prometheus":
+        return {"format": "prometheus", "text": metrics.prometheus_text()}
+    if format != "json":
+        return {"error": "format must be 'json' or 'prometheus'"}
+    return metrics.report()
+
+@mcp.tool
+def configure_profiling(sample_rate: float, tools: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Turn sampled cProfile profiling of tool calls on or off.
+    
+    Args:
+        sample_rate: Fraction of calls to profile, 0 to 1 (0 disables profiling)
+        tools: Only profile these tools (default: all tools)
+    
+    Returns:
+        The profiling settings now in effect
+    """
+    try:
+        profiler.configure(sample_rate, tools)
+    except ValueError as e:
+        return {"error": str(e)}
+    return {"success": True, "profiling": profiler.settings()}
+
+@mcp.tool
+def get_profile_hotspots(limit: int = 20, sort: str = "cumulative", tool: Optional[str] = None,
+                         recent: int = 50) -> Dict[str, Any]:
+    """
+    Get the hottest functions across recently profiled tool calls.
+    
+    Args:
+        limit: Number of functions to return (default: 20)
+        sort: "cumulative", "total" (time in the function itself) or "calls"
+        tool: Only include profiles of this tool
+        recent: Number of most recent profiles to aggregate (default: 50)
+    
+    Returns:
+        Functions with call counts and total/cumulative milliseconds
+    """
+    if sort not in PROFILE_SORT_KEYS:
+        return {"error": f"sort must be one of: {list(PROFILE_SORT_KEYS)}"}
+    if limit < 1 or limit > 200 or recent < 1:
+        return {"error": "limit must be between 1 and 200 and recent at least 1"}
+    result = profiler.hotspots(limit, sort, tool, recent)
+    result["profiling"] = profiler.settings()
+    return result
+
+# Multi-process serving
+
+# Tools that change documents; they run one at a time across all workers
+WRITE_TOOLS = ("add_document", "update_document", "delete_document")
+
+def acquire_write_lock():
+    """Exclusive cross-process lock on WRITE_LOCK_FILE (blocks until held)"""
+    import fcntl
+    lock_file = open(WRITE_LOCK_FILE, "w")
+    fcntl.flock(lock_file, fcntl.LOCK_EX)
+    return lock_file
+
+class SharedStateMiddleware(Middleware):
+    """Keeps a worker on the newest published state
+    
+    Reads catch up before running. Writes hold the cross-process write lock,
+    apply the change to the freshest state, and publish it for the other
+    workers to apply. Catching up and publishing run in a thread, off the
+    event loop.
+    """
+    
+    def __init__(self):
+        self.write_lock = asyncio.Lock()
+    
+    async def on_call_tool(self, context, call_next):
+        if context.message.name not in WRITE_TOOLS:
+            if published_ahead() is not None:
+                await asyncio.to_thread(sync_shared_state)
+            return await call_next(context)
+        async with self.write_lock:
+            lock_file = await asyncio.to_thread(acquire_write_lock)
+            try:
+                await asyncio.to_thread(sync_shared_state)
+                version, logged = documents_version, change_log.version
+                result = await call_next(context)
+                if documents_version != version:
+                    await asyncio.to_thread(publish_shared_state, logged)
+                return result
+            finally:
+                lock_file.close()
+
+def run_worker(sock):
+    """Serve stateless HTTP on an inherited socket until shut down; never returns"""
+    import uvicorn
+    status = 0
+    try:
+        if metrics.dump_file is not None:
+            path = metrics.dump_file
+            metrics.dump_file = path.with_name(f"{path.stem}-{os.getpid()}{path.suffix}")
+        sync_shared_state()
+        mcp.add_middleware(SharedStateMiddleware())
+        app = mcp.http_app(transport="http", stateless_http=True)
+        uvicorn.Server(uvicorn.Config(app, lifespan="on", log_level="warning")).run(sockets=[sock])
+        if metrics.dump_file is not None:
+            metrics.dump_prometheus()
+    except BaseException as e:
+        print(f"Worker {os.getpid()} failed: {e}", file=sys.stderr)
+        status = 1
+    finally:
+        os._exit(status)
+
+def reload_and_publish() -> Optional[Dict[str, int]]:
+    """reload_changed_documents for serve_workers' parent: apply external edits
+    on top of the newest generation and publish the result to the workers"""
+    lock_file = acquire_write_lock()
+    try:
+        sync_shared_state()
+        logged = change_log.version
+        changes = reload_changed_documents()
+        if changes and any(changes.values()):
+            publish_shared_state(logged)
+        return changes
+    finally:
+        lock_file.close()
+
+def serve_workers(workers: int, host: str, port: int, reload_interval: float = 0):
+    """Serve HTTP from several forked worker processes sharing one socket
+    
+    The documents and index are published as a base generation first, so
+    workers start out mapping the same index and content files; gc.freeze keeps the objects
+    loaded before the fork out of collections, so their pages stay shared.
+    With a reload_interval, the parent watches the documents file and
+    publishes external edits. Unix only.
+    """
+    import signal
+    import socket
+    
+    load_documents()
+    publish_shared_state()
+    sock = socket.create_server((host, port), backlog=2048)
+    sock.set_inheritable(True)
+    print(f"Serving on http://{host}:{port}/mcp with {workers} workers", file=sys.stderr)
+    gc.freeze()
+    
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            run_worker(sock)
+        children.append(pid)
+    sock.close()
+    # Only after forking: threads do not survive a fork
+    if reload_interval:
+        watch_documents(reload_interval, reload_and_publish)
+    
+    def forward(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+    
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for pid in children:
+        os.waitpid(pid, 0)
+
+def main():
+    parser = argparse.ArgumentParser(description="Document Analyzer MCP server")
+    # Claude Desktop configs pass the user's allowed directories as positional arguments
+    parser.add_argument("allowed_directories", nargs="*",
+                        help="directories passed by the client configuration (accepted and ignored)")
+    parser.add_argument("--transport", choices=("stdio", "http", "sse"), default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes for --transport http (Unix only)")
+    parser.add_argument("--reload-interval", type=float,
+                        default=float(os.environ.get("DOCUMENTS_RELOAD_INTERVAL", "0")),
+                        help="seconds between checks for external edits of the documents file (0: off)")
+    args = parser.parse_args()
+    
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.reload_interval < 0:
+        parser.error("--reload-interval cannot be negative")
+    if args.workers > 1:
+        if args.transport != "http":
+            parser.error("--workers needs --transport http")
+        serve_workers(args.workers, args.host, args.port, args.reload_interval)
+        return
+    
+    if args.reload_interval:
+        watch_documents(args.reload_interval)
+    if args.transport == "stdio":
+        mcp.run()
+    else:
+        mcp.run(transport=args.transport, host=args.host, port=args.port)
+
 if __name__ == "__main__":
-    # Run the MCP server
-    mcp.run()
+    main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Basic tests for Document Analyzer Server
+"""
+
+import sys
+import os
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import server
+from server import ContentStore, MappedSearchIndex, SearchIndex, parse_query, write_mapped_index
+
+SAMPLE_FILE = Path(__file__).parent.parent / "data" / "sample_content.json"
+
+def call(tool, *args, **kwargs):
+    """Call an MCP tool function directly"""
+    return getattr(tool, "fn", tool)(*args, **kwargs)
+
+def use_temp_documents(directory: Path):
+    """Point the server at a copy of the sample documents in directory and load it"""
+    server.DOCUMENTS_FILE = directory / "sample_content.json"
+    server.INDEX_DIR = directory / "sample_content.index"
+    server.WRITE_LOCK_FILE = directory / "sample_content.lock"
+    shutil.copy(SAMPLE_FILE, server.DOCUMENTS_FILE)
+    server.load_documents()
+
+def add(title, content, **fields):
+    result = call(server.add_document, dict(fields, title=title, content=content))
+    assert result.get("success"), result
+    return result["document_id"]
+
+def test_bm25_ranking_and_snippets(tmp_path):
+    """Test BM25 ranking favours frequent terms in short documents, with highlighted snippets"""
+    print("Testing BM25 ranking and snippets...")
+
+    use_temp_documents(tmp_path)
+    padding = " ".join(f"filler{i}" for i in range(200))
+    sparse = add("Sparse", f"One quokka appears here. {padding}")
+    dense = add("Dense", "The quokka met another quokka near a quokka colony.")
+
+    response = call(server.search_documents, "quokka")
+    ids = [hit["id"] for hit in response["results"]]
+    assert ids == [dense, sparse], "More occurrences in a shorter document should rank first"
+    scores = [hit["similarity_score"] for hit in response["results"]]
+    assert scores == sorted(scores, reverse=True) and scores[0] > 1, "Scores are unbounded BM25"
+    assert "**quokka**" in response["results"][0]["snippet"]
+
+    # Snippets are cut from the window holding the match, not the start of the text
+    snippet = response["results"][1]["snippet"]
+    assert "**quokka**" in snippet and "filler199" not in snippet
+
+    print("✓ BM25 ranking and snippets test passed")
+
+def test_phrase_queries(tmp_path):
+    """Test quoted phrases only match consecutive tokens"""
+    print("Testing phrase queries...")
+
+    use_temp_documents(tmp_path)
+    phrase = add("Phrase", "A red panda sanctuary opened downtown.")
+    add("Scattered", "The panda was not red at all.")
+
+    assert parse_query('"red panda" sanctuary') == (["sanctuary", "red", "panda"], [["red", "panda"]])
+    response = call(server.search_documents, '"red panda"')
+    assert [hit["id"] for hit in response["results"]] == [phrase]
+    assert call(server.search_documents, "red panda")["total"] == 2
+
+    print("✓ Phrase queries test passed")
+
+def test_facet_filters_and_counts(tmp_path):
+    """Test facet filters restrict hits and facet counts cover every hit"""
+    print("Testing facet filters and counts...")
+
+    use_temp_documents(tmp_path)
+    everything = call(server.search_documents, "the", limit=50, facets=["category", "month"])
+    counts = everything["facet_counts"]
+    assert sum(counts["category"].values()) == everything["total"]
+    assert counts["month"]["2024-03"] == sum(
+        1 for hit in everything["results"] if hit["date"].startswith("2024-03"))
+
+    filtered = call(server.search_documents, "the", limit=50, filters={"category": "Technology"})
+    assert filtered["total"] == counts["category"]["Technology"]
+    assert all(hit["category"] == "Technology" for hit in filtered["results"])
+
+    both = call(server.search_documents, "the", limit=50,
+                filters={"category": ["Technology", "Science"], "tags": "blockchain"})
+    assert [hit["id"] for hit in both["results"]] == ["doc_016"], "Different facets must all match"
+
+    assert "error" in call(server.search_documents, "the", filters={"colour": "red"})
+
+    print("✓ Facet filters and counts test passed")
+
+def test_update_delete_and_compaction(tmp_path):
+    """Test updates and deletes tombstone documents until compaction rebuilds the index"""
+    print("Testing update, delete and compaction...")
+
+    use_temp_documents(tmp_path)
+    call(server.search_documents, "energy")
+
+    assert call(server.update_document, "doc_002", {"title": "Wombat energy", "content": "Wombats store energy."})["success"]
+    assert "error" in call(server.update_document, "doc_003", {"tags": "food"})
+    # The update and seven deletes leave eight tombstones, enough to start a compaction
+    for doc_id in ("doc_004", "doc_005", "doc_006", "doc_007", "doc_008", "doc_009", "doc_010"):
+        assert call(server.delete_document, doc_id)["success"]
+    assert "error" in call(server.delete_document, "doc_004")
+
+    # Tombstoned documents already drop out of document frequencies, before compaction
+    documents = server.documents_data["documents"]
+    tombstoned = SearchIndex.build(documents)
+    tombstoned.remove("doc_001")
+    live = SearchIndex.build([doc for doc in documents if doc["id"] != "doc_001"])
+    terms, phrases = parse_query("the")
+    assert ([(tombstoned.docs[num]["id"], score) for num, score in tombstoned.search(terms, phrases)]
+            == [(live.docs[num]["id"], score) for num, score in live.search(terms, phrases)])
+
+    if server.compaction_thread is not None:
+        server.compaction_thread.join()
+    index = server.get_search_index()
+    assert index.tombstones == 0, "Compaction should drop the tombstones"
+
+    expected = SearchIndex.build(server.documents_data["documents"])
+    for query in ("energy", "wombats", "the", "sustainability"):
+        terms, phrases = parse_query(query)
+        ranked = [(index.docs[num]["id"], score) for num, score in index.search(terms, phrases)]
+        assert ranked == [(expected.docs[num]["id"], score) for num, score in expected.search(terms, phrases)], query
+    assert call(server.search_documents, "wombats")["results"][0]["title"] == "Wombat energy"
+    assert call(server.get_document_stats)["total_documents"] == 10
+
+    with open(server.DOCUMENTS_FILE) as f:
+        assert len(json.load(f)["documents"]) == 10
+
+    print("✓ Update, delete and compaction test passed")
+
+def test_mapped_index_parity(tmp_path):
+    """Test the memory-mapped index answers exactly like the in-memory one"""
+    print("Testing mapped index parity...")
+
+    use_temp_documents(tmp_path)
+    index = SearchIndex.build(server.documents_data["documents"])
+    write_mapped_index(index, tmp_path / "generation")
+    mapped = MappedSearchIndex(tmp_path / "generation", server.documents_by_id)
+
+    for query in ("energy", "sustainability the", '"machine learning"', "mars exploration"):
+        terms, phrases = parse_query(query)
+        expected = index.search(terms, phrases)
+        actual = mapped.search(terms, phrases)
+        assert [doc_num for doc_num, _ in actual] == [doc_num for doc_num, _ in expected], query
+        assert all(abs(a - b) < 1e-9 for (_, a), (_, b) in zip(actual, expected)), query
+        for doc_num, _ in expected:
+            assert mapped.snippet(doc_num, terms) == index.snippet(doc_num, terms)
+
+    filters = {"category": ["Technology"], "tags": ["ethics"]}
+    assert list(np.flatnonzero(mapped.facets.match(filters))) == list(np.flatnonzero(index.facets.match(filters)))
+    assert mapped.facets.counts(mapped.facets.mask(), ["author"]) == index.facets.counts(index.facets.mask(), ["author"])
+
+    print("✓ Mapped index parity test passed")
+
+def test_shared_state_deltas(tmp_path):
+    """Test writes are published as deltas that another worker applies on its mapped index"""
+    print("Testing shared state deltas...")
+
+    use_temp_documents(tmp_path)
+    server.publish_shared_state()
+    base = server.read_current_generation()["generation"]
+    assert isinstance(server.get_search_index(), MappedSearchIndex)
+
+    # One write, published as one delta line on the same base generation
+    logged = server.change_log.version
+    new_id = add("Shared", "Narwhals share the mapped index.")
+    call(server.delete_document, "doc_001")
+    server.publish_shared_state(logged)
+    current = server.read_current_generation()
+    assert current["generation"] == base and current["deltas"] > 0
+    assert len((server.INDEX_DIR / base / "deltas.jsonl").read_bytes().splitlines()) == 2
+
+    # Another worker maps the base and applies the deltas without reindexing the rest
+    writer = (call(server.search_documents, "narwhals")["results"], call(server.get_changes_since, logged))
+    server.mapped_generation = None
+    server.sync_shared_state()
+    index = server.get_search_index()
+    assert isinstance(index, MappedSearchIndex) and index.base_docs == 17
+    assert (call(server.search_documents, "narwhals")["results"], call(server.get_changes_since, logged)) == writer
+    assert "doc_001" not in server.documents_by_id
+    assert server.document_content(server.documents_by_id[new_id]) == "Narwhals share the mapped index."
+
+    # Enough changes since the base publish a new one
+    for doc_id in ("doc_002", "doc_003", "doc_004", "doc_005", "doc_006"):
+        logged = server.change_log.version
+        call(server.delete_document, doc_id)
+        server.publish_shared_state(logged)
+    assert server.read_current_generation() == {"generation": base, "deltas": server.mapped_deltas}
+    logged = server.change_log.version
+    call(server.delete_document, "doc_007")
+    server.publish_shared_state(logged)
+    assert server.read_current_generation()["generation"] != base
+    assert server.get_search_index().tombstones == 0
+    assert call(server.get_document_stats)["total_documents"] == 11
+
+    print("✓ Shared state deltas test passed")
+
+def test_content_compression_round_trip(tmp_path):
+    """Test stored bodies read back unchanged and dropped ones are reclaimed"""
+    print("Testing content compression round trip...")
+
+    texts = ["Plain ASCII text about energy and energy storage. " * 20,
+             "Unicode: café, naïve, 東京, emoji 🚀.", ""]
+    store = ContentStore(texts)
+    handles = [store.put(text) for text in texts]
+    assert [store.read(handle) for handle in handles] == texts
+
+    copy = ContentStore([], dictionary=store.dictionary)
+    assert copy.read(copy.copy(handles[1])) == texts[1]
+
+    # Bodies longer than a block come back whole and by byte range
+    long_text = "".join(f"Block {i}: café 東京 energy storage. " for i in range(3000))
+    raw = long_text.encode("utf-8")
+    long_handle = store.put(long_text)
+    assert long_handle.blocks is not None and len(long_handle.blocks) > 2
+    assert store.read(long_handle) == long_text
+    for start, end in [(0, 10), (server.CONTENT_BLOCK_SIZE - 5, server.CONTENT_BLOCK_SIZE + 5),
+                       (len(raw) - 7, len(raw))]:
+        assert store.read_range(long_handle, start, end) == raw[start:end]
+    assert copy.read(copy.copy(long_handle)) == long_text
+    store.retain(long_handle)
+    store.retain(long_handle, -1)
+
+    for handle in handles:
+        store.retain(handle)
+    assert store.raw_bytes == sum(len(text.encode("utf-8")) for text in texts)
+    assert store.stored_bytes < store.raw_bytes, "Repetitive text should compress"
+    store.retain(handles[0], -1)
+    assert store.raw_bytes == sum(len(text.encode("utf-8")) for text in texts[1:])
+
+    # Through the tools: the saved file keeps plain text, and stats count live bodies only
+    use_temp_documents(tmp_path)
+    before = call(server.get_document_stats)["content_storage"]["raw_bytes"]
+    doc_id = add("Round trip", texts[1])
+    assert server.document_content(server.documents_by_id[doc_id]) == texts[1]
+    with open(server.DOCUMENTS_FILE, encoding="utf-8") as f:
+        saved = {doc["id"]: doc for doc in json.load(f)["documents"]}
+    assert saved[doc_id]["content"] == texts[1]
+    call(server.delete_document, doc_id)
+    assert call(server.get_document_stats)["content_storage"]["raw_bytes"] == before
+
+    # A snippet deep in a long body reads only the blocks under its window
+    doc_id = add("Long", long_text + " Axolotls regrow limbs.")
+    call(server.search_documents, "axolotls", fields=["id"])
+    reads = []
+    read = ContentStore.read
+    ContentStore.read = lambda self, content: reads.append(content) or read(self, content)
+    try:
+        found = call(server.search_documents, "axolotls", fields=["snippet"])
+    finally:
+        ContentStore.read = read
+    assert not reads, "Snippets should not decompress whole bodies"
+    assert found["results"][0]["snippet"].endswith("**Axolotls** regrow limbs.")
+    call(server.delete_document, doc_id)
+
+    print("✓ Content compression round trip test passed")
+
+def test_incremental_reload(tmp_path):
+    """Test external edits of the documents file are applied by document ID"""
+    print("Testing incremental reload...")
+
+    use_temp_documents(tmp_path)
+    assert server.reload_changed_documents() is None, "An unchanged file should not be reloaded"
+    unchanged = server.documents_by_id["doc_005"]
+
+    with open(server.DOCUMENTS_FILE, encoding="utf-8") as f:
+        data = json.load(f)
+    documents = data["documents"]
+    documents[0]["title"] = "Edited outside"
+    documents[1]["content"] = "Axolotls regrow limbs."
+    del documents[2]
+    documents.append(dict(documents[3], id="doc_900", title="Appended"))
+    with open(server.DOCUMENTS_FILE, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+    assert server.reload_changed_documents() == {"added": 1, "updated": 2, "removed": 1}
+    assert server.documents_by_id["doc_005"] is unchanged, "Unchanged documents should be kept"
+    assert "doc_003" not in server.documents_by_id
+    assert call(server.search_documents, "axolotls")["results"][0]["id"] == "doc_002"
+    assert call(server.get_document_stats)["total_documents"] == 17
+    assert server.reload_changed_documents() is None, "Applied edits should not be reloaded twice"
+
+    # Our own saves are not mistaken for external edits
+    add("Own write", "Written by the server.")
+    assert server.reload_changed_documents() is None
+
+    print("✓ Incremental reload test passed")
+
+def test_change_feed_paging(tmp_path):
+    """Test get_changes_since pages through each changed document once"""
+    print("Testing change feed paging...")
+
+    use_temp_documents(tmp_path)
+    start = call(server.get_changes_since, 0)
+    assert start["resync"] and start["changes"] == []
+    version = start["version"]
+
+    new_id = add("Feed", "First version.")
+    call(server.update_document, new_id, {"content": "Second version."})
+    call(server.update_document, "doc_001", {"category": "Robotics"})
+    call(server.delete_document, "doc_002")
+
+    page = call(server.get_changes_since, version, limit=2, fields=["id", "category"])
+    assert page["has_more"] and not page["resync"]
+    assert [(c["document_id"], c["action"]) for c in page["changes"]] == [(new_id, "updated"), ("doc_001", "updated")]
+    assert page["changes"][1]["document"] == {"id": "doc_001", "category": "Robotics"}
+
+    rest = call(server.get_changes_since, page["version"], limit=2)
+    assert [(c["document_id"], c["action"]) for c in rest["changes"]] == [("doc_002", server.ACTION_DELETED)]
+    assert "document" not in rest["changes"][0] and not rest["has_more"]
+    assert call(server.get_changes_since, rest["version"])["changes"] == []
+
+    # A full load forgets the log, so older versions resync
+    server.load_documents()
+    assert call(server.get_changes_since, rest["version"])["resync"]
+
+    print("✓ Change feed paging test passed")
+
+def run_all_tests():
+    """Run all tests, each in its own scratch directory"""
+    print("Running Document Analyzer Tests")
+    print("="*40)
+
+    try:
+        for test in (test_bm25_ranking_and_snippets,
+                     test_phrase_queries,
+                     test_facet_filters_and_counts,
+                     test_update_delete_and_compaction,
+                     test_mapped_index_parity,
+                     test_shared_state_deltas,
+                     test_content_compression_round_trip,
+                     test_incremental_reload,
+                     test_change_feed_paging):
+            with tempfile.TemporaryDirectory() as temp_dir:
+                test(Path(temp_dir))
+
+        print("\n" + "="*40)
+        print("🎉 All tests passed!")
+        print("="*40)
+        return True
+
+    except Exception as e:
+        print(f"\n✗ Test failed: {e}")
+        print("="*40)
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
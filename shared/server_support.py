@@ -0,0 +1,561 @@
+"""
+Shared support for the MCP servers in this repository
+
+Each server puts this directory on sys.path and imports what it needs;
+nothing here knows about documents or meetings.
+"""
+
+import asyncio
+import bisect
+import concurrent.futures
+import cProfile
+import inspect
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import wraps
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Servers on stdio keep stdout for the protocol; logging goes to stderr
+logger = logging.getLogger(__name__)
+
+# Latency histogram bucket bounds in seconds (Prometheus "le" labels)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Response payload sizes are measured on one call in this many
+PAYLOAD_SAMPLE_EVERY = 10
+# Minimum seconds between Prometheus text dumps (see METRICS_PROMETHEUS_FILE)
+METRICS_DUMP_INTERVAL = 15.0
+
+@dataclass(slots=True)
+class ToolStats:
+    """Counters and latency histogram for one tool"""
+    calls: int = 0
+    errors: int = 0
+    error_responses: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    # One count per LATENCY_BUCKETS bound plus an overflow bucket
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    payload_samples: int = 0
+    payload_bytes: int = 0
+    payload_max_bytes: int = 0
+    
+    def observe(self, seconds: float):
+        self.calls += 1
+        self.total_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+    
+    def observe_payload(self, result: Any):
+        size = len(json.dumps(result, default=str))
+        self.payload_samples += 1
+        self.payload_bytes += size
+        if size > self.payload_max_bytes:
+            self.payload_max_bytes = size
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the histogram bucket holding the q-th quantile, capped at the max"""
+        if not self.calls:
+            return None
+        rank = q * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_seconds)
+        return self.max_seconds
+
+# Most recent profile files kept in the profile directory
+PROFILE_MAX_FILES = 200
+PROFILE_SORT_KEYS = {"cumulative": 3, "total": 2, "calls": 1}
+
+class ToolProfiler:
+    """Opt-in cProfile sampling of tool calls
+    
+    A ``sample_rate`` fraction of calls (optionally only for ``tools``) run
+    under cProfile; each sampled call is written as a pstats file to
+    ``directory``, which keeps only the newest ``max_files``.  Disabled (rate
+    0) it costs one attribute check per call.  One call is profiled at a
+    time; calls that overlap a profiled one are not sampled.
+    """
+    
+    def __init__(self, directory: str, sample_rate: float = 0.0,
+                 tools: Optional[List[str]] = None, max_files: int = PROFILE_MAX_FILES):
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self.sample_rate = 0.0
+        self.tools: Optional[set] = None
+        self._lock = threading.Lock()
+        self.configure(sample_rate, tools)
+    
+    def configure(self, sample_rate: float, tools: Optional[List[str]] = None):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.sample_rate = sample_rate
+        self.tools = set(tools) if tools else None
+    
+    def settings(self) -> Dict[str, Any]:
+        return {
+            "sample_rate": self.sample_rate,
+            "tools": sorted(self.tools) if self.tools else None,
+            "directory": str(self.directory),
+            "max_files": self.max_files
+        }
+    
+    def start(self, tool: str) -> Optional[cProfile.Profile]:
+        """Begin profiling this call if it is sampled"""
+        if not self.sample_rate or (self.tools is not None and tool not in self.tools):
+            return None
+        if random.random() >= self.sample_rate or not self._lock.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active in this process
+            self._lock.release()
+            return None
+        return profile
+    
+    def finish(self, tool: str, profile: cProfile.Profile):
+        """Stop profiling and write the call's stats, rotating old files out"""
+        profile.disable()
+        self._lock.release()
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(self.directory / f"{time.time_ns()}-{tool}.prof")
+            for stale in self.profile_files()[:-self.max_files]:
+                stale.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not write profile to {self.directory}: {e}")
+    
+    def profile_files(self, tool: Optional[str] = None) -> List[Path]:
+        """Profile files, oldest first (names start with a nanosecond timestamp)"""
+        if not self.directory.is_dir():
+            return []
+        files = sorted(self.directory.glob("*.prof"))
+        if tool:
+            files = [path for path in files if path.stem.split("-", 1)[-1] == tool]
+        return files
+    
+    def hotspots(self, limit: int = 20, sort: str = "cumulative", tool: Optional[str] = None,
+                 recent: int = 50) -> Dict[str, Any]:
+        """Top functions aggregated over the most recent profiled calls"""
+        files = self.profile_files(tool)[-recent:]
+        if not files:
+            return {"profiles": 0, "functions": []}
+        
+        stats = pstats.Stats(str(files[0]))
+        for path in files[1:]:
+            stats.add(str(path))
+        
+        column = PROFILE_SORT_KEYS[sort]
+        ranked = sorted(stats.stats.items(), key=lambda item: item[1][column], reverse=True)
+        functions = []
+        for (filename, line, name), (primitive, calls, total, cumulative, _) in ranked[:limit]:
+            functions.append({
+                "function": name,
+                "location": f"{filename}:{line}",
+                "calls": calls,
+                "primitive_calls": primitive,
+                "total_ms": round(total * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3)
+            })
+        return {"profiles": len(files), "sort": sort, "functions": functions}
+
+class ToolMetrics:
+    """Per-tool call counts, latency histograms, errors, payload sizes and cache hit rates
+    
+    The per-call cost is two perf_counter reads, a dict lookup and a bisect;
+    payload sizes are sampled.  When ``dump_file`` is set, a Prometheus text
+    exposition is rewritten at most every ``dump_interval`` seconds.
+    """
+    
+    def __init__(self, dump_file: Optional[str] = None, dump_interval: float = METRICS_DUMP_INTERVAL,
+                 prefix: str = "mcp", profiler: Optional[ToolProfiler] = None):
+        self.prefix = prefix
+        self.profiler = profiler
+        self.tools: Dict[str, ToolStats] = {}
+        self.caches: Dict[str, List[int]] = {}
+        self.cache_sources: Dict[str, Any] = {}
+        self.resources: Dict[str, Dict[str, Any]] = {}
+        self.started = time.monotonic()
+        self.dump_file = Path(dump_file) if dump_file else None
+        self.dump_interval = dump_interval
+        self._next_dump = 0.0
+    
+    def instrument(self, func):
+        """Wrap a tool function (sync or async) to record its metrics (and sampled profiles)"""
+        name = func.__name__
+        stats = self.tools.setdefault(name, ToolStats())
+        
+        def finish(started: float, result: Any):
+            stats.observe(time.perf_counter() - started)
+            if isinstance(result, dict) and "error" in result:
+                stats.error_responses += 1
+            if stats.calls % PAYLOAD_SAMPLE_EVERY == 1:
+                stats.observe_payload(result)
+            if self.dump_file is not None and time.monotonic() >= self._next_dump:
+                self.dump_prometheus()
+        
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                profile = self.profiler.start(name) if self.profiler is not None else None
+                started = time.perf_counter()
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception:
+                    stats.errors += 1
+                    stats.observe(time.perf_counter() - started)
+                    raise
+                finally:
+                    if profile is not None:
+                        self.profiler.finish(name, profile)
+                finish(started, result)
+                return result
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                profile = self.profiler.start(name) if self.profiler is not None else None
+                started = time.perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                except Exception:
+                    stats.errors += 1
+                    stats.observe(time.perf_counter() - started)
+                    raise
+                finally:
+                    if profile is not None:
+                        self.profiler.finish(name, profile)
+                finish(started, result)
+                return result
+        return wrapper
+    
+    def count_cache(self, name: str, hit: bool):
+        """Record a hit or miss for a named cache"""
+        counts = self.caches.get(name)
+        if counts is None:
+            counts = self.caches[name] = [0, 0]
+        counts[0 if hit else 1] += 1
+    
+    def register_cache(self, name: str, info):
+        """Report a cache that keeps its own counters (e.g. functools.lru_cache's cache_info)"""
+        self.cache_sources[name] = info
+    
+    def record_load(self, name: str, seconds: float, error: Optional[str] = None):
+        """Record how long a startup resource took to load (and why it failed, if it did)"""
+        self.resources[name] = {"load_ms": round(seconds * 1000, 3), "loaded": error is None}
+        if error is not None:
+            self.resources[name]["error"] = error
+    
+    def cache_counts(self) -> Dict[str, Tuple[int, int]]:
+        counts = {name: (hits, misses) for name, (hits, misses) in self.caches.items()}
+        for name, info in self.cache_sources.items():
+            stats = info()
+            counts[name] = (stats.hits, stats.misses)
+        return counts
+    
+    def report(self) -> Dict[str, Any]:
+        """Metrics as a JSON-serializable dict"""
+        uptime = time.monotonic() - self.started
+        tools = {}
+        for name, stats in self.tools.items():
+            if not stats.calls:
+                continue
+            tools[name] = {
+                "calls": stats.calls,
+                "calls_per_second": round(stats.calls / uptime, 4) if uptime else 0,
+                "errors": stats.errors,
+                "error_responses": stats.error_responses,
+                "latency_ms": {
+                    "mean": round(stats.total_seconds / stats.calls * 1000, 3),
+                    "p50": round(stats.quantile(0.5) * 1000, 3),
+                    "p90": round(stats.quantile(0.9) * 1000, 3),
+                    "p99": round(stats.quantile(0.99) * 1000, 3),
+                    "max": round(stats.max_seconds * 1000, 3)
+                },
+                "payload_bytes": {
+                    "sampled": stats.payload_samples,
+                    "mean": round(stats.payload_bytes / stats.payload_samples) if stats.payload_samples else 0,
+                    "max": stats.payload_max_bytes
+                }
+            }
+        caches = {}
+        for name, (hits, misses) in self.cache_counts().items():
+            lookups = hits + misses
+            caches[name] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else None
+            }
+        report = {"uptime_seconds": round(uptime, 3), "tools": tools, "caches": caches}
+        if self.resources:
+            report["resources"] = self.resources
+        return report
+    
+    def prometheus_text(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        prefix = self.prefix
+        lines = [
+            f"# TYPE {prefix}_tool_calls_total counter",
+            f"# TYPE {prefix}_tool_errors_total counter",
+            f"# TYPE {prefix}_tool_error_responses_total counter",
+            f"# TYPE {prefix}_tool_latency_seconds histogram",
+            f"# TYPE {prefix}_tool_payload_bytes summary"
+        ]
+        for name, stats in self.tools.items():
+            label = f'tool="{name}"'
+            lines.append(f"{prefix}_tool_calls_total{{{label}}} {stats.calls}")
+            lines.append(f"{prefix}_tool_errors_total{{{label}}} {stats.errors}")
+            lines.append(f"{prefix}_tool_error_responses_total{{{label}}} {stats.error_responses}")
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                cumulative += count
+                lines.append(f'{prefix}_tool_latency_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_tool_latency_seconds_bucket{{{label},le="+Inf"}} {stats.calls}')
+            lines.append(f"{prefix}_tool_latency_seconds_sum{{{label}}} {stats.total_seconds:.6f}")
+            lines.append(f"{prefix}_tool_latency_seconds_count{{{label}}} {stats.calls}")
+            lines.append(f"{prefix}_tool_payload_bytes_sum{{{label}}} {stats.payload_bytes}")
+            lines.append(f"{prefix}_tool_payload_bytes_count{{{label}}} {stats.payload_samples}")
+        lines.append(f"# TYPE {prefix}_cache_hits_total counter")
+        lines.append(f"# TYPE {prefix}_cache_misses_total counter")
+        for name, (hits, misses) in self.cache_counts().items():
+            lines.append(f'{prefix}_cache_hits_total{{cache="{name}"}} {hits}')
+            lines.append(f'{prefix}_cache_misses_total{{cache="{name}"}} {misses}')
+        lines.append(f"# TYPE {prefix}_resource_load_seconds gauge")
+        lines.append(f"# TYPE {prefix}_resource_loaded gauge")
+        for name, resource in self.resources.items():
+            lines.append(f'{prefix}_resource_load_seconds{{resource="{name}"}} {resource["load_ms"] / 1000:.6f}')
+            lines.append(f'{prefix}_resource_loaded{{resource="{name}"}} {int(resource["loaded"])}')
+        return "\n".join(lines) + "\n"
+    
+    def dump_prometheus(self, path: Optional[Path] = None):
+        """Atomically (re)write the Prometheus text dump"""
+        path = Path(path) if path else self.dump_file
+        self._next_dump = time.monotonic() + self.dump_interval
+        try:
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_text(self.prometheus_text())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {path}: {e}")
+
+# Seconds a coalesced tool result stays cached; any data change invalidates sooner
+RESULT_CACHE_TTL = 5.0
+RESULT_CACHE_SIZE = 1024
+
+class ResultCache:
+    """Recent results by key, dropped after ``ttl`` seconds or when the data version changes
+    
+    ``version`` returns the server's data version; a computation that raced
+    a change is not stored. Cache lookups are counted in ``metrics`` under
+    ``name`` when given.
+    """
+    
+    def __init__(self, name: str, version: Callable[[], int], ttl: float = RESULT_CACHE_TTL,
+                 max_entries: int = RESULT_CACHE_SIZE, metrics: Optional[ToolMetrics] = None):
+        self.name = name
+        self.current_version = version
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.metrics = metrics
+        self.entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self.version: Optional[int] = None
+    
+    def count(self, hit: bool):
+        if self.metrics is not None:
+            self.metrics.count_cache(self.name, hit)
+    
+    def lookup(self, key: Any, version: int) -> Tuple[bool, Any]:
+        """(True, result) for a live entry, after dropping entries from older versions"""
+        if version != self.version:
+            self.entries.clear()
+            self.version = version
+        entry = self.entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return False, None
+        self.entries.move_to_end(key)
+        self.count(True)
+        return True, entry[1]
+    
+    def store(self, key: Any, version: int, result: Any):
+        """Keep a result computed at version, unless the data has changed since"""
+        if self.ttl > 0 and self.current_version() == version:
+            self.entries[key] = (time.monotonic() + self.ttl, result)
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+class SingleFlightCache(ResultCache):
+    """Coalesces identical concurrent calls from worker threads and briefly caches their results
+    
+    Calls with the same key share one in-flight computation (sync tools run
+    in worker threads, so identical calls do overlap). Results are shared
+    objects and must not be mutated by callers.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.inflight: Dict[Any, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+    
+    def run(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """compute()'s result for key, shared with concurrent and recent identical calls"""
+        version = self.current_version()
+        with self._lock:
+            hit, result = self.lookup(key, version)
+            if hit:
+                return result
+            future = self.inflight.get((version, key))
+            leader = future is None
+            if leader:
+                future = self.inflight[(version, key)] = concurrent.futures.Future()
+        self.count(not leader)
+        if not leader:
+            return future.result()
+        
+        try:
+            result = compute()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self.inflight[(version, key)]
+                if future.exception() is None:
+                    self.store(key, version, result)
+        return result
+
+class AsyncSingleFlightCache(ResultCache):
+    """Coalesces identical concurrent calls on one event loop and briefly caches their results
+    
+    Calls with the same key share one in-flight computation. Results are
+    shared objects and must not be mutated.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.inflight: Dict[Any, asyncio.Future] = {}
+    
+    async def run(self, key: Any, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """compute()'s result for key, shared with concurrent and recent identical calls"""
+        version = self.current_version()
+        hit, result = self.lookup(key, version)
+        if hit:
+            return result
+        pending = self.inflight.get((version, key))
+        self.count(pending is not None)
+        if pending is not None:
+            # Shielded so one waiter's cancellation does not cancel the shared call
+            return await asyncio.shield(pending)
+        
+        future = self.inflight[(version, key)] = asyncio.get_running_loop().create_future()
+        try:
+            result = await compute()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Waiters (if any) re-raise it; avoid "exception never retrieved"
+                future.exception()
+            raise
+        finally:
+            del self.inflight[(version, key)]
+        future.set_result(result)
+        self.store(key, version, result)
+        return result
+
+# Most changes kept for get_changes_since; clients further behind resync
+CHANGE_LOG_SIZE = 10000
+
+# ChangeLog actions, the same in both servers' change feeds
+ACTION_CREATED = "created"
+ACTION_UPDATED = "updated"
+ACTION_DELETED = "deleted"
+
+class ChangeLog:
+    """Recent changes by sequence number, so clients can sync deltas
+    
+    Entries are (version, key, action), where key names the changed record.
+    Sequence numbers start from the clock (in microseconds), so they keep
+    increasing across restarts. A client whose version predates what is
+    retained, or the last reset, gets None from since() and resyncs.
+    """
+    
+    def __init__(self, max_entries: int = CHANGE_LOG_SIZE):
+        self.entries: deque = deque(maxlen=max_entries)
+        self.version = self.floor = time.time_ns() // 1000
+    
+    def record(self, key: Any, action: str) -> int:
+        """Log one change to a record; returns its sequence number"""
+        if len(self.entries) == self.entries.maxlen:
+            # The oldest change is about to drop out
+            self.floor = self.entries[0][0]
+        self.version += 1
+        self.entries.append((self.version, key, action))
+        return self.version
+    
+    def reset(self):
+        """Forget every change, so all clients resync"""
+        self.entries.clear()
+        self.version += 1
+        self.floor = self.version
+    
+    def since(self, version: int) -> Optional[List[Tuple[int, Any, str]]]:
+        """Changes after version, the latest per record, oldest first (None: resync)"""
+        if version < self.floor or version > self.version:
+            return None
+        latest = {}
+        for entry in reversed(self.entries):
+            if entry[0] <= version:
+                break
+            latest.setdefault(entry[1], entry)
+        return sorted(latest.values())
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON form, for logs whose keys are strings"""
+        return {"version": self.version, "floor": self.floor, "entries": list(self.entries)}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChangeLog":
+        log = cls()
+        log.version, log.floor = data["version"], data["floor"]
+        log.entries.extend(tuple(entry) for entry in data["entries"])
+        return log
+
+# Upper bound on the number of items a paginated tool returns per call
+MAX_PAGE_SIZE = 500
+
+def check_page(offset: int, limit: int) -> Optional[str]:
+    """Error message for an invalid offset/limit pair, if any"""
+    if offset < 0:
+        return "Offset cannot be negative"
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        return f"Limit must be between 1 and {MAX_PAGE_SIZE}"
+    return None
+
+def check_fields(selected: Optional[List[str]], allowed: Tuple[str, ...]) -> Optional[str]:
+    """Error message for unknown field names, if any"""
+    unknown = [name for name in selected or () if name not in allowed]
+    if unknown:
+        return f"Unknown fields {unknown}. Must be among: {list(allowed)}"
+    return None
+
+def page_info(total: int, offset: int, returned: int) -> Dict[str, Any]:
+    """The paging keys every paginated tool returns beside its items
+    
+    next_offset is where the next page starts, or None after the last one.
+    """
+    next_offset = offset + returned
+    return {"total": total, "offset": offset, "next_offset": next_offset if next_offset < total else None}
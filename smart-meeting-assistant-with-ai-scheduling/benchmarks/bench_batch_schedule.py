@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch scheduling against one-at-a-time scheduling on a synthetic org
+
+The baseline mimics a client placing each meeting with its own
+get_meeting_suggestions + schedule_meeting round trip.
+
+Usage: python benchmarks/bench_batch_schedule.py [--users 10000] [--requests 500]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+logging.disable(logging.INFO)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from server import MeetingAssistant
+from synthetic_org import generate_org, generate_batch_requests, write_org
+
+def load_assistant(data_file: Path) -> MeetingAssistant:
+    assistant = MeetingAssistant(str(data_file))
+    # Keep disk writes out of the timings
+    assistant.request_save = lambda: None
+    # Load the records and build the indexes now, not inside the first timed call
+    assistant.start_index
+    return assistant
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--meetings-per-user", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_file = Path(temp_dir) / "org.json"
+        write_org(data_file, generate_org(args.users, args.meetings_per_user))
+        requests = generate_batch_requests(args.users, args.requests)
+        
+        assistant = load_assistant(data_file)
+        started = time.perf_counter()
+        result = assistant.schedule_meetings_batch(requests)
+        batch_seconds = time.perf_counter() - started
+        
+        assistant = load_assistant(data_file)
+        started = time.perf_counter()
+        sequential_placed = 0
+        for request in requests:
+            day = datetime.fromisoformat(request["window_start"]).date()
+            suggestions = assistant.suggest_meeting_time(
+                request["participants"], request["duration"], (day - timedelta(days=1)).isoformat()
+            )["suggestions"]
+            if suggestions:
+                result_one = assistant.schedule_meeting(
+                    request["title"], request["participants"], suggestions[0]["suggested_time"],
+                    request["duration"], ""
+                )
+                sequential_placed += bool(result_one.get("success"))
+        sequential_seconds = time.perf_counter() - started
+    
+    print(f"Users: {args.users}, requests: {args.requests}")
+    print(f"Batch:      {batch_seconds * 1000:.1f} ms, placed {result['scheduled_count']}, "
+          f"unplaceable {result['unplaceable_count']}")
+    print(f"Sequential: {sequential_seconds * 1000:.1f} ms, placed {sequential_placed}")
+
+if __name__ == "__main__":
+    main()
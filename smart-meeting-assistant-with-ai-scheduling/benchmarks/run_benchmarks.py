@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Benchmark and load-test harness for the Smart Meeting Assistant
+
+Generates a synthetic organization, then measures startup time (construction,
+record load from JSON or the binary snapshot, index build), memory after
+load, and latency percentiles for the main tools. Results are written as
+JSON so runs can be compared with --compare.
+
+Usage:
+    python benchmarks/run_benchmarks.py --users 2000 --output results.json
+    python benchmarks/run_benchmarks.py --users 2000 --compare results.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+logging.disable(logging.INFO)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from server import MeetingAssistant
+from synthetic_org import generate_org, write_org
+
+ORG_START = datetime(2025, 1, 6, tzinfo=timezone.utc)
+ORG_DAYS = 28
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds"""
+    values = sorted(sample * 1000 for sample in samples)
+    return {
+        "count": len(values),
+        "mean_ms": round(statistics.fmean(values), 4) if values else 0.0,
+        "p50_ms": round(percentile(values, 50), 4),
+        "p90_ms": round(percentile(values, 90), 4),
+        "p99_ms": round(percentile(values, 99), 4),
+        "max_ms": round(values[-1], 4) if values else 0.0
+    }
+
+def time_calls(fn: Callable[[random.Random], Any], iterations: int, seed: int) -> Dict[str, float]:
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn(rng)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+def measure_startup(data_file: Path, repeats: int) -> Dict[str, Any]:
+    """Construction cost plus the deferred record load and index build"""
+    phases: Dict[str, List[float]] = {"construct": [], "load_json": [], "load_snapshot": [], "build_indexes": []}
+    for _ in range(repeats):
+        for source in ("load_json", "load_snapshot"):
+            assistant = MeetingAssistant(str(data_file))
+            if source == "load_json" and assistant.snapshot_file.exists():
+                assistant.snapshot_file.unlink()
+            
+            started = time.perf_counter()
+            assistant = MeetingAssistant(str(data_file))
+            phases["construct"].append(time.perf_counter() - started)
+            
+            started = time.perf_counter()
+            assistant.users
+            phases[source].append(time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        assistant.start_index
+        phases["build_indexes"].append(time.perf_counter() - started)
+    
+    return {phase: summarize(samples) for phase, samples in phases.items()}
+
+def measure_memory(data_file: Path) -> Dict[str, Any]:
+    tracemalloc.start()
+    assistant = MeetingAssistant(str(data_file))
+    assistant.start_index
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    meetings = max(1, len(assistant.meetings))
+    return {
+        "traced_current_bytes": current,
+        "traced_peak_bytes": peak,
+        "bytes_per_meeting": round(current / meetings, 1),
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+
+def measure_tools(assistant: MeetingAssistant, num_users: int, iterations: int, seed: int) -> Dict[str, Any]:
+    # Load the records and build the indexes and effectiveness windows now,
+    # not inside the first timed call of whichever tool runs first
+    assistant.start_index
+    assistant.window_stats
+    
+    def random_user(rng: random.Random) -> int:
+        return rng.randint(1, num_users)
+    
+    def random_day(rng: random.Random) -> datetime:
+        return ORG_START + timedelta(days=rng.randrange(ORG_DAYS))
+    
+    def schedule(rng: random.Random):
+        start = random_day(rng) + timedelta(hours=rng.randint(0, 23), minutes=rng.choice([0, 15, 30, 45]))
+        assistant.schedule_meeting(
+            "Benchmark meeting", rng.sample(range(1, num_users + 1), min(3, num_users)),
+            start.isoformat().replace('+00:00', 'Z'), 30, "Benchmark"
+        )
+    
+    operations = {
+        "check_availability": lambda rng: assistant.get_user_availability(
+            random_user(rng), random_day(rng).date().isoformat()),
+        "get_meeting_suggestions": lambda rng: assistant.suggest_meeting_time(
+            rng.sample(range(1, num_users + 1), min(3, num_users)), 30,
+            random_day(rng).date().isoformat()),
+        "list_upcoming_meetings": lambda rng: assistant.list_upcoming_meetings(
+            random_user(rng), days_ahead=7),
+        "analyze_meeting_effectiveness": lambda rng: assistant.analyze_meeting_effectiveness(
+            random_user(rng)),
+        "analyze_meeting_effectiveness_all": lambda rng: assistant.analyze_meeting_effectiveness(),
+        "schedule_meeting": schedule
+    }
+    return {name: time_calls(fn, iterations, seed) for name, fn in operations.items()}
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Human-readable p50/p99 deltas against a previous run"""
+    lines = []
+    for name, stats in current["latency"].items():
+        before = baseline.get("latency", {}).get(name)
+        if not before:
+            continue
+        for key in ("p50_ms", "p99_ms"):
+            if before[key]:
+                change = (stats[key] - before[key]) / before[key] * 100
+                lines.append(f"{name:36s} {key}: {before[key]:.3f} -> {stats[key]:.3f} ({change:+.1f}%)")
+    for phase, stats in current["startup"].items():
+        before = baseline.get("startup", {}).get(phase)
+        if before and before["p50_ms"]:
+            lines.append(f"{'startup.' + phase:36s} p50_ms: {before['p50_ms']:.3f} -> {stats['p50_ms']:.3f}")
+    return lines
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_file = Path(temp_dir) / "org.json"
+        write_org(data_file, generate_org(
+            args.users, args.meetings_per_user, args.fanout,
+            start=ORG_START, days=ORG_DAYS, timezones=args.timezones, seed=args.seed
+        ))
+        
+        startup = measure_startup(data_file, args.startup_repeats)
+        memory = measure_memory(data_file)
+        
+        assistant = MeetingAssistant(str(data_file))
+        # Keep disk writes out of the tool timings
+        assistant.request_save = lambda: None
+        latency = measure_tools(assistant, args.users, args.iterations, args.seed)
+    
+    return {
+        "config": {
+            "users": args.users,
+            "meetings_per_user": args.meetings_per_user,
+            "fanout": args.fanout,
+            "timezones": args.timezones,
+            "iterations": args.iterations,
+            "seed": args.seed
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        },
+        "startup": startup,
+        "memory": memory,
+        "latency": latency
+    }
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Smart Meeting Assistant benchmark harness")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--meetings-per-user", type=int, default=10)
+    parser.add_argument("--fanout", type=int, default=4, help="Participants per meeting")
+    parser.add_argument("--timezones", type=int, default=6, help="Distinct user timezones")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per tool")
+    parser.add_argument("--startup-repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Write JSON results to this file")
+    parser.add_argument("--compare", type=Path, help="Previous JSON results to compare against")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    results = run(args)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print("\n".join(compare(results, baseline)), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Synthetic organization generator for Smart Meeting Assistant benchmarks
+"""
+
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+TIMEZONES = ["UTC-8", "UTC-5", "UTC", "UTC+1", "UTC+5:30", "UTC+9"]
+TITLES = ["Standup", "Sprint Planning", "Design Review", "1:1", "Retrospective", "All Hands"]
+
+def timezone_names(count: int) -> List[str]:
+    """`count` distinct UTC offsets, the common ones first"""
+    names = list(TIMEZONES[:count])
+    offset = -11
+    while len(names) < count and offset <= 14:
+        name = f"UTC{offset:+d}" if offset else "UTC"
+        if name not in names:
+            names.append(name)
+        offset += 1
+    return names
+
+def generate_org(num_users: int, meetings_per_user: int = 5, fanout: int = 4,
+                 start: datetime = datetime(2025, 1, 6, tzinfo=timezone.utc),
+                 days: int = 28, timezones: int = len(TIMEZONES), seed: int = 42) -> Dict[str, Any]:
+    """Build users and one-off meetings in the sample_content.json layout"""
+    rng = random.Random(seed)
+    zones = timezone_names(timezones)
+    users = [
+        {
+            "user_id": user_id,
+            "name": f"User {user_id}",
+            "timezone": rng.choice(zones),
+            "preferences": "Working hours: 9 AM - 5 PM",
+            "meeting_history": []
+        }
+        for user_id in range(1, num_users + 1)
+    ]
+    
+    # Each meeting covers `fanout` participants, so this yields roughly
+    # meetings_per_user meetings per user on average
+    num_meetings = max(1, num_users * meetings_per_user // max(1, fanout))
+    meetings = []
+    for i in range(num_meetings):
+        start_time = start + timedelta(days=rng.randrange(days), hours=rng.randint(9, 16),
+                                       minutes=rng.choice([0, 30]))
+        meetings.append({
+            "meeting_id": f"S{i + 1:06d}",
+            "title": rng.choice(TITLES),
+            "participants": rng.sample(range(1, num_users + 1), min(fanout, num_users)),
+            "start_time": start_time.isoformat().replace('+00:00', 'Z'),
+            "duration": rng.choice([15, 30, 45, 60]),
+            "agenda": "Synthetic agenda",
+            "effectiveness_score": rng.choice([None, *range(1, 11)])
+        })
+    
+    return {"users": users, "meetings": meetings}
+
+def generate_batch_requests(num_users: int, count: int, fanout: int = 4,
+                            start: datetime = datetime(2025, 1, 6, tzinfo=timezone.utc),
+                            days: int = 5, seed: int = 7) -> List[Dict[str, Any]]:
+    """Meeting requests with one-day windows spread over a working week"""
+    rng = random.Random(seed)
+    requests = []
+    for i in range(count):
+        day = start + timedelta(days=rng.randrange(days))
+        requests.append({
+            "title": f"Batch meeting {i + 1}",
+            "participants": rng.sample(range(1, num_users + 1), min(rng.randint(2, fanout), num_users)),
+            "duration": rng.choice([30, 45, 60]),
+            "window_start": (day + timedelta(hours=9)).isoformat(),
+            "window_end": (day + timedelta(hours=17)).isoformat(),
+            "priority": rng.randint(0, 3)
+        })
+    return requests
+
+def write_org(path: Path, org: Dict[str, Any]):
+    with open(path, 'w') as f:
+        json.dump(org, f)
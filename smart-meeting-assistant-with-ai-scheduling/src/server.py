@@ -6,108 +6,1171 @@ conflict detection, and meeting effectiveness analysis.
 """
 
 import json
+import os
+import sys
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import bisect
+import tempfile
+import heapq
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, Tuple, Union, Iterator
 from pathlib import Path
 import logging
-from dataclasses import dataclass, asdict
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache, wraps
+from array import array
+from dataclasses import dataclass, asdict, fields, replace
 from zoneinfo import ZoneInfo
 
 from fastmcp import FastMCP
 
+# Code shared with the other MCP servers in this repository
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "shared"))
+from server_support import (AsyncSingleFlightCache, ChangeLog, ToolMetrics, ToolProfiler,
+                            ACTION_CREATED, ACTION_DELETED, ACTION_UPDATED, MAX_PAGE_SIZE, PROFILE_MAX_FILES, PROFILE_SORT_KEYS,
+                            check_fields, check_page, page_info)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Slotted records keep per-object overhead low on large calendars
+
+@dataclass(slots=True)
 class User:
     user_id: int
     name: str
     timezone: str
     preferences: str
-    meeting_history: List[Dict[str, Any]]
+    # Entries that match their meeting record are kept as just the meeting ID
+    # and expanded on read (see compact_history and expand_history); only ever
+    # appended to, so a length marks a point in time (see snapshot_view)
+    meeting_history: List[Union[str, Dict[str, Any]]]
+    
+    def __post_init__(self):
+        self.timezone = sys.intern(self.timezone)
 
-@dataclass
+@dataclass(slots=True)
 class Meeting:
     meeting_id: str
     title: str
-    participants: List[int]
+    participants: Tuple[int, ...]
     start_time: str
     duration: int
     agenda: str
     effectiveness_score: Optional[int] = None
+    # Normalized recurrence rule (see normalize_recurrence); None for one-off meetings
+    recurrence: Optional[Dict[str, Any]] = None
+    # Canonical UTC epoch seconds of start_time, derived at ingest and used
+    # by every time comparison; not written to the JSON file
+    start_epoch: Optional[float] = None
+    
+    def __post_init__(self):
+        # Recurring titles share one string object
+        self.title = sys.intern(self.title)
+        self.participants = tuple(self.participants)
+        if self.start_epoch is None:
+            self.start_epoch = parse_start_time(self.start_time).timestamp()
+    
+    @property
+    def end_epoch(self) -> float:
+        return self.start_epoch + self.duration * 60
+
+@lru_cache(maxsize=8192)
+def parse_start_time(start_time: str) -> datetime:
+    """Parse an ISO start time into an aware datetime (naive values are UTC)
+    
+    Memoized: datetimes are immutable and the same strings recur constantly.
+    """
+    parsed = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+def utc_datetime(epoch: float) -> datetime:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+def format_start_time(start: datetime) -> str:
+    """Render a start time the way meetings store it ('Z' for UTC)"""
+    return start.isoformat().replace('+00:00', 'Z')
+
+RECURRENCE_FREQUENCIES = ("daily", "weekly", "monthly")
+
+# How far ahead a new recurring series is checked for conflicts
+RECURRENCE_CONFLICT_HORIZON_DAYS = 180
+
+def normalize_recurrence(rule: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate an RRULE-style recurrence rule and fill in defaults
+    
+    Keys: freq (daily/weekly/monthly), interval, count, until,
+    byweekday (0=Monday, weekly only) and exdates (dates to skip).
+    Raises ValueError on invalid rules.
+    """
+    freq = rule.get("freq")
+    if freq not in RECURRENCE_FREQUENCIES:
+        raise ValueError(f"Invalid recurrence freq. Must be one of: {list(RECURRENCE_FREQUENCIES)}")
+    
+    interval = int(rule.get("interval", 1))
+    if interval < 1:
+        raise ValueError("Recurrence interval must be at least 1")
+    
+    count = rule.get("count")
+    if count is not None and int(count) < 1:
+        raise ValueError("Recurrence count must be at least 1")
+    
+    until = rule.get("until")
+    if until:
+        parse_start_time(until)
+    
+    byweekday = sorted(set(rule.get("byweekday") or []))
+    if byweekday and freq != "weekly":
+        raise ValueError("byweekday is only supported for weekly recurrence")
+    if any(not 0 <= day <= 6 for day in byweekday):
+        raise ValueError("byweekday values must be between 0 (Monday) and 6 (Sunday)")
+    
+    exdates = sorted({
+        datetime.fromisoformat(x.replace('Z', '+00:00')).date().isoformat()
+        for x in rule.get("exdates") or []
+    })
+    
+    return {
+        "freq": freq,
+        "interval": interval,
+        "count": int(count) if count is not None else None,
+        "until": until or None,
+        "byweekday": byweekday,
+        "exdates": exdates
+    }
+
+def _recurrence_candidates(first: datetime, rule: Dict[str, Any],
+                           after: datetime) -> Iterator[Tuple[int, datetime]]:
+    """Yield (occurrence index, start) in order, jumping close to `after`"""
+    interval = rule["interval"]
+    counted = rule.get("count") is not None
+    
+    if rule["freq"] == "monthly":
+        # Months lacking the start day are skipped, so counted series walk from the start
+        k = 0 if counted else max(0, ((after.year - first.year) * 12 + after.month - first.month) // interval - 1)
+        index = k
+        while True:
+            months = first.month - 1 + k * interval
+            year = first.year + months // 12
+            if year > datetime.max.year:
+                return
+            k += 1
+            try:
+                start = first.replace(year=year, month=months % 12 + 1)
+            except ValueError:
+                continue
+            yield index, start
+            index += 1
+    
+    byweekday = rule.get("byweekday") or []
+    if rule["freq"] == "weekly" and byweekday:
+        period = timedelta(weeks=interval)
+        anchor = first - timedelta(days=first.weekday())
+        lead = [day for day in byweekday if day >= first.weekday()]
+        block = max(0, (after - anchor) // period)
+        while True:
+            week_start = anchor + block * period
+            days = byweekday if block else lead
+            offset = len(lead) + (block - 1) * len(byweekday) if block else 0
+            for pos, day in enumerate(days):
+                yield offset + pos, week_start + timedelta(days=day)
+            block += 1
+    
+    step = timedelta(days=interval * (7 if rule["freq"] == "weekly" else 1))
+    k = max(0, (after - first) // step)
+    while True:
+        yield k, first + k * step
+        k += 1
+
+def iter_occurrences(meeting: "Meeting", after: datetime, until: datetime) -> Iterator[datetime]:
+    """Lazily expand a meeting's start times with after < start <= until"""
+    first = parse_start_time(meeting.start_time)
+    rule = meeting.recurrence
+    if not rule:
+        if after < first <= until:
+            yield first
+        return
+    
+    if rule.get("until"):
+        end = parse_start_time(rule["until"])
+        if len(rule["until"]) == 10:
+            # A bare date includes the whole day
+            end += timedelta(days=1) - timedelta(microseconds=1)
+        until = min(until, end)
+    count = rule.get("count")
+    exdates = rule.get("exdates") or ()
+    
+    for index, start in _recurrence_candidates(first, rule, after):
+        if start > until or (count is not None and index >= count):
+            return
+        if start <= after or start < first:
+            continue
+        if start.date().isoformat() in exdates:
+            continue
+        yield start
+
+class StartTimeIndex:
+    """Meeting IDs kept sorted by start timestamp for bisect range queries
+    
+    Holds one-off meetings only; recurring series are expanded on demand.
+    """
+    
+    def __init__(self):
+        # Packed doubles rather than a list of float objects
+        self.starts = array('d')
+        self.meeting_ids: List[str] = []
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    @classmethod
+    def from_pairs(cls, pairs: List[Tuple[float, str]]) -> "StartTimeIndex":
+        """Build from unsorted (start, meeting_id) pairs in one sort"""
+        index = cls()
+        pairs.sort(key=lambda pair: pair[0])
+        index.starts = array('d', (start for start, _ in pairs))
+        index.meeting_ids = [meeting_id for _, meeting_id in pairs]
+        return index
+    
+    def add(self, start: float, meeting_id: str):
+        """Insert a meeting, keeping ties in insertion order"""
+        pos = bisect.bisect_right(self.starts, start)
+        self.starts.insert(pos, start)
+        self.meeting_ids.insert(pos, meeting_id)
+    
+    def remove(self, start: float, meeting_id: str):
+        """Remove a meeting inserted with this start"""
+        pos = bisect.bisect_left(self.starts, start)
+        while self.meeting_ids[pos] != meeting_id:
+            pos += 1
+        del self.starts[pos]
+        del self.meeting_ids[pos]
+    
+    def span(self, after: float, until: float) -> range:
+        """Positions of meetings with after < start <= until"""
+        lo = bisect.bisect_right(self.starts, after)
+        hi = bisect.bisect_right(self.starts, until)
+        return range(lo, max(lo, hi))
+    
+    def between(self, start: float, end: float) -> range:
+        """Positions of meetings with start <= meeting start < end"""
+        lo = bisect.bisect_left(self.starts, start)
+        hi = bisect.bisect_left(self.starts, end)
+        return range(lo, max(lo, hi))
+
+# Item fields callers can select with `fields` on paginated tools
+UPCOMING_FIELDS = ("meeting_id", "title", "start_time", "duration", "participants", "recurring")
+BREAKDOWN_FIELDS = ("meeting_id", "title", "duration", "effectiveness_score")
+HISTORY_FIELDS = ("meeting_id", "date", "duration")
+
+def project(item: Dict[str, Any], selected: Optional[List[str]]) -> Dict[str, Any]:
+    """Keep only the selected fields of an item (all when none are selected)"""
+    if not selected:
+        return item
+    return {name: item[name] for name in selected if name in item}
+
+# Time windows tracked by the rolling effectiveness aggregates
+TREND_GRANULARITIES = ("week", "month")
+
+def time_bucket(start: datetime, granularity: str) -> str:
+    """Bucket key for a start time, e.g. '2025-W40' or '2025-10'"""
+    if granularity == "week":
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    return f"{start.year}-{start.month:02d}"
+
+@dataclass(slots=True)
+class EffectivenessStats:
+    """Running sums and counts behind the effectiveness summaries"""
+    meeting_count: int = 0
+    total_duration: int = 0
+    scored_count: int = 0
+    score_total: int = 0
+    
+    def add(self, meeting: "Meeting"):
+        self.meeting_count += 1
+        self.total_duration += meeting.duration
+        self.rescore(None, meeting.effectiveness_score)
+    
+    def remove(self, meeting: "Meeting"):
+        self.meeting_count -= 1
+        self.total_duration -= meeting.duration
+        self.rescore(meeting.effectiveness_score, None)
+    
+    def rescore(self, old_score: Optional[int], new_score: Optional[int]):
+        if old_score is not None:
+            self.scored_count -= 1
+            self.score_total -= old_score
+        if new_score is not None:
+            self.scored_count += 1
+            self.score_total += new_score
+    
+    def average_duration(self) -> float:
+        return self.total_duration / self.meeting_count if self.meeting_count else 0
+    
+    def average_effectiveness(self) -> float:
+        return self.score_total / self.scored_count if self.scored_count else 0
+
+DAY_SECONDS = 86400
+# Most (user, day) free/busy entries kept in memory
+FREE_BUSY_CACHE_SIZE = 10000
+
+@dataclass(slots=True)
+class DayFreeBusy:
+    """One user's meetings, busy intervals and free windows over a 24-hour day"""
+    meetings: List[Dict[str, Any]]
+    busy: List[Tuple[float, float]]
+    free: List[Tuple[float, float]]
+    
+    @classmethod
+    def build(cls, day_start: float, meetings: List[Dict[str, Any]],
+              busy: List[Tuple[float, float]]) -> "DayFreeBusy":
+        """Derive the free windows from busy intervals sorted by start"""
+        free = []
+        cursor = day_start
+        for start, end in busy:
+            if start > cursor:
+                free.append((cursor, start))
+            cursor = max(cursor, end)
+        if cursor < day_start + DAY_SECONDS:
+            free.append((cursor, day_start + DAY_SECONDS))
+        return cls(meetings, busy, free)
+    
+    def is_free(self, start: float, end: float) -> bool:
+        """Whether [start, end), within this day, overlaps no busy interval"""
+        pos = bisect.bisect_right(self.free, (start, float("inf"))) - 1
+        return pos >= 0 and self.free[pos][1] >= end
+
+class FreeBusyCache:
+    """Per-(user, day) free/busy entries, least recently used evicted first
+    
+    Days are keyed by their start epoch. A changed one-off meeting drops
+    only the days it overlaps for its participants; a recurring series
+    drops every cached day of its participants.
+    """
+    
+    def __init__(self, max_entries: int = FREE_BUSY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[int, float], DayFreeBusy]" = OrderedDict()
+        self.user_days: Dict[int, set] = {}
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def get(self, user_id: int, day_start: float) -> Optional[DayFreeBusy]:
+        entry = self.entries.get((user_id, day_start))
+        metrics.count_cache("free_busy", entry is not None)
+        if entry is not None:
+            self.entries.move_to_end((user_id, day_start))
+        return entry
+    
+    def put(self, user_id: int, day_start: float, entry: DayFreeBusy):
+        self.entries[(user_id, day_start)] = entry
+        self.user_days.setdefault(user_id, set()).add(day_start)
+        if len(self.entries) > self.max_entries:
+            (old_user, old_day), _ = self.entries.popitem(last=False)
+            self._forget(old_user, [old_day])
+    
+    def invalidate(self, user_id: int, start: Optional[float] = None, end: Optional[float] = None):
+        """Drop a user's days overlapping [start, end], or all of them"""
+        days = self.user_days.get(user_id)
+        if not days:
+            return
+        stale = [day for day in days if start is None or (day <= end and day + DAY_SECONDS > start)]
+        for day in stale:
+            del self.entries[(user_id, day)]
+        self._forget(user_id, stale)
+    
+    def _forget(self, user_id: int, stale: List[float]):
+        days = self.user_days[user_id]
+        days.difference_update(stale)
+        if not days:
+            del self.user_days[user_id]
+    
+    def clear(self):
+        self.entries.clear()
+        self.user_days.clear()
+
+# Batch scheduling limits: slot granularity and the longest planning horizon
+BATCH_SLOT_MINUTES = 15
+MAX_BATCH_HORIZON_DAYS = 92
+MAX_BATCH_REQUESTS = 5000
+# Placed meetings the repair pass may try to move for one unplaced request
+MAX_REPAIR_CANDIDATES = 20
+
+class BatchScheduler:
+    """Places many meeting requests at once over shared availability bitmaps
+    
+    Each participant's busy time over the planning horizon is a Python int
+    with one bit per slot. Requests are placed greedily (priority first,
+    then the most constrained), and a repair pass tries to fit leftovers by
+    moving one lower-priority placement elsewhere in its window.
+    """
+    
+    def __init__(self, assistant: "MeetingAssistant", horizon_start: datetime,
+                 horizon_end: datetime, slot_minutes: int = BATCH_SLOT_MINUTES):
+        self.assistant = assistant
+        self.slot_seconds = slot_minutes * 60
+        self.origin = (horizon_start.timestamp() // self.slot_seconds) * self.slot_seconds
+        self.num_slots = int(-(-(horizon_end.timestamp() - self.origin) // self.slot_seconds))
+        self.full_mask = (1 << self.num_slots) - 1
+        self.busy: Dict[int, int] = {}
+        self.horizon_start = horizon_start
+        self.horizon_end = horizon_end
+    
+    def _slot_bits(self, start: float, end: float) -> int:
+        """Bits for every slot overlapping [start, end)"""
+        first = max(0, int((start - self.origin) // self.slot_seconds))
+        last = min(self.num_slots, int(-(-(end - self.origin) // self.slot_seconds)))
+        return ((1 << (last - first)) - 1) << first if last > first else 0
+    
+    def busy_bits(self, user_id: int) -> int:
+        """Existing commitments of a user, loaded on first use"""
+        if user_id not in self.busy:
+            bits = 0
+            for start, end, _ in self.assistant.busy_intervals(user_id, self.horizon_start.timestamp(),
+                                                               self.horizon_end.timestamp()):
+                bits |= self._slot_bits(start, end)
+            self.busy[user_id] = bits
+        return self.busy[user_id]
+    
+    def find_slot(self, request: Dict[str, Any]) -> Optional[int]:
+        """Earliest start slot where every participant is free, or None"""
+        length = request["slots"]
+        first = max(0, int(-(-(request["window_start"] - self.origin) // self.slot_seconds)))
+        last = int((request["window_end"] - self.origin) // self.slot_seconds) - length
+        if last < first:
+            return None
+        
+        union = 0
+        for user_id in request["participants"]:
+            union |= self.busy_bits(user_id)
+        free = self.full_mask & ~union
+        
+        # Doubling shifts: bit j survives iff slots j .. j+length-1 are all free
+        runs, covered = free, 1
+        while covered < length:
+            step = min(covered, length - covered)
+            runs &= runs >> step
+            covered += step
+        
+        candidates = runs & (((1 << (last - first + 1)) - 1) << first)
+        if not candidates:
+            return None
+        return (candidates & -candidates).bit_length() - 1
+    
+    def occupy(self, request: Dict[str, Any], slot: int, busy: bool = True):
+        bits = ((1 << request["slots"]) - 1) << slot
+        for user_id in request["participants"]:
+            if busy:
+                self.busy[user_id] = self.busy_bits(user_id) | bits
+            else:
+                self.busy[user_id] &= ~bits
+    
+    def plan(self, requests: List[Dict[str, Any]]) -> Tuple[Dict[int, int], List[int]]:
+        """Assign start slots; returns (request index -> slot, unplaced indexes)"""
+        order = sorted(
+            range(len(requests)),
+            key=lambda i: (-requests[i]["priority"], -len(requests[i]["participants"]), -requests[i]["slots"], i)
+        )
+        placed: Dict[int, int] = {}
+        unplaced = []
+        for i in order:
+            slot = self.find_slot(requests[i])
+            if slot is None:
+                unplaced.append(i)
+            else:
+                placed[i] = slot
+                self.occupy(requests[i], slot)
+        
+        # Local search: move one lower-priority placement out of the way
+        still_unplaced = []
+        for i in unplaced:
+            request = requests[i]
+            members = set(request["participants"])
+            candidates = [
+                j for j, slot in placed.items()
+                if requests[j]["priority"] <= request["priority"]
+                and members.intersection(requests[j]["participants"])
+            ][:MAX_REPAIR_CANDIDATES]
+            
+            for j in candidates:
+                old_slot = placed[j]
+                self.occupy(requests[j], old_slot, busy=False)
+                slot = self.find_slot(request)
+                if slot is not None:
+                    self.occupy(request, slot)
+                    new_slot = self.find_slot(requests[j])
+                    if new_slot is not None:
+                        self.occupy(requests[j], new_slot)
+                        placed[i], placed[j] = slot, new_slot
+                        break
+                    self.occupy(request, slot, busy=False)
+                self.occupy(requests[j], old_slot)
+            else:
+                still_unplaced.append(i)
+        
+        return placed, still_unplaced
+    
+    def slot_start(self, slot: int) -> datetime:
+        return datetime.fromtimestamp(self.origin + slot * self.slot_seconds, tz=timezone.utc)
+
+# Delay used by the background writer to coalesce bursts of mutations into one flush
+SAVE_COALESCE_SECONDS = 0.05
+
+class BackgroundWriter:
+    """Persists assistant state off the event loop, coalescing bursts of saves"""
+    
+    def __init__(self, assistant: "MeetingAssistant", delay: float = SAVE_COALESCE_SECONDS):
+        self.assistant = assistant
+        self.delay = delay
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def pending(self) -> bool:
+        """Whether changes are waiting to be written"""
+        return self._dirty or (self._task is not None and not self._task.done())
+    
+    def request_save(self):
+        """Mark state dirty; flush in the background when an event loop is running"""
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, tests): persist synchronously
+            self._dirty = False
+            self.assistant.save_data()
+            return
+        
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+    
+    async def _run(self):
+        while self._dirty:
+            # Let further mutations pile up before writing once
+            await asyncio.sleep(self.delay)
+            self._dirty = False
+            # Only the view is taken on the loop; copying and writing run in a thread
+            await asyncio.to_thread(self.assistant.save_data, self.assistant.snapshot_view())
+    
+    async def flush(self):
+        """Wait for any pending background write to complete"""
+        while self._task is not None and not self._task.done():
+            await self._task
+        if self._dirty:
+            self._dirty = False
+            await asyncio.to_thread(self.assistant.save_data, self.assistant.snapshot_view())
+
+# Sampled profiling is off unless PROFILE_SAMPLE_RATE is set or configure_profiling is called
+profiler = ToolProfiler(
+    os.environ.get("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "meeting-assistant-profiles")),
+    float(os.environ.get("PROFILE_SAMPLE_RATE", "0")),
+    [tool for tool in os.environ.get("PROFILE_TOOLS", "").split(",") if tool],
+    int(os.environ.get("PROFILE_MAX_FILES", PROFILE_MAX_FILES))
+)
+
+# Process-wide tool metrics; set METRICS_PROMETHEUS_FILE to also dump Prometheus text
+metrics = ToolMetrics(os.environ.get("METRICS_PROMETHEUS_FILE"), prefix="meeting_assistant", profiler=profiler)
+metrics.register_cache("parse_start_time", parse_start_time.cache_info)
+
+# Snapshot written next to the JSON file: records as positional rows in plain
+# JSON, so loading it cannot run code; bump when its layout changes
+SNAPSHOT_VERSION = 4
+USER_FIELDS = tuple(f.name for f in fields(User))
+MEETING_FIELDS = tuple(f.name for f in fields(Meeting))
+
+# Materialized on first access (see MeetingAssistant.__getattr__)
+RECORD_ATTRIBUTES = ("users", "meetings", "meeting_serial")
+# Fields compared when reloading changed records (start_epoch is derived)
+USER_RECORD_FIELDS = USER_FIELDS
+MEETING_RECORD_FIELDS = tuple(name for name in MEETING_FIELDS if name != "start_epoch")
+INDEX_ATTRIBUTES = ("user_meetings", "start_index", "user_start_index", "series",
+                    "max_duration", "stats")
+
+def record_matches(record: Any, data: Dict[str, Any], names: Tuple[str, ...]) -> bool:
+    """Whether a loaded record equals its JSON form on the given fields"""
+    for name in names:
+        value = getattr(record, name)
+        stored = data.get(name)
+        if isinstance(value, tuple) and isinstance(stored, list):
+            stored = tuple(stored)
+        if value != stored:
+            return False
+    return True
+
+def meeting_number(meeting_id: str) -> int:
+    """The number in a generated ID such as M005 (0 for other IDs)"""
+    if meeting_id[:1] == "M" and meeting_id[1:].isdigit():
+        return int(meeting_id[1:])
+    return 0
+
+def history_entry(meeting_id: str, start_time: str, duration: int) -> Dict[str, Any]:
+    """The meeting history entry recorded for a meeting"""
+    return {
+        "meeting_id": meeting_id,
+        "date": parse_start_time(start_time).date().isoformat(),
+        "duration": duration
+    }
+
+def compact_history(users: List[Dict[str, Any]], meetings: List[Dict[str, Any]]):
+    """Replace history entries that duplicate a meeting record with its ID, in place
+    
+    Only entries identical to the one the meeting would produce are replaced,
+    so expanding them gives back the stored history, order and all.
+    """
+    meetings_by_id = {m['meeting_id']: m for m in meetings}
+    
+    def compact(entry):
+        meeting = meetings_by_id.get(entry.get('meeting_id')) if isinstance(entry, dict) else None
+        if meeting is None or entry != history_entry(meeting['meeting_id'], meeting['start_time'], meeting['duration']):
+            return entry
+        return meeting['meeting_id']
+    
+    for user in users:
+        user['meeting_history'] = [compact(entry) for entry in user.get('meeting_history', [])]
+
+def expand_history(entries: List[Union[str, Dict[str, Any]]],
+                   meetings: Dict[str, "Meeting"]) -> List[Dict[str, Any]]:
+    """History entries with those kept as meeting IDs expanded (the inverse of compact_history)"""
+    history = []
+    for entry in entries:
+        if isinstance(entry, str):
+            meeting = meetings[entry]
+            entry = history_entry(meeting.meeting_id, meeting.start_time, meeting.duration)
+        history.append(entry)
+    return history
 
 class MeetingAssistant:
+    """Users, meetings and their indexes
+    
+    Nothing is read at construction: records load on first access (from the
+    binary snapshot when it is fresher than the JSON), and indexes are built
+    on first use, so server start does not depend on calendar size.
+    """
+    
     def __init__(self, data_file: str = "data/sample_content.json"):
         self.data_file = Path(data_file)
-        self.users: Dict[int, User] = {}
-        self.meetings: Dict[str, Meeting] = {}
+        self.snapshot_file = self.data_file.with_name(self.data_file.name + ".snapshot")
+        self.writer = BackgroundWriter(self)
+        # Bumped on every change, so cached results derived from older state are dropped
+        self.data_version = 0
+        # Data file signature as last loaded or written (see read_changes)
+        self.loaded_signature: Optional[Tuple[int, int]] = None
+        self.free_busy = FreeBusyCache()
+        self.changes = ChangeLog()
         self.load_data()
     
+    def __getattr__(self, name: str):
+        # Only called for attributes that are not materialized yet
+        if name in RECORD_ATTRIBUTES:
+            self._load_records()
+        elif name in INDEX_ATTRIBUTES:
+            self._build_indexes()
+        elif name == "window_stats":
+            self._build_window_stats()
+        else:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        return self.__dict__[name]
+    
     def load_data(self):
-        """Load user and meeting data from JSON file"""
+        """(Re)load user and meeting data lazily on next access"""
+        self.data_version += 1
+        self.free_busy.clear()
+        self.changes.reset()
+        for name in RECORD_ATTRIBUTES + INDEX_ATTRIBUTES + ("window_stats",):
+            self.__dict__.pop(name, None)
+    
+    def _load_records(self):
+        """Materialize users and meetings from the snapshot or the JSON file"""
+        users: Dict[int, User] = {}
+        meetings: Dict[str, Meeting] = {}
+        self.loaded_signature = self._source_signature()
         try:
-            if self.data_file.exists():
+            snapshot = self._read_binary_snapshot()
+            if snapshot is not None:
+                for row in snapshot['users']:
+                    user = User(*row)
+                    users[user.user_id] = user
+                for row in snapshot['meetings']:
+                    meeting = Meeting(*row)
+                    meetings[meeting.meeting_id] = meeting
+                source = "snapshot"
+                metrics.count_cache("binary_snapshot", True)
+            elif self.data_file.exists():
                 with open(self.data_file, 'r') as f:
                     data = json.load(f)
                 
+                compact_history(data.get('users', []), data.get('meetings', []))
+                
                 # Load users
                 for user_data in data.get('users', []):
                     user = User(**user_data)
-                    self.users[user.user_id] = user
+                    users[user.user_id] = user
                 
                 # Load meetings
                 for meeting_data in data.get('meetings', []):
                     meeting = Meeting(**meeting_data)
-                    self.meetings[meeting.meeting_id] = meeting
+                    meetings[meeting.meeting_id] = meeting
                 
-                logger.info(f"Loaded {len(self.users)} users and {len(self.meetings)} meetings")
+                source = "JSON"
+                metrics.count_cache("binary_snapshot", False)
+                self._write_binary_snapshot(
+                    [tuple(getattr(u, name) for name in USER_FIELDS) for u in users.values()],
+                    [tuple(getattr(m, name) for name in MEETING_FIELDS) for m in meetings.values()]
+                )
+            else:
+                source = None
+            
+            if source:
+                logger.info(f"Loaded {len(users)} users and {len(meetings)} meetings from {source}")
         except Exception as e:
             logger.error(f"Error loading data: {e}")
+        
+        self.users = users
+        self.meetings = meetings
+        # Highest number handed out for generated IDs; it never goes down, so
+        # IDs of meetings removed by a reload are not reused
+        self.meeting_serial = max([len(meetings)] + [meeting_number(mid) for mid in meetings])
+    
+    def _next_meeting_id(self) -> str:
+        """A meeting ID that is unused and not handed out before"""
+        number = self.meeting_serial + 1
+        while f"M{number:03d}" in self.meetings:
+            number += 1
+        return f"M{number:03d}"
+    
+    def _build_indexes(self):
+        """Build participant, start-time and aggregate indexes from the records"""
+        # Participant index: user_id -> meeting_ids, in insertion order
+        self.user_meetings: Dict[int, List[str]] = {}
+        # Start-time indexes, global and per participant
+        self.start_index = StartTimeIndex()
+        self.user_start_index: Dict[int, StartTimeIndex] = {}
+        # Recurring series IDs, overall (None) and per participant
+        self.series: Dict[Optional[int], List[str]] = {}
+        # Longest one-off meeting, bounding how far back overlap queries look
+        self.max_duration = 0
+        # Running effectiveness aggregates: overall (None) and per user
+        self.stats: Dict[Optional[int], EffectivenessStats] = {}
+        
+        # Bulk path: collect start times, then sort each index once
+        starts: List[Tuple[float, str]] = []
+        user_starts: Dict[int, List[Tuple[float, str]]] = {}
+        for meeting in self.meetings.values():
+            self._index_meeting(meeting, starts, user_starts)
+        self.start_index = StartTimeIndex.from_pairs(starts)
+        self.user_start_index = {uid: StartTimeIndex.from_pairs(pairs) for uid, pairs in user_starts.items()}
     
-    def save_data(self):
-        """Save current data to JSON file"""
+    def _build_window_stats(self):
+        """Per (granularity, scope) time-window aggregates, built on first trend query"""
+        self.window_stats: Dict[Tuple[str, Optional[int]], Dict[str, EffectivenessStats]] = {}
+        for meeting in self.meetings.values():
+            for stats in self._window_scopes(meeting):
+                stats.add(meeting)
+    
+    def _source_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.data_file.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _read_binary_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Snapshot contents if it matches the current JSON file, else None"""
+        signature = self._source_signature()
+        if signature is None or not self.snapshot_file.exists():
+            return None
+        try:
+            with open(self.snapshot_file, 'rb') as f:
+                snapshot = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable snapshot: {e}")
+            return None
+        # JSON turns the tuples into lists
+        if (not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION
+                or snapshot.get('source') != list(signature)
+                or snapshot.get('user_fields') != list(USER_FIELDS)
+                or snapshot.get('meeting_fields') != list(MEETING_FIELDS)):
+            return None
+        return snapshot
+    
+    def _write_binary_snapshot(self, user_rows: List[tuple], meeting_rows: List[tuple]):
+        """Write records as plain tuples, tagged with the JSON file signature"""
+        snapshot = {
+            'version': SNAPSHOT_VERSION,
+            'source': self._source_signature(),
+            'user_fields': USER_FIELDS,
+            'meeting_fields': MEETING_FIELDS,
+            'users': user_rows,
+            'meetings': meeting_rows
+        }
+        temp_file = self.snapshot_file.with_name(self.snapshot_file.name + ".tmp")
+        try:
+            with open(temp_file, 'w') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+            os.replace(temp_file, self.snapshot_file)
+        except Exception as e:
+            logger.error(f"Error writing snapshot: {e}")
+    
+    def snapshot_view(self) -> Tuple[List[Tuple[User, int]], List[Meeting]]:
+        """Point-in-time view of the records, cheap enough for the event loop
+        
+        Records are replaced rather than modified and histories only grow, so
+        the view holds the records themselves and each history's length.
+        """
+        return ([(user, len(user.meeting_history)) for user in self.users.values()],
+                list(self.meetings.values()))
+    
+    def snapshot(self, view: Optional[Tuple[List[Tuple[User, int]], List[Meeting]]] = None) -> Dict[str, Any]:
+        """Copy a view (current state by default) into a JSON-serializable dict"""
+        user_views, meetings = view or self.snapshot_view()
+        meetings_by_id = {meeting.meeting_id: meeting for meeting in meetings}
+        users = []
+        for user, history_length in user_views:
+            user_data = {name: getattr(user, name) for name in USER_FIELDS}
+            user_data['meeting_history'] = expand_history(user.meeting_history[:history_length], meetings_by_id)
+            users.append(user_data)
+        return {
+            'users': users,
+            # Still carries start_epoch; write_snapshot keeps it out of the JSON
+            'meetings': [asdict(meeting) for meeting in meetings]
+        }
+    
+    def write_snapshot(self, data: Dict[str, Any]):
+        """Write a snapshot to the JSON file and the binary snapshot beside it"""
+        meeting_rows = [tuple(m.get(name) for name in MEETING_FIELDS) for m in data['meetings']]
+        for meeting_data in data['meetings']:
+            meeting_data.pop('start_epoch', None)
+        
         try:
-            data = {
-                'users': [asdict(user) for user in self.users.values()],
-                'meetings': [asdict(meeting) for meeting in self.meetings.values()]
-            }
-            
             with open(self.data_file, 'w') as f:
                 json.dump(data, f, indent=2)
+            # Our own write is not an external edit
+            self.loaded_signature = self._source_signature()
             
             logger.info("Data saved successfully")
         except Exception as e:
             logger.error(f"Error saving data: {e}")
+            return
+        
+        compact_history(data['users'], data['meetings'])
+        self._write_binary_snapshot(
+            [tuple(u.get(name) for name in USER_FIELDS) for u in data['users']],
+            meeting_rows
+        )
+    
+    def save_data(self, view: Optional[Tuple[List[Tuple[User, int]], List[Meeting]]] = None):
+        """Save current data (or a snapshot_view taken earlier) to JSON file"""
+        self.write_snapshot(self.snapshot(view))
+    
+    def request_save(self):
+        """Persist changes, in the background when running inside the server"""
+        self.data_version += 1
+        self.writer.request_save()
+    
+    def add_meeting(self, meeting: Meeting):
+        """Store a new meeting, add it to its participants' history and index it"""
+        if 'start_index' not in self.__dict__:
+            self._build_indexes()
+        self.meetings[meeting.meeting_id] = meeting
+        for user_id in meeting.participants:
+            self.users[user_id].meeting_history.append(meeting.meeting_id)
+        self.meeting_serial = max(self.meeting_serial, meeting_number(meeting.meeting_id))
+        self._index_meeting(meeting)
+    
+    def _index_meeting(self, meeting: Meeting, starts: Optional[List[Tuple[float, str]]] = None,
+                       user_starts: Optional[Dict[int, List[Tuple[float, str]]]] = None,
+                       by_participant: bool = True):
+        """Add a meeting to every index; bulk builds collect start times instead
+        
+        by_participant=False leaves the participant index alone, for a
+        meeting replaced with the same participants.
+        """
+        if by_participant:
+            for user_id in meeting.participants:
+                self.user_meetings.setdefault(user_id, []).append(meeting.meeting_id)
+        
+        if meeting.recurrence:
+            for scope in [None, *meeting.participants]:
+                self.series.setdefault(scope, []).append(meeting.meeting_id)
+        else:
+            start = meeting.start_epoch
+            self.max_duration = max(self.max_duration, meeting.duration)
+            if starts is not None:
+                starts.append((start, meeting.meeting_id))
+                for user_id in meeting.participants:
+                    user_starts.setdefault(user_id, []).append((start, meeting.meeting_id))
+            else:
+                self.start_index.add(start, meeting.meeting_id)
+                for user_id in meeting.participants:
+                    self.user_start_index.setdefault(user_id, StartTimeIndex()).add(start, meeting.meeting_id)
+        # Window aggregates built earlier already count every loaded meeting
+        for stats in self._stats_scopes(meeting, windows=starts is None):
+            stats.add(meeting)
+        if starts is None:
+            self._invalidate_free_busy(meeting)
+    
+    def _invalidate_free_busy(self, meeting: Meeting):
+        """Drop the cached days a meeting's participants have it on"""
+        for user_id in meeting.participants:
+            if meeting.recurrence:
+                self.free_busy.invalidate(user_id)
+            else:
+                self.free_busy.invalidate(user_id, meeting.start_epoch, meeting.end_epoch)
+    
+    def _unindex_meeting(self, meeting: Meeting, by_participant: bool = True):
+        """Remove a meeting from every index (the inverse of _index_meeting)"""
+        if by_participant:
+            for user_id in meeting.participants:
+                self.user_meetings[user_id].remove(meeting.meeting_id)
+        
+        if meeting.recurrence:
+            for scope in [None, *meeting.participants]:
+                self.series[scope].remove(meeting.meeting_id)
+        else:
+            # max_duration stays put: overlap queries only need an upper bound
+            self.start_index.remove(meeting.start_epoch, meeting.meeting_id)
+            for user_id in meeting.participants:
+                self.user_start_index[user_id].remove(meeting.start_epoch, meeting.meeting_id)
+        for stats in self._stats_scopes(meeting):
+            stats.remove(meeting)
+        self._invalidate_free_busy(meeting)
+        if 'window_stats' in self.__dict__:
+            # Drop emptied trend buckets
+            start = utc_datetime(meeting.start_epoch)
+            for granularity in TREND_GRANULARITIES:
+                bucket = time_bucket(start, granularity)
+                for scope in (None, *meeting.participants):
+                    windows = self.window_stats[(granularity, scope)]
+                    if not windows[bucket].meeting_count:
+                        del windows[bucket]
+    
+    def read_changes(self) -> Optional[Tuple[Tuple[int, int], Dict[str, Any]]]:
+        """The data file's signature and contents, if it was edited since we last loaded or wrote it
+        
+        Returns None while our own writes are pending or before records are
+        loaded (they will load the new file anyway). Safe to run in a thread.
+        """
+        if 'users' not in self.__dict__ or self.writer.pending:
+            return None
+        signature = self._source_signature()
+        if signature is None or signature == self.loaded_signature:
+            return None
+        try:
+            with open(self.data_file, 'r') as f:
+                return signature, json.load(f)
+        except (OSError, ValueError):
+            # Possibly caught mid-write; retried on the next check
+            return None
+    
+    def apply_changes(self, signature: Tuple[int, int], data: Dict[str, Any],
+                      version: int) -> Optional[Dict[str, int]]:
+        """Apply records read by read_changes, diffed against memory by ID
+        
+        Only added, changed and removed users and meetings are rebuilt and
+        re-indexed, so the cost beyond parsing is proportional to the edit.
+        ``version`` is data_version from before reading; if anything changed
+        since, nothing is applied and None is returned.
+        """
+        if self.data_version != version or self.writer.pending:
+            return None
+        users_data = data.get('users', [])
+        meetings_data = data.get('meetings', [])
+        compact_history(users_data, meetings_data)
+        counts = dict.fromkeys(("users_added", "users_updated", "users_removed",
+                                "meetings_added", "meetings_updated", "meetings_removed"), 0)
+        
+        seen_users = set()
+        for user_data in users_data:
+            seen_users.add(user_data['user_id'])
+            old = self.users.get(user_data['user_id'])
+            if old is not None and record_matches(old, user_data, USER_RECORD_FIELDS):
+                continue
+            self.users[user_data['user_id']] = User(**user_data)
+            counts["users_added" if old is None else "users_updated"] += 1
+            self.changes.record(("user", user_data['user_id']), ACTION_CREATED if old is None else ACTION_UPDATED)
+        for user_id in [user_id for user_id in self.users if user_id not in seen_users]:
+            del self.users[user_id]
+            counts["users_removed"] += 1
+            self.changes.record(("user", user_id), ACTION_DELETED)
+        
+        # Indexes not built yet will be built from the updated records
+        indexed = 'start_index' in self.__dict__
+        seen_meetings = set()
+        for meeting_data in meetings_data:
+            meeting_id = meeting_data['meeting_id']
+            seen_meetings.add(meeting_id)
+            old = self.meetings.get(meeting_id)
+            if old is not None and record_matches(old, meeting_data, MEETING_RECORD_FIELDS):
+                continue
+            meeting = Meeting(**meeting_data)
+            moved = old is None or old.participants != meeting.participants
+            if indexed and old is not None:
+                self._unindex_meeting(old, by_participant=moved)
+            self.meetings[meeting_id] = meeting
+            self.meeting_serial = max(self.meeting_serial, meeting_number(meeting_id))
+            if indexed:
+                self._index_meeting(meeting, by_participant=moved)
+            counts["meetings_added" if old is None else "meetings_updated"] += 1
+            self.changes.record(("meeting", meeting_id), ACTION_CREATED if old is None else ACTION_UPDATED)
+        for meeting_id in [meeting_id for meeting_id in self.meetings if meeting_id not in seen_meetings]:
+            if indexed:
+                self._unindex_meeting(self.meetings[meeting_id])
+            del self.meetings[meeting_id]
+            counts["meetings_removed"] += 1
+            self.changes.record(("meeting", meeting_id), ACTION_DELETED)
+        
+        self.loaded_signature = signature
+        if any(counts.values()):
+            self.data_version += 1
+        return counts
+    
+    def reload_changed(self) -> Optional[Dict[str, int]]:
+        """Apply external edits of the data file now (see watch_data_file for the server)"""
+        version = self.data_version
+        changes = self.read_changes()
+        return None if changes is None else self.apply_changes(*changes, version)
+    
+    def get_meeting_history(self, user_id: int, offset: int = 0,
+                            limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """A user's meeting history, with entries kept as meeting IDs expanded
+        
+        Only the requested slice is materialized.
+        """
+        end = None if limit is None else offset + limit
+        return expand_history(self.users[user_id].meeting_history[offset:end], self.meetings)
+    
+    def history_count(self, user_id: int) -> int:
+        return len(self.users[user_id].meeting_history)
+    
+    def get_user_profile(self, user_id: int, offset: int = 0, limit: int = 50,
+                         fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """User profile with one page of meeting history"""
+        error = check_page(offset, limit) or check_fields(fields, HISTORY_FIELDS)
+        if error:
+            return {"error": error}
+        if user_id not in self.users:
+            return {"error": f"User {user_id} not found"}
+        
+        user = self.users[user_id]
+        history = self.get_meeting_history(user_id, offset, limit)
+        return {
+            "user_id": user.user_id,
+            "name": user.name,
+            "timezone": user.timezone,
+            "preferences": user.preferences,
+            "meeting_history": [project(entry, fields) for entry in history],
+            **page_info(self.history_count(user_id), offset, len(history))
+        }
+    
+    def meetings_for_user(self, user_id: int) -> List[Meeting]:
+        """Meetings a user participates in, via the participant index"""
+        return [self.meetings[mid] for mid in self.user_meetings.get(user_id, [])]
+    
+    def busy_intervals(self, user_id: int, window_start: float,
+                       window_end: float) -> List[Tuple[float, float, Meeting]]:
+        """A user's meeting occurrences overlapping [window_start, window_end), as UTC epochs"""
+        busy = []
+        index = self.user_start_index.get(user_id)
+        if index:
+            for pos in index.between(window_start - self.max_duration * 60, window_end):
+                meeting = self.meetings[index.meeting_ids[pos]]
+                if meeting.end_epoch > window_start:
+                    busy.append((meeting.start_epoch, meeting.end_epoch, meeting))
+        
+        series = self.series.get(user_id, ())
+        if series:
+            after, until = utc_datetime(window_start), utc_datetime(window_end)
+            for meeting_id in series:
+                meeting = self.meetings[meeting_id]
+                length = meeting.duration * 60
+                for start in iter_occurrences(meeting, after - timedelta(seconds=length), until):
+                    start = start.timestamp()
+                    if start < window_end:
+                        busy.append((start, start + length, meeting))
+        
+        busy.sort(key=lambda interval: interval[0])
+        return busy
+    
+    def occurrence_start_time(self, meeting: Meeting, start: float) -> str:
+        """Display string for an occurrence, in the meeting's own offset"""
+        if not meeting.recurrence:
+            return meeting.start_time
+        return format_start_time(datetime.fromtimestamp(start, tz=parse_start_time(meeting.start_time).tzinfo))
+    
+    def day_free_busy(self, user_id: int, day_start: float) -> DayFreeBusy:
+        """A user's free/busy for the 24 hours from day_start, from the cache when present"""
+        entry = self.free_busy.get(user_id, day_start)
+        if entry is None:
+            day_end = day_start + DAY_SECONDS
+            busy = [(start, end) for start, end, _ in self.busy_intervals(user_id, day_start, day_end)]
+            entry = DayFreeBusy.build(day_start, self._day_meetings(user_id, day_start, day_end), busy)
+            self.free_busy.put(user_id, day_start, entry)
+        return entry
+    
+    def is_free(self, user_id: int, start: float, end: float) -> bool:
+        """Whether a user has no meeting occurrence overlapping [start, end), by UTC day"""
+        day = start - start % DAY_SECONDS
+        while True:
+            if not self.day_free_busy(user_id, day).is_free(max(start, day), min(end, day + DAY_SECONDS)):
+                return False
+            day += DAY_SECONDS
+            if day >= end:
+                return True
     
     def get_user_availability(self, user_id: int, date: str) -> Dict[str, Any]:
         """Get user availability for a specific date"""
         if user_id not in self.users:
             return {"available": False, "reason": "User not found"}
         
+        try:
+            day_start = parse_start_time(date).timestamp()
+        except ValueError as e:
+            return {"error": f"Invalid date: {e}"}
         user = self.users[user_id]
         
-        # Check existing meetings for conflicts
-        conflicts = []
-        for meeting in self.meetings.values():
-            if user_id in meeting.participants:
-                meeting_date = datetime.fromisoformat(meeting.start_time.replace('Z', '+00:00')).date()
-                if meeting_date.isoformat() == date:
-                    conflicts.append({
-                        "meeting_id": meeting.meeting_id,
-                        "title": meeting.title,
-                        "start_time": meeting.start_time,
-                        "duration": meeting.duration
-                    })
-        
         return {
             "available": True,
             "timezone": user.timezone,
             "preferences": user.preferences,
-            "existing_meetings": conflicts
+            "existing_meetings": list(self.day_free_busy(user_id, day_start).meetings)
         }
     
+    def _day_meetings(self, user_id: int, day_start: float, day_end: float) -> List[Dict[str, Any]]:
+        """Meetings and occurrences a user has starting within [day_start, day_end)"""
+        # One-off meetings from the start-time index
+        conflicts = []
+        index = self.user_start_index.get(user_id)
+        if index:
+            for pos in index.between(day_start, day_end):
+                meeting = self.meetings[index.meeting_ids[pos]]
+                conflicts.append({
+                    "meeting_id": meeting.meeting_id,
+                    "title": meeting.title,
+                    "start_time": meeting.start_time,
+                    "duration": meeting.duration
+                })
+        
+        # Expand recurring series within the requested day only
+        after, until = utc_datetime(day_start - 1e-6), utc_datetime(day_end - 1e-6)
+        for meeting_id in self.series.get(user_id, ()):
+            meeting = self.meetings[meeting_id]
+            for start in iter_occurrences(meeting, after, until):
+                conflicts.append({
+                    "meeting_id": meeting.meeting_id,
+                    "title": meeting.title,
+                    "start_time": format_start_time(start),
+                    "duration": meeting.duration,
+                    "recurring": True
+                })
+        return conflicts
+    
     def suggest_meeting_time(self, participants: List[int], duration: int, 
                            preferred_date: Optional[str] = None) -> Dict[str, Any]:
         """AI-powered meeting time suggestion"""
@@ -124,33 +1187,24 @@ class MeetingAssistant:
         
         # Analyze preferences and find common availability
         # For demo purposes, we'll suggest a few time slots
-        base_date = datetime.now() if not preferred_date else datetime.fromisoformat(preferred_date)
+        # Slots are in UTC unless preferred_date carries an offset
+        base_date = datetime.now(timezone.utc) if not preferred_date else parse_start_time(preferred_date)
         
         for days_ahead in range(1, 8):  # Next 7 days
             for hour in [9, 10, 11, 14, 15, 16]:  # Common business hours
                 suggested_time = base_date.replace(hour=hour, minute=0, second=0, microsecond=0) + timedelta(days=days_ahead)
                 
-                # Check conflicts for all participants
-                has_conflict = False
-                for user in participant_users:
-                    availability = self.get_user_availability(user.user_id, suggested_time.date().isoformat())
-                    if availability.get("existing_meetings"):
-                        # Check for time conflicts
-                        for meeting in availability["existing_meetings"]:
-                            meeting_start = datetime.fromisoformat(meeting["start_time"].replace('Z', '+00:00'))
-                            meeting_end = meeting_start + timedelta(minutes=meeting["duration"])
-                            suggested_end = suggested_time + timedelta(minutes=duration)
-                            
-                            if (suggested_time < meeting_end and suggested_end > meeting_start):
-                                has_conflict = True
-                                break
-                    
-                    if has_conflict:
-                        break
+                # Check conflicts for all participants, including recurring occurrences
+                slot_start = suggested_time.timestamp()
+                slot_end = slot_start + duration * 60
+                has_conflict = not all(
+                    self.is_free(user.user_id, slot_start, slot_end)
+                    for user in participant_users
+                )
                 
                 if not has_conflict:
                     suggestions.append({
-                        "suggested_time": suggested_time.isoformat(),
+                        "suggested_time": format_start_time(suggested_time),
                         "confidence": 0.8,  # Demo confidence score
                         "reason": "No conflicts found, matches general business hours"
                     })
@@ -166,29 +1220,82 @@ class MeetingAssistant:
             "participants": [{"user_id": u.user_id, "name": u.name, "timezone": u.timezone} for u in participant_users]
         }
     
-    def analyze_meeting_effectiveness(self, user_id: Optional[int] = None) -> Dict[str, Any]:
-        """Analyze meeting effectiveness and provide insights"""
-        meetings_to_analyze = []
+    def _stats_scopes(self, meeting: Meeting, windows: bool = True) -> List[EffectivenessStats]:
+        """Every running aggregate a meeting contributes to (windows=False: overall and per user only)"""
+        scopes = []
+        for scope in (None, *meeting.participants):
+            stats = self.stats.get(scope)
+            if stats is None:
+                stats = self.stats[scope] = EffectivenessStats()
+            scopes.append(stats)
+        if windows and 'window_stats' in self.__dict__:
+            scopes.extend(self._window_scopes(meeting))
+        return scopes
+    
+    def _window_scopes(self, meeting: Meeting) -> List[EffectivenessStats]:
+        """The week and month aggregates a meeting contributes to (UTC buckets)"""
+        start = utc_datetime(meeting.start_epoch)
+        scopes = []
+        for granularity in TREND_GRANULARITIES:
+            bucket = time_bucket(start, granularity)
+            for scope in (None, *meeting.participants):
+                windows = self.window_stats.setdefault((granularity, scope), {})
+                stats = windows.get(bucket)
+                if stats is None:
+                    stats = windows[bucket] = EffectivenessStats()
+                scopes.append(stats)
+        return scopes
+    
+    def analyze_meeting_effectiveness(self, user_id: Optional[int] = None,
+                                      start_date: Optional[str] = None, end_date: Optional[str] = None,
+                                      offset: int = 0, limit: int = 50,
+                                      fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Analyze meeting effectiveness and provide insights
+        
+        Summaries come from running aggregates in O(1); a date range is
+        answered from the start-time index. The breakdown is paginated.
+        """
+        error = check_page(offset, limit) or check_fields(fields, BREAKDOWN_FIELDS)
+        if error:
+            return {"error": error}
+        
+        index = self.start_index if user_id is None else self.user_start_index.get(user_id, StartTimeIndex())
+        
+        # Recurring series count once, at their first occurrence
+        series = self.series.get(user_id, [])
         
-        if user_id:
-            # Analyze meetings for specific user
-            for meeting in self.meetings.values():
-                if user_id in meeting.participants:
-                    meetings_to_analyze.append(meeting)
+        if start_date or end_date:
+            # Whole days, inclusive on both ends
+            after = parse_start_time(start_date).timestamp() - 1e-6 if start_date else float('-inf')
+            until = (parse_start_time(end_date) + timedelta(days=1)).timestamp() - 1e-6 if end_date else float('inf')
+            span = index.span(after, until)
+            series = [
+                mid for mid in series
+                if after < self.meetings[mid].start_epoch <= until
+            ]
+            stats = EffectivenessStats()
+            for pos in span:
+                stats.add(self.meetings[index.meeting_ids[pos]])
+            for mid in series:
+                stats.add(self.meetings[mid])
         else:
-            # Analyze all meetings
-            meetings_to_analyze = list(self.meetings.values())
+            span = range(len(index))
+            stats = self.stats.get(user_id, EffectivenessStats())
+        
+        # Breakdown order: one-off meetings by start time, then series
+        breakdown_ids = [index.meeting_ids[pos] for pos in span[offset:offset + limit]]
+        series_offset = max(0, offset - len(span))
+        breakdown_ids += series[series_offset:series_offset + limit - len(breakdown_ids)]
+        breakdown_total = len(span) + len(series)
         
-        if not meetings_to_analyze:
+        if not stats.meeting_count:
             return {"error": "No meetings found for analysis"}
         
         # Calculate statistics
-        total_meetings = len(meetings_to_analyze)
-        total_duration = sum(m.duration for m in meetings_to_analyze)
-        avg_duration = total_duration / total_meetings if total_meetings > 0 else 0
-        
-        scored_meetings = [m for m in meetings_to_analyze if m.effectiveness_score is not None]
-        avg_effectiveness = sum(m.effectiveness_score for m in scored_meetings if m.effectiveness_score is not None) / len(scored_meetings) if scored_meetings else 0
+        total_meetings = stats.meeting_count
+        total_duration = stats.total_duration
+        avg_duration = stats.average_duration()
+        avg_effectiveness = stats.average_effectiveness()
         
         # Insights
         insights = []
@@ -206,228 +1313,584 @@ class MeetingAssistant:
             "average_effectiveness_score": round(avg_effectiveness, 2),
             "insights": insights,
             "meeting_breakdown": [
-                {
+                project({
                     "meeting_id": m.meeting_id,
                     "title": m.title,
                     "duration": m.duration,
                     "effectiveness_score": m.effectiveness_score
+                }, fields)
+                for m in (self.meetings[mid] for mid in breakdown_ids)
+            ],
+            **page_info(breakdown_total, offset, len(breakdown_ids))
+        }
+    
+    def get_effectiveness_trend(self, user_id: Optional[int] = None, granularity: str = "week",
+                                periods: int = 12) -> Dict[str, Any]:
+        """Per-week or per-month effectiveness aggregates, most recent last"""
+        if granularity not in TREND_GRANULARITIES:
+            return {"error": f"Invalid granularity. Must be one of: {list(TREND_GRANULARITIES)}"}
+        if periods < 1 or periods > MAX_PAGE_SIZE:
+            return {"error": f"Periods must be between 1 and {MAX_PAGE_SIZE}"}
+        
+        windows = self.window_stats.get((granularity, user_id), {})
+        recent = sorted(windows)[-periods:]
+        
+        return {
+            "user_id": user_id,
+            "granularity": granularity,
+            "trend": [
+                {
+                    "period": bucket,
+                    "total_meetings": windows[bucket].meeting_count,
+                    "total_duration_minutes": windows[bucket].total_duration,
+                    "average_duration_minutes": round(windows[bucket].average_duration(), 2),
+                    "average_effectiveness_score": round(windows[bucket].average_effectiveness(), 2),
+                    "scored_meetings": windows[bucket].scored_count
                 }
-                for m in meetings_to_analyze
+                for bucket in recent
+            ]
+        }
+    
+    def create_user(self, name: str, timezone: str, preferences: str) -> Dict[str, Any]:
+        """Create a new user profile"""
+        # Generate new user ID
+        new_user_id = max(self.users.keys()) + 1 if self.users else 1
+        
+        user = User(
+            user_id=new_user_id,
+            name=name,
+            timezone=timezone,
+            preferences=preferences,
+            meeting_history=[]
+        )
+        
+        self.users[new_user_id] = user
+        self.changes.record(("user", new_user_id), ACTION_CREATED)
+        self.request_save()
+        
+        return {
+            "success": True,
+            "user_id": new_user_id,
+            "message": f"User '{name}' created successfully"
+        }
+    
+    def update_user_preferences(self, user_id: int, preferences: str) -> Dict[str, Any]:
+        """Update user preferences"""
+        if user_id not in self.users:
+            return {"error": f"User {user_id} not found"}
+        
+        # Replaced, not modified, so snapshot views taken earlier stay intact
+        self.users[user_id] = replace(self.users[user_id], preferences=preferences)
+        self.changes.record(("user", user_id), ACTION_UPDATED)
+        self.request_save()
+        
+        return {
+            "success": True,
+            "message": f"Preferences updated for user {user_id}"
+        }
+    
+    def schedule_meeting(self, title: str, participants: List[int], start_time: str,
+                         duration: int, agenda: str,
+                         recurrence: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Schedule a new meeting or recurring series after checking participant conflicts"""
+        # Generate meeting ID
+        meeting_id = self._next_meeting_id()
+        
+        # Validate participants
+        invalid_participants = [p for p in participants if p not in self.users]
+        if invalid_participants:
+            return {"error": f"Invalid participants: {invalid_participants}"}
+        
+        if recurrence:
+            try:
+                recurrence = normalize_recurrence(recurrence)
+            except (TypeError, ValueError) as e:
+                return {"error": f"Invalid recurrence: {e}"}
+        
+        meeting = Meeting(
+            meeting_id=meeting_id,
+            title=title,
+            participants=participants,
+            start_time=start_time,
+            duration=duration,
+            agenda=agenda,
+            recurrence=recurrence or None
+        )
+        
+        # Check for conflicts; a new series is checked over a bounded horizon
+        if recurrence:
+            first = parse_start_time(start_time)
+            horizon = first + timedelta(days=RECURRENCE_CONFLICT_HORIZON_DAYS)
+            new_starts = [start.timestamp() for start in iter_occurrences(meeting, first - timedelta(microseconds=1), horizon)]
+        else:
+            new_starts = [meeting.start_epoch]
+        conflicts = []
+        for new_start in new_starts:
+            for participant in participants:
+                for busy_start, _, existing_meeting in self.busy_intervals(participant, new_start, new_start + duration * 60):
+                    conflicts.append({
+                        "participant": participant,
+                        "conflicting_meeting": existing_meeting.title,
+                        "conflict_time": self.occurrence_start_time(existing_meeting, busy_start)
+                    })
+        
+        if conflicts:
+            return {
+                "error": "Scheduling conflicts detected",
+                "conflicts": conflicts
+            }
+        
+        self.add_meeting(meeting)
+        self.changes.record(("meeting", meeting_id), ACTION_CREATED)
+        self.request_save()
+        
+        return {
+            "success": True,
+            "meeting_id": meeting_id,
+            "message": f"Meeting '{title}' scheduled successfully"
+        }
+    
+    def schedule_meetings_batch(self, requests: List[Dict[str, Any]], dry_run: bool = False,
+                                slot_minutes: int = BATCH_SLOT_MINUTES) -> Dict[str, Any]:
+        """Place many meeting requests at once with a conflict-free plan
+        
+        Each request needs title, participants, duration and a window
+        (window_start/window_end); priority (higher first) and agenda are
+        optional. With dry_run the plan is returned without scheduling.
+        """
+        if not requests:
+            return {"error": "No meeting requests provided"}
+        if len(requests) > MAX_BATCH_REQUESTS:
+            return {"error": f"Maximum {MAX_BATCH_REQUESTS} meeting requests allowed per batch"}
+        if slot_minutes < 5 or slot_minutes > 60:
+            return {"error": "Slot minutes must be between 5 and 60"}
+        
+        valid = []
+        unplaceable = []
+        for i, item in enumerate(requests):
+            try:
+                participants = list(dict.fromkeys(item["participants"]))
+                duration = int(item["duration"])
+                window_start = parse_start_time(item["window_start"])
+                window_end = parse_start_time(item["window_end"])
+                request = {
+                    "index": i,
+                    "title": item["title"],
+                    "agenda": item.get("agenda", ""),
+                    "participants": participants,
+                    "duration": duration,
+                    "priority": int(item.get("priority", 0)),
+                    "window_start": window_start.timestamp(),
+                    "window_end": window_end.timestamp(),
+                    "slots": -(-duration // slot_minutes)
+                }
+            except (KeyError, TypeError, ValueError) as e:
+                unplaceable.append({"request": i, "title": item.get("title") if isinstance(item, dict) else None,
+                                    "reason": f"Invalid request: {e}"})
+                continue
+            
+            invalid_participants = [p for p in participants if p not in self.users]
+            if not participants or invalid_participants:
+                reason = f"Invalid participants: {invalid_participants}" if participants else "No participants"
+                unplaceable.append({"request": i, "title": request["title"], "reason": reason})
+            elif duration <= 0 or window_end <= window_start:
+                unplaceable.append({"request": i, "title": request["title"],
+                                    "reason": "Duration and window must be positive"})
+            else:
+                valid.append(request)
+        
+        scheduled = []
+        if valid:
+            horizon_start = datetime.fromtimestamp(min(r["window_start"] for r in valid), tz=timezone.utc)
+            horizon_end = datetime.fromtimestamp(max(r["window_end"] for r in valid), tz=timezone.utc)
+            if horizon_end - horizon_start > timedelta(days=MAX_BATCH_HORIZON_DAYS):
+                return {"error": f"Request windows must fit within {MAX_BATCH_HORIZON_DAYS} days"}
+            
+            scheduler = BatchScheduler(self, horizon_start, horizon_end, slot_minutes)
+            placed, unplaced = scheduler.plan(valid)
+            
+            for pos in sorted(placed, key=lambda pos: valid[pos]["index"]):
+                request = valid[pos]
+                start_time = format_start_time(scheduler.slot_start(placed[pos]))
+                entry = {
+                    "request": request["index"],
+                    "title": request["title"],
+                    "start_time": start_time,
+                    "duration": request["duration"],
+                    "participants": request["participants"]
+                }
+                if not dry_run:
+                    meeting_id = self._next_meeting_id()
+                    self.add_meeting(Meeting(
+                        meeting_id=meeting_id,
+                        title=request["title"],
+                        participants=request["participants"],
+                        start_time=start_time,
+                        duration=request["duration"],
+                        agenda=request["agenda"]
+                    ))
+                    self.changes.record(("meeting", meeting_id), ACTION_CREATED)
+                    entry["meeting_id"] = meeting_id
+                scheduled.append(entry)
+            
+            for pos in unplaced:
+                unplaceable.append({"request": valid[pos]["index"], "title": valid[pos]["title"],
+                                    "reason": "No common free slot within the requested window"})
+        
+        if scheduled and not dry_run:
+            self.request_save()
+        
+        unplaceable.sort(key=lambda entry: entry["request"])
+        return {
+            "success": True,
+            "dry_run": dry_run,
+            "scheduled": scheduled,
+            "unplaceable": unplaceable,
+            "scheduled_count": len(scheduled),
+            "unplaceable_count": len(unplaceable)
+        }
+    
+    def update_meeting_effectiveness(self, meeting_id: str, effectiveness_score: int) -> Dict[str, Any]:
+        """Update meeting effectiveness score (1-10)"""
+        if meeting_id not in self.meetings:
+            return {"error": f"Meeting {meeting_id} not found"}
+        
+        if not (1 <= effectiveness_score <= 10):
+            return {"error": "Effectiveness score must be between 1 and 10"}
+        
+        meeting = self.meetings[meeting_id]
+        for stats in self._stats_scopes(meeting):
+            stats.rescore(meeting.effectiveness_score, effectiveness_score)
+        self.meetings[meeting_id] = replace(meeting, effectiveness_score=effectiveness_score)
+        self.changes.record(("meeting", meeting_id), ACTION_UPDATED)
+        self.request_save()
+        
+        return {
+            "success": True,
+            "message": f"Effectiveness score updated for meeting {meeting_id}"
+        }
+
+    def get_meeting_details(self, meeting_id: str) -> Dict[str, Any]:
+        """Get details of a specific meeting"""
+        if meeting_id not in self.meetings:
+            return {"error": f"Meeting {meeting_id} not found"}
+        
+        meeting = self.meetings[meeting_id]
+        details = {
+            "meeting_id": meeting.meeting_id,
+            "title": meeting.title,
+            "participants": [
+                {"user_id": uid, "name": self.users[uid].name}
+                for uid in meeting.participants
+                if uid in self.users
+            ],
+            "start_time": meeting.start_time,
+            "duration": meeting.duration,
+            "agenda": meeting.agenda,
+            "effectiveness_score": meeting.effectiveness_score
+        }
+        if meeting.recurrence:
+            details["recurrence"] = meeting.recurrence
+        return details
+    
+    def get_changes_since(self, version: int, limit: int = 50) -> Dict[str, Any]:
+        """Users and meetings changed after version, for clients syncing deltas
+        
+        Each changed record appears once, in its current state (or as
+        removed), ordered by its latest change; the cost is proportional to
+        the number of changes. Continue from the returned version. With
+        "resync" the changes are no longer all retained: refetch the full
+        lists, then continue from that version.
+        """
+        error = check_page(0, limit)
+        if error:
+            return {"error": error}
+        
+        changes = self.changes.since(version)
+        if changes is None:
+            return {"version": self.changes.version, "resync": True, "changes": [], "has_more": False}
+        
+        page = changes[:limit]
+        items = []
+        for change_version, (kind, key), action in page:
+            item = {"version": change_version, "type": kind, "id": key, "action": action}
+            if action != ACTION_DELETED:
+                if kind == "user":
+                    user = self.users[key]
+                    item["user"] = {"user_id": user.user_id, "name": user.name,
+                                    "timezone": user.timezone, "preferences": user.preferences}
+                else:
+                    item["meeting"] = self.get_meeting_details(key)
+            items.append(item)
+        has_more = len(changes) > limit
+        return {
+            "version": page[-1][0] if has_more else self.changes.version,
+            "resync": False,
+            "changes": items,
+            "has_more": has_more
+        }
+    
+    def _upcoming_entry(self, meeting: Meeting, start_time: str,
+                        fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        entry = {
+            "meeting_id": meeting.meeting_id,
+            "title": meeting.title,
+            "start_time": start_time,
+            "duration": meeting.duration
+        }
+        if not fields or "participants" in fields:
+            entry["participants"] = [
+                {"user_id": uid, "name": self.users[uid].name}
+                for uid in meeting.participants
+                if uid in self.users
             ]
+        if meeting.recurrence:
+            entry["recurring"] = True
+        return project(entry, fields)
+    
+    def list_upcoming_meetings(self, user_id: Optional[int] = None, days_ahead: int = 7,
+                               offset: int = 0, limit: int = 50,
+                               fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """List upcoming meetings via the start-time index, O(log n + page size)
+        
+        Recurring series in scope are expanded within the window and merged
+        in start order, which costs time proportional to the window instead.
+        """
+        error = check_page(offset, limit) or check_fields(fields, UPCOMING_FIELDS)
+        if error:
+            return {"error": error}
+        
+        current_time = datetime.now(timezone.utc)
+        cutoff_time = current_time + timedelta(days=days_ahead)
+        
+        index = self.start_index if user_id is None else self.user_start_index.get(user_id, StartTimeIndex())
+        span = index.span(current_time.timestamp(), cutoff_time.timestamp())
+        series = self.series.get(user_id, [])
+        
+        if not series:
+            window = [(index.meeting_ids[pos], None) for pos in span[offset:offset + limit]]
+            total = len(span)
+        else:
+            streams = [((index.starts[pos], index.meeting_ids[pos], None) for pos in span)]
+            # Series are expanded as datetimes to keep calendar arithmetic in their own offset
+            for meeting_id in series:
+                streams.append(
+                    (start.timestamp(), meeting_id, start)
+                    for start in iter_occurrences(self.meetings[meeting_id], current_time, cutoff_time)
+                )
+            merged = list(heapq.merge(*streams, key=lambda item: item[0]))
+            window = [(meeting_id, start) for _, meeting_id, start in merged[offset:offset + limit]]
+            total = len(merged)
+        
+        upcoming_meetings = []
+        for meeting_id, start in window:
+            meeting = self.meetings[meeting_id]
+            start_time = format_start_time(start) if start else meeting.start_time
+            upcoming_meetings.append(self._upcoming_entry(meeting, start_time, fields))
+        
+        return {
+            "upcoming_meetings": upcoming_meetings,
+            **page_info(total, offset, len(window))
         }
 
 # Initialize the meeting assistant
 meeting_assistant = MeetingAssistant()
+suggestion_results = AsyncSingleFlightCache("meeting_suggestions", lambda: meeting_assistant.data_version,
+                                           metrics=metrics)
+# Held by tools while they use meeting_assistant, and by suggestions
+# computed off the event loop, so the two never overlap
+assistant_lock = threading.Lock()
+
+def holding_assistant_lock(func):
+    """Run a tool handler under assistant_lock"""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        with assistant_lock:
+            return await func(*args, **kwargs)
+    return wrapper
+
+async def watch_data_file(assistant: MeetingAssistant, interval: float):
+    """Poll the data file and apply external edits; parsing runs off the event loop"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            version = assistant.data_version
+            changes = await asyncio.to_thread(assistant.read_changes)
+            if changes is None:
+                continue
+            with assistant_lock:
+                applied = assistant.apply_changes(*changes, version)
+            if applied and any(applied.values()):
+                logger.info(f"Reloaded {assistant.data_file}: {applied}")
+        except Exception as e:
+            logger.error(f"Error reloading data: {e}")
+
+# Seconds between checks for external edits of the data file; 0 turns reloading off
+DATA_RELOAD_INTERVAL = float(os.environ.get("DATA_RELOAD_INTERVAL", "0"))
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Watch the data file if enabled; flush pending background writes when the server shuts down"""
+    watcher = None
+    if DATA_RELOAD_INTERVAL > 0:
+        watcher = asyncio.create_task(watch_data_file(meeting_assistant, DATA_RELOAD_INTERVAL))
+    try:
+        yield
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        await meeting_assistant.writer.flush()
+        if metrics.dump_file is not None:
+            metrics.dump_prometheus()
 
 # Create FastMCP server
-mcp = FastMCP("Smart Meeting Assistant")
+mcp = FastMCP("Smart Meeting Assistant", lifespan=lifespan)
+
+# Tool handlers are async: reads are served from in-memory state and
+# writes hand persistence to the background writer, so no handler blocks
+# the event loop on file I/O. Each is wrapped by metrics.instrument, and
+# those using the assistant by holding_assistant_lock.
 
 @mcp.tool()
-def get_user_profile(user_id: int) -> Dict[str, Any]:
-    """Get user profile including preferences and meeting history"""
-    if user_id not in meeting_assistant.users:
-        return {"error": f"User {user_id} not found"}
-    
-    user = meeting_assistant.users[user_id]
-    return {
-        "user_id": user.user_id,
-        "name": user.name,
-        "timezone": user.timezone,
-        "preferences": user.preferences,
-        "meeting_history": user.meeting_history
-    }
+@metrics.instrument
+@holding_assistant_lock
+async def get_user_profile(user_id: int, offset: int = 0, limit: int = 50,
+                           fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Get user profile including preferences and a page of meeting history (fields: meeting_id, date, duration)"""
+    return meeting_assistant.get_user_profile(user_id, offset, limit, fields)
 
 @mcp.tool()
-def create_user(name: str, timezone: str, preferences: str) -> Dict[str, Any]:
+@metrics.instrument
+@holding_assistant_lock
+async def create_user(name: str, timezone: str, preferences: str) -> Dict[str, Any]:
     """Create a new user profile"""
-    # Generate new user ID
-    new_user_id = max(meeting_assistant.users.keys()) + 1 if meeting_assistant.users else 1
-    
-    user = User(
-        user_id=new_user_id,
-        name=name,
-        timezone=timezone,
-        preferences=preferences,
-        meeting_history=[]
-    )
-    
-    meeting_assistant.users[new_user_id] = user
-    meeting_assistant.save_data()
-    
-    return {
-        "success": True,
-        "user_id": new_user_id,
-        "message": f"User '{name}' created successfully"
-    }
+    return meeting_assistant.create_user(name, timezone, preferences)
 
 @mcp.tool()
-def update_user_preferences(user_id: int, preferences: str) -> Dict[str, Any]:
+@metrics.instrument
+@holding_assistant_lock
+async def update_user_preferences(user_id: int, preferences: str) -> Dict[str, Any]:
     """Update user preferences"""
-    if user_id not in meeting_assistant.users:
-        return {"error": f"User {user_id} not found"}
-    
-    meeting_assistant.users[user_id].preferences = preferences
-    meeting_assistant.save_data()
-    
-    return {
-        "success": True,
-        "message": f"Preferences updated for user {user_id}"
-    }
+    return meeting_assistant.update_user_preferences(user_id, preferences)
 
 @mcp.tool()
-def check_availability(user_id: int, date: str) -> Dict[str, Any]:
+@metrics.instrument
+@holding_assistant_lock
+async def check_availability(user_id: int, date: str) -> Dict[str, Any]:
     """Check user availability for a specific date (YYYY-MM-DD)"""
     return meeting_assistant.get_user_availability(user_id, date)
 
 @mcp.tool()
-def schedule_meeting(title: str, participants: List[int], start_time: str, 
-                    duration: int, agenda: str) -> Dict[str, Any]:
-    """Schedule a new meeting"""
-    # Generate meeting ID
-    meeting_id = f"M{len(meeting_assistant.meetings) + 1:03d}"
-    
-    # Validate participants
-    invalid_participants = [p for p in participants if p not in meeting_assistant.users]
-    if invalid_participants:
-        return {"error": f"Invalid participants: {invalid_participants}"}
-    
-    # Check for conflicts
-    conflicts = []
-    for participant in participants:
-        availability = meeting_assistant.get_user_availability(
-            participant, 
-            datetime.fromisoformat(start_time.replace('Z', '+00:00')).date().isoformat()
-        )
-        
-        if availability.get("existing_meetings"):
-            for existing_meeting in availability["existing_meetings"]:
-                meeting_start = datetime.fromisoformat(existing_meeting["start_time"].replace('Z', '+00:00'))
-                meeting_end = meeting_start + timedelta(minutes=existing_meeting["duration"])
-                new_start = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                new_end = new_start + timedelta(minutes=duration)
-                
-                if (new_start < meeting_end and new_end > meeting_start):
-                    conflicts.append({
-                        "participant": participant,
-                        "conflicting_meeting": existing_meeting["title"],
-                        "conflict_time": existing_meeting["start_time"]
-                    })
-    
-    if conflicts:
-        return {
-            "error": "Scheduling conflicts detected",
-            "conflicts": conflicts
-        }
+@metrics.instrument
+@holding_assistant_lock
+async def schedule_meeting(title: str, participants: List[int], start_time: str, 
+                           duration: int, agenda: str,
+                           recurrence: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Schedule a new meeting, optionally recurring (freq: daily/weekly/monthly, interval, count, until, byweekday, exdates)"""
+    return meeting_assistant.schedule_meeting(title, participants, start_time, duration, agenda, recurrence)
+
+@mcp.tool()
+@metrics.instrument
+@holding_assistant_lock
+async def schedule_meetings_batch(requests: List[Dict[str, Any]], dry_run: bool = False,
+                                  slot_minutes: int = 15) -> Dict[str, Any]:
+    """Schedule many meetings at once; each request has title, participants, duration, window_start, window_end and optional priority/agenda"""
+    return meeting_assistant.schedule_meetings_batch(requests, dry_run, slot_minutes)
+
+@mcp.tool()
+@metrics.instrument
+async def get_meeting_suggestions(participants: List[int], duration: int, 
+                                  preferred_date: Optional[str] = None) -> Dict[str, Any]:
+    """Get AI-powered meeting time suggestions"""
+    # Order and repeats do not change the answer, so such calls share one computation
+    unique = tuple(sorted(set(participants)))
     
-    # Create meeting
-    meeting = Meeting(
-        meeting_id=meeting_id,
-        title=title,
-        participants=participants,
-        start_time=start_time,
-        duration=duration,
-        agenda=agenda
-    )
-    
-    meeting_assistant.meetings[meeting_id] = meeting
-    
-    # Update user meeting history
-    for participant in participants:
-        meeting_assistant.users[participant].meeting_history.append({
-            "meeting_id": meeting_id,
-            "date": datetime.fromisoformat(start_time.replace('Z', '+00:00')).date().isoformat(),
-            "duration": duration
-        })
+    def suggest():
+        with assistant_lock:
+            return meeting_assistant.suggest_meeting_time(list(unique), duration, preferred_date)
     
-    meeting_assistant.save_data()
+    async def compute():
+        # Off the event loop, so identical calls arriving meanwhile wait on this one
+        return await asyncio.to_thread(suggest)
     
-    return {
-        "success": True,
-        "meeting_id": meeting_id,
-        "message": f"Meeting '{title}' scheduled successfully"
-    }
+    return await suggestion_results.run((unique, duration, preferred_date), compute)
 
 @mcp.tool()
-def get_meeting_suggestions(participants: List[int], duration: int, 
-                           preferred_date: Optional[str] = None) -> Dict[str, Any]:
-    """Get AI-powered meeting time suggestions"""
-    return meeting_assistant.suggest_meeting_time(participants, duration, preferred_date)
+@metrics.instrument
+@holding_assistant_lock
+async def get_meeting_details(meeting_id: str) -> Dict[str, Any]:
+    """Get details of a specific meeting"""
+    return meeting_assistant.get_meeting_details(meeting_id)
 
 @mcp.tool()
-def get_meeting_details(meeting_id: str) -> Dict[str, Any]:
-    """Get details of a specific meeting"""
-    if meeting_id not in meeting_assistant.meetings:
-        return {"error": f"Meeting {meeting_id} not found"}
-    
-    meeting = meeting_assistant.meetings[meeting_id]
-    return {
-        "meeting_id": meeting.meeting_id,
-        "title": meeting.title,
-        "participants": [
-            {"user_id": uid, "name": meeting_assistant.users[uid].name}
-            for uid in meeting.participants
-            if uid in meeting_assistant.users
-        ],
-        "start_time": meeting.start_time,
-        "duration": meeting.duration,
-        "agenda": meeting.agenda,
-        "effectiveness_score": meeting.effectiveness_score
-    }
+@metrics.instrument
+@holding_assistant_lock
+async def analyze_meeting_effectiveness(user_id: Optional[int] = None, start_date: Optional[str] = None,
+                                        end_date: Optional[str] = None, offset: int = 0,
+                                        limit: int = 50, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Analyze meeting effectiveness and provide insights, optionally within a date range (YYYY-MM-DD); the breakdown is paged and fields selects its keys"""
+    return meeting_assistant.analyze_meeting_effectiveness(user_id, start_date, end_date, offset, limit, fields)
 
 @mcp.tool()
-def analyze_meeting_effectiveness(user_id: Optional[int] = None) -> Dict[str, Any]:
-    """Analyze meeting effectiveness and provide insights"""
-    return meeting_assistant.analyze_meeting_effectiveness(user_id)
+@metrics.instrument
+@holding_assistant_lock
+async def get_effectiveness_trend(user_id: Optional[int] = None, granularity: str = "week",
+                                  periods: int = 12) -> Dict[str, Any]:
+    """Get weekly or monthly meeting effectiveness trend"""
+    return meeting_assistant.get_effectiveness_trend(user_id, granularity, periods)
 
 @mcp.tool()
-def update_meeting_effectiveness(meeting_id: str, effectiveness_score: int) -> Dict[str, Any]:
+@metrics.instrument
+@holding_assistant_lock
+async def update_meeting_effectiveness(meeting_id: str, effectiveness_score: int) -> Dict[str, Any]:
     """Update meeting effectiveness score (1-10)"""
-    if meeting_id not in meeting_assistant.meetings:
-        return {"error": f"Meeting {meeting_id} not found"}
-    
-    if not (1 <= effectiveness_score <= 10):
-        return {"error": "Effectiveness score must be between 1 and 10"}
-    
-    meeting_assistant.meetings[meeting_id].effectiveness_score = effectiveness_score
-    meeting_assistant.save_data()
-    
-    return {
-        "success": True,
-        "message": f"Effectiveness score updated for meeting {meeting_id}"
-    }
+    return meeting_assistant.update_meeting_effectiveness(meeting_id, effectiveness_score)
 
 @mcp.tool()
-def list_upcoming_meetings(user_id: Optional[int] = None, days_ahead: int = 7) -> Dict[str, Any]:
-    """List upcoming meetings for a user or all users"""
-    current_time = datetime.now()
-    cutoff_time = current_time + timedelta(days=days_ahead)
-    
-    upcoming_meetings = []
-    
-    for meeting in meeting_assistant.meetings.values():
-        meeting_time = datetime.fromisoformat(meeting.start_time.replace('Z', '+00:00'))
-        
-        if meeting_time > current_time and meeting_time <= cutoff_time:
-            if user_id is None or user_id in meeting.participants:
-                upcoming_meetings.append({
-                    "meeting_id": meeting.meeting_id,
-                    "title": meeting.title,
-                    "start_time": meeting.start_time,
-                    "duration": meeting.duration,
-                    "participants": [
-                        {"user_id": uid, "name": meeting_assistant.users[uid].name}
-                        for uid in meeting.participants
-                        if uid in meeting_assistant.users
-                    ]
-                })
-    
-    # Sort by start time
-    upcoming_meetings.sort(key=lambda x: x["start_time"])
-    
-    return {
-        "upcoming_meetings": upcoming_meetings,
-        "total_count": len(upcoming_meetings)
-    }
+@metrics.instrument
+@holding_assistant_lock
+async def list_upcoming_meetings(user_id: Optional[int] = None, days_ahead: int = 7,
+                                 offset: int = 0, limit: int = 50,
+                                 fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """List upcoming meetings for a user or all users, paginated by offset/limit; fields selects item keys"""
+    return meeting_assistant.list_upcoming_meetings(user_id, days_ahead, offset, limit, fields)
+
+@mcp.tool()
+@metrics.instrument
+@holding_assistant_lock
+async def get_changes_since(version: int, limit: int = 50) -> Dict[str, Any]:
+    """Users and meetings changed after a version, to sync deltas instead of full lists; resync=true means refetch everything"""
+    return meeting_assistant.get_changes_since(version, limit)
+
+@mcp.tool()
+async def get_server_metrics(format: str = "json") -> Dict[str, Any]:
+    """Per-tool call counts, latency percentiles, errors, payload sizes and cache hit rates (format: json or prometheus)"""
+    if format == "prometheus":
+        return {"format": "prometheus", "text": metrics.prometheus_text()}
+    if format != "json":
+        return {"error": "format must be 'json' or 'prometheus'"}
+    return metrics.report()
+
+@mcp.tool()
+async def configure_profiling(sample_rate: float, tools: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Profile a fraction (0-1) of tool calls with cProfile, optionally only the named tools; 0 turns profiling off"""
+    try:
+        profiler.configure(sample_rate, tools)
+    except ValueError as e:
+        return {"error": str(e)}
+    return {"success": True, "profiling": profiler.settings()}
+
+@mcp.tool()
+async def get_profile_hotspots(limit: int = 20, sort: str = "cumulative", tool: Optional[str] = None,
+                               recent: int = 50) -> Dict[str, Any]:
+    """Top functions across the most recent profiled calls (sort: cumulative, total or calls)"""
+    if sort not in PROFILE_SORT_KEYS:
+        return {"error": f"sort must be one of: {list(PROFILE_SORT_KEYS)}"}
+    if limit < 1 or limit > 200 or recent < 1:
+        return {"error": "limit must be between 1 and 200 and recent at least 1"}
+    result = profiler.hotspots(limit, sort, tool, recent)
+    result["profiling"] = profiler.settings()
+    return result
 
 if __name__ == "__main__":
     mcp.run()
@@ -6,12 +6,16 @@ Basic tests for Smart Meeting Assistant Server
 import sys
 import os
 import json
+import asyncio
+import shutil
+import tempfile
 from pathlib import Path
 
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from server import MeetingAssistant, User, Meeting
+import server
+from server import MeetingAssistant, User, Meeting, ToolMetrics, ToolProfiler, AsyncSingleFlightCache, FreeBusyCache, ChangeLog, ACTION_DELETED, parse_start_time, SNAPSHOT_VERSION
 
 def test_data_loading():
     """Test that sample data loads correctly"""
@@ -46,6 +50,9 @@ def test_user_availability():
     availability = assistant.get_user_availability(999, "2025-10-01")
     assert availability["available"] == False, "Non-existing user should not be available"
     
+    # Malformed dates are reported, not raised
+    assert "error" in assistant.get_user_availability(1, "2025-13-45"), "Invalid date should return an error"
+    
     print("✓ User availability test passed")
 
 def test_meeting_suggestions():
@@ -109,6 +116,682 @@ def test_new_user_creation():
     
     print("✓ New user creation test passed")
 
+def make_temp_assistant():
+    """Create an assistant backed by a scratch copy of the sample data"""
+    temp_dir = tempfile.mkdtemp()
+    data_file = Path(temp_dir) / "sample_content.json"
+    shutil.copy("data/sample_content.json", data_file)
+    return MeetingAssistant(str(data_file))
+
+def test_background_writer_coalesces_saves():
+    """Test that mutations inside the event loop are flushed once, off-loop"""
+    print("Testing background writer...")
+    
+    assistant = make_temp_assistant()
+    writes = []
+    original_write = assistant.write_snapshot
+    
+    def counting_write(data):
+        writes.append(data)
+        original_write(data)
+    
+    assistant.write_snapshot = counting_write
+    
+    async def burst():
+        for i in range(5):
+            assistant.create_user(f"User {i}", "UTC", "Any time")
+        # Nothing written yet: the writer is still coalescing
+        assert writes == [], "Save should not happen on the request path"
+        await assistant.writer.flush()
+    
+    asyncio.run(burst())
+    
+    assert len(writes) == 1, "Burst of mutations should produce one flush"
+    with open(assistant.data_file) as f:
+        saved = json.load(f)
+    assert len(saved["users"]) == len(assistant.users), "Flushed data should include all new users"
+    
+    print("✓ Background writer test passed")
+
+def test_snapshot_view_is_point_in_time():
+    """Test a snapshot view taken before later changes still saves the earlier state"""
+    print("Testing snapshot views...")
+    
+    assistant = make_temp_assistant()
+    before = assistant.snapshot()
+    view = assistant.snapshot_view()
+    
+    # Changes made while a background write would be copying the view
+    assistant.update_user_preferences(1, "Mornings only")
+    assistant.update_meeting_effectiveness("A", 1)
+    assistant.schedule_meeting("Later", [1, 2], "2025-11-20T09:00:00Z", 30, "Planning")
+    
+    assert assistant.snapshot(view) == before, "The view should not see later changes"
+    after = assistant.snapshot()
+    assert after["users"][0]["preferences"] == "Mornings only"
+    assert len(after["users"][0]["meeting_history"]) == len(before["users"][0]["meeting_history"]) + 1
+    
+    print("✓ Snapshot view test passed")
+
+def test_upcoming_meetings_pagination():
+    """Test upcoming meetings come back sorted and paginated from the index"""
+    print("Testing upcoming meetings pagination...")
+    
+    from datetime import datetime, timedelta, timezone
+    
+    assistant = make_temp_assistant()
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    # Insert out of order; one meeting falls outside the window
+    for days in [3, 1, 2, 30]:
+        start = (now + timedelta(days=days)).isoformat().replace('+00:00', 'Z')
+        result = assistant.schedule_meeting(f"In {days} days", [1, 2], start, 30, "Sync")
+        assert result.get("success"), f"Scheduling should succeed: {result}"
+    
+    first_page = assistant.list_upcoming_meetings(user_id=1, days_ahead=7, limit=2)
+    assert first_page["total"] == 3, "Three meetings fall within the window"
+    titles = [m["title"] for m in first_page["upcoming_meetings"]]
+    assert titles == ["In 1 days", "In 2 days"], "Meetings should be sorted by start"
+    assert first_page["next_offset"] == 2, "Should point at the next page"
+    
+    second_page = assistant.list_upcoming_meetings(user_id=1, days_ahead=7, offset=2, limit=2)
+    assert [m["title"] for m in second_page["upcoming_meetings"]] == ["In 3 days"]
+    assert second_page["next_offset"] is None, "Last page has no next offset"
+    
+    assert assistant.list_upcoming_meetings(user_id=3)["total"] == 0, "User 3 has no upcoming meetings"
+    
+    print("✓ Upcoming meetings pagination test passed")
+
+def test_rolling_effectiveness_aggregates():
+    """Test running aggregates track scheduling and score updates"""
+    print("Testing rolling effectiveness aggregates...")
+    
+    assistant = make_temp_assistant()
+    
+    # Sample data: A(60, 8), B(30, 7), D(90, 6) for user 1
+    analysis = assistant.analyze_meeting_effectiveness(1)
+    assert analysis["total_meetings"] == 3
+    assert analysis["total_duration_minutes"] == 180
+    assert analysis["average_effectiveness_score"] == 7.0
+    
+    result = assistant.schedule_meeting("Follow-up", [1], "2025-10-20T10:00:00Z", 20, "Next steps")
+    assert result.get("success"), "Scheduling should succeed"
+    assistant.update_meeting_effectiveness(result["meeting_id"], 3)
+    assistant.update_meeting_effectiveness("A", 10)
+    
+    analysis = assistant.analyze_meeting_effectiveness(1)
+    assert analysis["total_meetings"] == 4
+    assert analysis["total_duration_minutes"] == 200
+    assert analysis["average_effectiveness_score"] == 6.5, "(10 + 7 + 6 + 3) / 4"
+    
+    # Date range only covers the first week of October
+    ranged = assistant.analyze_meeting_effectiveness(1, start_date="2025-10-01", end_date="2025-10-02")
+    assert ranged["total_meetings"] == 2, "Meetings A and D fall in range"
+    
+    # Breakdown is paginated in start-time order
+    page = assistant.analyze_meeting_effectiveness(limit=2)
+    assert [m["meeting_id"] for m in page["meeting_breakdown"]] == ["A", "D"]
+    assert page["next_offset"] == 2
+    
+    trend = assistant.get_effectiveness_trend(1, granularity="month")
+    assert trend["trend"] == [{
+        "period": "2025-10",
+        "total_meetings": 4,
+        "total_duration_minutes": 200,
+        "average_duration_minutes": 50.0,
+        "average_effectiveness_score": 6.5,
+        "scored_meetings": 4
+    }]
+    
+    print("✓ Rolling effectiveness aggregates test passed")
+
+def test_meeting_history_derived_from_index():
+    """Test meeting history keeps stored entries as meeting IDs, not copies"""
+    print("Testing derived meeting history...")
+    
+    assistant = make_temp_assistant()
+    
+    # Stored history entries backed by meeting records are not duplicated
+    assert assistant.users[2].meeting_history == ["A", "C"], "Matching entries should be kept as IDs"
+    history = assistant.get_meeting_history(2)
+    assert [entry["meeting_id"] for entry in history] == ["A", "C"]
+    assert history[0] == {"meeting_id": "A", "date": "2025-10-01", "duration": 60}
+    
+    # Membership and order are the stored ones, even where they disagree with participants
+    assert [entry["meeting_id"] for entry in assistant.get_meeting_history(1)] == ["A", "B"]
+    assert [entry["meeting_id"] for entry in assistant.get_meeting_history(3)] == ["D", "B"]
+    
+    result = assistant.schedule_meeting("Pairing", [2], "2025-11-05T09:00:00Z", 45, "Code review")
+    history = assistant.get_meeting_history(2)
+    assert history[-1] == {"meeting_id": result["meeting_id"], "date": "2025-11-05", "duration": 45}
+    
+    # The saved file still carries the full history
+    with open(assistant.data_file) as f:
+        saved = json.load(f)
+    saved_bob = next(u for u in saved["users"] if u["user_id"] == 2)
+    assert saved_bob["meeting_history"] == history, "Saved history should match the derived one"
+    
+    print("✓ Derived meeting history test passed")
+
+def test_recurring_meetings():
+    """Test recurring series are expanded lazily for queries and conflicts"""
+    print("Testing recurring meetings...")
+    
+    from datetime import datetime, timedelta, timezone
+    
+    assistant = make_temp_assistant()
+    monday = datetime.now(timezone.utc).replace(hour=9, minute=0, second=0, microsecond=0)
+    monday += timedelta(days=7 - monday.weekday())
+    
+    result = assistant.schedule_meeting(
+        "Standup", [1, 2], monday.isoformat().replace('+00:00', 'Z'), 15, "Daily sync",
+        recurrence={"freq": "weekly", "byweekday": [0, 2, 4], "exdates": [(monday + timedelta(days=2)).date().isoformat()]}
+    )
+    assert result.get("success"), f"Series should be scheduled: {result}"
+    series_id = result["meeting_id"]
+    assert series_id not in assistant.start_index.meeting_ids, "Series should not be stored per occurrence"
+    
+    # Friday occurrence shows up; the excluded Wednesday does not
+    friday = (monday + timedelta(days=4)).date().isoformat()
+    wednesday = (monday + timedelta(days=2)).date().isoformat()
+    assert [m["meeting_id"] for m in assistant.get_user_availability(1, friday)["existing_meetings"]] == [series_id]
+    assert assistant.get_user_availability(1, wednesday)["existing_meetings"] == []
+    
+    # A one-off meeting overlapping any occurrence is rejected
+    clash = (monday + timedelta(days=7, minutes=5)).isoformat().replace('+00:00', 'Z')
+    result = assistant.schedule_meeting("Clash", [2, 3], clash, 30, "Overlaps standup")
+    assert result.get("error") == "Scheduling conflicts detected"
+    assert result["conflicts"][0]["participant"] == 2
+    
+    upcoming = assistant.list_upcoming_meetings(user_id=1, days_ahead=21)
+    starts = [m["start_time"] for m in upcoming["upcoming_meetings"]]
+    assert starts == sorted(starts), "Occurrences should be merged in start order"
+    assert all(m.get("recurring") for m in upcoming["upcoming_meetings"])
+    assert upcoming["total"] >= 4, "Three weeks hold at least four occurrences"
+    
+    # Suggestions avoid occurrences too
+    suggestions = assistant.suggest_meeting_time([1], 60, (monday - timedelta(days=1)).date().isoformat())
+    for suggestion in suggestions["suggestions"]:
+        slot = parse_start_time(suggestion["suggested_time"]).timestamp()
+        assert not assistant.busy_intervals(1, slot, slot + 3600), "Suggestion overlaps a meeting"
+    
+    print("✓ Recurring meetings test passed")
+
+def test_batch_scheduling():
+    """Test batch scheduling places requests without conflicts"""
+    print("Testing batch scheduling...")
+    
+    assistant = make_temp_assistant()
+    day = "2025-11-03"
+    requests = [
+        # Greedy puts this first (more participants) at 09:00 ...
+        {"title": "Planning", "participants": [1, 2], "duration": 60,
+         "window_start": f"{day}T09:00:00Z", "window_end": f"{day}T11:00:00Z"},
+        # ... so this one only fits once the repair pass moves Planning
+        {"title": "1:1", "participants": [1], "duration": 60,
+         "window_start": f"{day}T09:00:00Z", "window_end": f"{day}T10:00:00Z"},
+        {"title": "Too long", "participants": [2], "duration": 180,
+         "window_start": f"{day}T09:00:00Z", "window_end": f"{day}T11:00:00Z"},
+        {"title": "Unknown", "participants": [999], "duration": 30,
+         "window_start": f"{day}T09:00:00Z", "window_end": f"{day}T11:00:00Z"},
+    ]
+    
+    plan = assistant.schedule_meetings_batch(requests, dry_run=True)
+    assert plan["scheduled_count"] == 2, f"Two requests should be placed: {plan}"
+    starts = {entry["title"]: entry["start_time"] for entry in plan["scheduled"]}
+    assert starts == {"Planning": f"{day}T10:00:00Z", "1:1": f"{day}T09:00:00Z"}
+    assert [entry["request"] for entry in plan["unplaceable"]] == [2, 3]
+    assert "meeting_id" not in plan["scheduled"][0], "Dry run should not create meetings"
+    
+    original_count = len(assistant.meetings)
+    result = assistant.schedule_meetings_batch(requests)
+    assert len(assistant.meetings) == original_count + 2, "Placed meetings should be created"
+    
+    # Running the same batch again finds the morning taken
+    again = assistant.schedule_meetings_batch(requests[:2], dry_run=True)
+    assert again["scheduled_count"] == 0, "Window is fully booked now"
+    
+    print("✓ Batch scheduling test passed")
+
+def test_benchmark_harness_smoke():
+    """Test the benchmark harness produces machine-readable results"""
+    print("Testing benchmark harness...")
+    
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+    import run_benchmarks
+    
+    args = run_benchmarks.parse_args(["--users", "50", "--iterations", "5", "--startup-repeats", "1"])
+    results = run_benchmarks.run(args)
+    
+    assert results["config"]["users"] == 50
+    assert results["startup"]["load_json"]["count"] == 1
+    assert results["memory"]["traced_current_bytes"] > 0
+    for tool in ["check_availability", "schedule_meeting", "get_meeting_suggestions",
+                 "list_upcoming_meetings", "analyze_meeting_effectiveness"]:
+        assert results["latency"][tool]["count"] == 5, f"{tool} should be measured"
+    json.dumps(results)
+    
+    print("✓ Benchmark harness test passed")
+
+def test_lazy_loading_and_binary_snapshot():
+    """Test records load lazily and come from the binary snapshot when fresh"""
+    print("Testing lazy loading and binary snapshot...")
+    
+    assistant = make_temp_assistant()
+    assert "users" not in assistant.__dict__, "Nothing should load at construction"
+    assert len(assistant.users) == 3, "Records load on first access"
+    assert "start_index" not in assistant.__dict__, "Indexes wait until first use"
+    assert assistant.snapshot_file.exists(), "Parsing JSON should leave a snapshot behind"
+    
+    # A new instance reads the snapshot instead of the JSON
+    reloaded = MeetingAssistant(str(assistant.data_file))
+    assert reloaded._read_binary_snapshot() is not None, "Snapshot should match the JSON"
+    assert reloaded.get_meeting_history(1) == assistant.get_meeting_history(1)
+    assert reloaded.meetings["A"].participants == (1, 2)
+    with open(assistant.snapshot_file) as f:
+        assert json.load(f)["version"] == SNAPSHOT_VERSION, "The snapshot is plain JSON, not pickle"
+    
+    # Saves refresh both files; external JSON edits invalidate the snapshot
+    reloaded.create_user("Dana", "UTC", "Mornings")
+    assert len(MeetingAssistant(str(assistant.data_file)).users) == 4
+    with open(assistant.data_file) as f:
+        data = json.load(f)
+    data["users"] = data["users"][:1]
+    with open(assistant.data_file, "w") as f:
+        json.dump(data, f)
+    assert len(MeetingAssistant(str(assistant.data_file)).users) == 1, "Stale snapshot should be ignored"
+    
+    print("✓ Lazy loading and binary snapshot test passed")
+
+def test_normalized_start_times():
+    """Test start times are normalized to UTC epochs once, at ingest"""
+    print("Testing normalized start times...")
+    
+    naive = Meeting("N", "Naive", [1], "2025-12-01T09:00:00", 30, "")
+    zulu = Meeting("Z", "Zulu", [1], "2025-12-01T09:00:00Z", 30, "")
+    offset = Meeting("O", "Offset", [1], "2025-12-01T11:00:00+02:00", 30, "")
+    assert naive.start_epoch == zulu.start_epoch == offset.start_epoch, "Equivalent instants should share an epoch"
+    assert offset.end_epoch == offset.start_epoch + 1800
+    assert parse_start_time("2025-12-01T09:00:00Z") is parse_start_time("2025-12-01T09:00:00Z"), "Parsing should be memoized"
+    
+    # The derived epoch stays out of the JSON file but survives the binary snapshot
+    assistant = make_temp_assistant()
+    assistant.schedule_meeting("Offset sync", [1, 2], "2025-12-03T16:00:00+02:00", 30, "Sync")
+    with open(assistant.data_file) as f:
+        assert all("start_epoch" not in m for m in json.load(f)["meetings"]), "JSON should hold source strings only"
+    reloaded = MeetingAssistant(str(assistant.data_file))
+    assert reloaded._read_binary_snapshot() is not None
+    epochs = {m.meeting_id: m.start_epoch for m in reloaded.meetings.values()}
+    assert epochs == {m.meeting_id: m.start_epoch for m in assistant.meetings.values()}
+    
+    # Conflicts compare instants, not wall-clock strings
+    result = assistant.schedule_meeting("Overlap", [2], "2025-12-03T14:15:00Z", 30, "")
+    assert result.get("error") == "Scheduling conflicts detected", "14:15Z overlaps 16:00+02:00"
+    assert result["conflicts"][0]["conflict_time"] == "2025-12-03T16:00:00+02:00"
+    availability = assistant.get_user_availability(1, "2025-12-03")
+    assert any(c["title"] == "Offset sync" for c in availability["existing_meetings"]), "Bucketed by UTC day"
+    
+    print("✓ Normalized start times test passed")
+
+def test_tool_metrics():
+    """Test per-tool instrumentation of sync and async tools"""
+    print("Testing tool metrics...")
+    
+    metrics = ToolMetrics()
+    
+    @metrics.instrument
+    async def lookup(user_id: int):
+        if user_id < 0:
+            raise ValueError("negative")
+        return {"error": "not found"} if user_id == 0 else {"user_id": user_id}
+    
+    @metrics.instrument
+    def echo(text: str):
+        return {"text": text}
+    
+    assert lookup.__name__ == "lookup" and asyncio.iscoroutinefunction(lookup), "Wrapper should keep the tool's shape"
+    for user_id in (1, 2, 0):
+        asyncio.run(lookup(user_id))
+    try:
+        asyncio.run(lookup(-1))
+        assert False, "Exceptions should propagate"
+    except ValueError:
+        pass
+    echo("hello")
+    metrics.count_cache("snapshot", True)
+    metrics.count_cache("snapshot", False)
+    
+    report = metrics.report()
+    assert report["tools"]["lookup"]["calls"] == 4
+    assert report["tools"]["lookup"]["errors"] == 1
+    assert report["tools"]["lookup"]["error_responses"] == 1
+    assert report["tools"]["echo"]["payload_bytes"]["max"] == len('{"text": "hello"}')
+    latency = report["tools"]["lookup"]["latency_ms"]
+    assert latency["p50"] <= latency["p99"] <= latency["max"]
+    assert report["caches"]["snapshot"]["hit_rate"] == 0.5
+    
+    text = metrics.prometheus_text()
+    assert 'mcp_tool_calls_total{tool="lookup"} 4' in text
+    assert 'mcp_tool_latency_seconds_bucket{tool="lookup",le="+Inf"} 4' in text
+    assert 'mcp_cache_misses_total{cache="snapshot"} 1' in text
+    
+    dump = Path(tempfile.mkdtemp()) / "metrics.prom"
+    metrics.dump_prometheus(dump)
+    assert dump.read_text() == text
+    
+    print("✓ Tool metrics test passed")
+
+def test_sampled_profiling():
+    """Test sampled tool profiling writes rotating pstats files and reports hotspots"""
+    print("Testing sampled profiling...")
+    
+    profiler = ToolProfiler(tempfile.mkdtemp(), max_files=3)
+    metrics = ToolMetrics(profiler=profiler)
+    
+    def busy_helper():
+        return sum(i * i for i in range(2000))
+    
+    @metrics.instrument
+    async def crunch():
+        return {"total": busy_helper()}
+    
+    @metrics.instrument
+    def skipped():
+        return busy_helper()
+    
+    asyncio.run(crunch())
+    assert profiler.profile_files() == [], "Profiling is off by default"
+    
+    profiler.configure(1.0, ["crunch"])
+    for _ in range(5):
+        asyncio.run(crunch())
+    skipped()
+    assert len(profiler.profile_files()) == 3, "Only the newest profiles are kept"
+    assert profiler.profile_files("skipped") == [], "Tool filter should apply"
+    
+    hotspots = profiler.hotspots(limit=10, sort="cumulative")
+    assert hotspots["profiles"] == 3
+    names = [entry["function"] for entry in hotspots["functions"]]
+    assert "busy_helper" in names, "Helper should appear among hot functions"
+    assert metrics.report()["tools"]["crunch"]["calls"] == 6, "Profiled calls are still measured"
+    
+    try:
+        profiler.configure(1.5)
+        assert False, "Out-of-range sample rates should be rejected"
+    except ValueError:
+        pass
+    
+    print("✓ Sampled profiling test passed")
+
+def test_paged_responses_and_projection():
+    """Test bounded pages and field projection on list-returning calls"""
+    print("Testing paged responses and field projection...")
+    
+    assistant = make_temp_assistant()
+    full_history = assistant.get_meeting_history(1)
+    
+    # Walk the profile history page by page
+    pages, offset = [], 0
+    while offset is not None:
+        profile = assistant.get_user_profile(1, offset=offset, limit=1)
+        assert len(profile["meeting_history"]) <= 1, "Page size should be bounded by limit"
+        pages.extend(profile["meeting_history"])
+        offset = profile["next_offset"]
+    assert pages == full_history, "Pages should cover the whole history in order"
+    assert profile["total"] == len(full_history)
+    
+    profile = assistant.get_user_profile(1, fields=["meeting_id"])
+    assert all(set(entry) == {"meeting_id"} for entry in profile["meeting_history"])
+    assert "error" in assistant.get_user_profile(1, fields=["agenda"]), "Unknown fields are rejected"
+    assert "error" in assistant.get_user_profile(1, limit=0)
+    assert "error" in assistant.get_user_profile(99)
+    
+    analysis = assistant.analyze_meeting_effectiveness(limit=2, fields=["meeting_id", "effectiveness_score"])
+    assert len(analysis["meeting_breakdown"]) == 2
+    assert all(set(entry) == {"meeting_id", "effectiveness_score"} for entry in analysis["meeting_breakdown"])
+    assert analysis["total"] == len(assistant.meetings)
+    
+    upcoming = assistant.list_upcoming_meetings(days_ahead=3650, fields=["meeting_id", "start_time"])
+    assert all(set(entry) <= {"meeting_id", "start_time"} for entry in upcoming["upcoming_meetings"])
+    
+    # Every paged tool names its paging keys the same way
+    for page in (profile, analysis, upcoming):
+        assert {"total", "offset", "next_offset"} <= set(page)
+    
+    print("✓ Paged responses and field projection test passed")
+
+def test_single_flight_result_cache():
+    """Test coalescing of identical concurrent calls and invalidation on changes"""
+    print("Testing single-flight result cache...")
+    
+    assistant = make_temp_assistant()
+    cache = AsyncSingleFlightCache("suggestions", lambda: assistant.data_version)
+    computed = []
+    
+    async def suggest():
+        computed.append(1)
+        await asyncio.sleep(0.01)
+        return assistant.suggest_meeting_time([1, 2], 30, "2030-01-07T00:00:00Z")
+    
+    async def scenario():
+        results = await asyncio.gather(*(cache.run(("1,2", 30), suggest) for _ in range(5)))
+        assert len(computed) == 1, "Concurrent identical calls should share one computation"
+        assert all(result is results[0] for result in results)
+        
+        await cache.run(("1,2", 30), suggest)
+        assert len(computed) == 1, "Results should be cached for the TTL"
+        
+        first = results[0]["suggestions"][0]["suggested_time"]
+        assistant.schedule_meeting("Blocker", [1], first, 60, "Hold")
+        fresh = await cache.run(("1,2", 30), suggest)
+        assert len(computed) == 2, "Scheduling should invalidate cached suggestions"
+        assert fresh["suggestions"][0]["suggested_time"] != first
+        
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+        
+        outcomes = await asyncio.gather(*(cache.run("failing", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(outcome, ValueError) for outcome in outcomes), "Errors should reach every waiter"
+    
+    asyncio.run(scenario())
+    
+    # Through the tool: computed off the event loop, shared across participant orderings
+    tool_assistant = make_temp_assistant()
+    tool_calls = []
+    suggest_meeting_time = tool_assistant.suggest_meeting_time
+    
+    def counting_suggest(*args):
+        tool_calls.append(args)
+        return suggest_meeting_time(*args)
+    
+    tool_assistant.suggest_meeting_time = counting_suggest
+    original, server.meeting_assistant = server.meeting_assistant, tool_assistant
+    try:
+        tool = getattr(server.get_meeting_suggestions, "fn", server.get_meeting_suggestions)
+        
+        async def tool_scenario():
+            return await asyncio.gather(*(tool(participants, 30, "2030-01-07T00:00:00Z")
+                                          for participants in ([1, 2], [2, 1], [1, 2, 2])))
+        
+        results = asyncio.run(tool_scenario())
+    finally:
+        server.meeting_assistant = original
+    assert tool_calls == [([1, 2], 30, "2030-01-07T00:00:00Z")], "Reordered participants should share one computation"
+    assert all(result is results[0] for result in results)
+    print("✓ Single-flight result cache test passed")
+
+def test_hot_reload_of_data_file():
+    """Test external edits of the data file are applied incrementally"""
+    print("Testing hot reload of the data file...")
+    
+    assistant = make_temp_assistant()
+    assert assistant.reload_changed() is None, "An unchanged file should not be reloaded"
+    assistant.analyze_meeting_effectiveness(1)
+    assistant.get_effectiveness_trend(1, granularity="month")
+    unchanged = assistant.meetings["B"]
+    version = assistant.data_version
+    feed_version = assistant.get_changes_since(0)["version"]
+    
+    with open(assistant.data_file) as f:
+        data = json.load(f)
+    meetings = {m["meeting_id"]: m for m in data["meetings"]}
+    meetings["A"]["effectiveness_score"] = 2
+    meetings["D"]["participants"] = [2]
+    data["meetings"] = [m for m in data["meetings"] if m["meeting_id"] != "C"]
+    for user in data["users"]:
+        user["meeting_history"] = [h for h in user["meeting_history"] if h["meeting_id"] not in ("C", "D")]
+    users = {u["user_id"]: u for u in data["users"]}
+    users[1]["meeting_history"].append({"meeting_id": "E", "date": "2025-10-09", "duration": 30})
+    users[2]["meeting_history"].append({"meeting_id": "D", "date": "2025-10-02", "duration": 90})
+    data["meetings"].append({"meeting_id": "E", "title": "Retro", "participants": [1],
+                             "start_time": "2025-10-09T15:00:00Z", "duration": 30,
+                             "agenda": "Lessons learned", "effectiveness_score": 9})
+    data["users"].append({"user_id": 9, "name": "Ivy", "timezone": "UTC",
+                          "preferences": "", "meeting_history": []})
+    with open(assistant.data_file, "w") as f:
+        json.dump(data, f)
+    
+    counts = assistant.reload_changed()
+    assert counts == {"users_added": 1, "users_updated": 3, "users_removed": 0,
+                      "meetings_added": 1, "meetings_updated": 2, "meetings_removed": 1}
+    assert assistant.meetings["B"] is unchanged, "Unchanged records should be kept as they are"
+    assert assistant.data_version > version, "Cached results should be invalidated"
+    assert assistant.reload_changed() is None, "Applied edits should not be reloaded twice"
+    removed = [c for c in assistant.get_changes_since(feed_version)["changes"] if c["id"] == "C"]
+    assert [c["action"] for c in removed] == [ACTION_DELETED], "Both servers name deletions alike"
+    
+    # User 1 now has A(60, 2), B(30, 7), E(30, 9); D moved to user 2 only
+    analysis = assistant.analyze_meeting_effectiveness(1)
+    assert analysis["total_meetings"] == 3
+    assert analysis["total_duration_minutes"] == 120
+    assert analysis["average_effectiveness_score"] == 6.0
+    assert [entry["meeting_id"] for entry in assistant.get_meeting_history(1)] == ["A", "B", "E"]
+    assert [entry["meeting_id"] for entry in assistant.get_meeting_history(2)] == ["A", "D"]
+    trend = assistant.get_effectiveness_trend(1, granularity="month")
+    assert trend["trend"][0]["total_meetings"] == 3
+    
+    # Indexes match a cold load of the edited file
+    fresh = MeetingAssistant(str(assistant.data_file))
+    for user_id in (1, 2, 3, 9):
+        assert assistant.analyze_meeting_effectiveness(user_id) == fresh.analyze_meeting_effectiveness(user_id)
+    
+    # Our own saves are not mistaken for external edits
+    first_id = assistant.schedule_meeting("Sync", [9], "2025-11-03T10:00:00Z", 15, "Status")["meeting_id"]
+    assert assistant.reload_changed() is None
+    
+    # Generated IDs are not reused after meetings are removed outside the server
+    with open(assistant.data_file) as f:
+        data = json.load(f)
+    data["meetings"] = [m for m in data["meetings"] if m["meeting_id"] != "A"]
+    with open(assistant.data_file, "w") as f:
+        json.dump(data, f)
+    assert assistant.reload_changed()["meetings_removed"] == 1
+    second_id = assistant.schedule_meeting("Demo", [9], "2025-11-04T10:00:00Z", 15, "Show")["meeting_id"]
+    assert second_id != first_id
+    assert assistant.meetings[first_id].title == "Sync"
+    assert len(assistant.start_index.meeting_ids) == len(set(assistant.start_index.meeting_ids))
+    
+    print("✓ Hot reload test passed")
+
+def test_free_busy_cache():
+    """Test per-(user, day) free/busy entries and their targeted invalidation"""
+    print("Testing free/busy cache...")
+    
+    assistant = make_temp_assistant()
+    monday, tuesday = "2030-01-07", "2030-01-08"
+    first = assistant.get_user_availability(1, monday)
+    assert first["existing_meetings"] == []
+    assistant.get_user_availability(1, tuesday)
+    assistant.get_user_availability(2, monday)
+    assert len(assistant.free_busy) == 3
+    assert assistant.get_user_availability(1, monday) == first, "Repeated checks should match"
+    
+    # Only the participants' overlapping days are dropped
+    assistant.schedule_meeting("Standup", [1], "2030-01-07T09:00:00Z", 30, "Daily sync")
+    assert len(assistant.free_busy) == 2, "User 1's Monday should be invalidated"
+    meetings = assistant.get_user_availability(1, monday)["existing_meetings"]
+    assert [m["title"] for m in meetings] == ["Standup"]
+    assert not assistant.is_free(1, parse_start_time("2030-01-07T09:15:00Z").timestamp(),
+                                 parse_start_time("2030-01-07T10:00:00Z").timestamp())
+    assert assistant.is_free(1, parse_start_time("2030-01-07T09:30:00Z").timestamp(),
+                             parse_start_time("2030-01-07T10:00:00Z").timestamp())
+    
+    # Suggestions read the same entries
+    suggestions = assistant.suggest_meeting_time([1, 2], 60, "2030-01-06T00:00:00Z")["suggestions"]
+    assert suggestions[0]["suggested_time"] == "2030-01-07T10:00:00Z", "09:00 is taken by the standup"
+    
+    # A recurring series drops every cached day of its participants
+    assistant.schedule_meeting("Weekly", [2], "2030-01-08T16:00:00Z", 30, "Review", {"freq": "weekly"})
+    assert all(user_id != 2 for user_id, _ in assistant.free_busy.entries)
+    assert [m["title"] for m in assistant.get_user_availability(2, "2030-01-15")["existing_meetings"]] == ["Weekly"]
+    
+    # The cache is bounded, evicting the least recently used day
+    cache = FreeBusyCache(max_entries=2)
+    for day in range(3):
+        cache.put(1, day * 86400.0, assistant.day_free_busy(1, day * 86400.0))
+    assert len(cache) == 2 and cache.get(1, 0.0) is None
+    cache.invalidate(1)
+    assert len(cache) == 0 and not cache.user_days
+    
+    print("✓ Free/busy cache test passed")
+
+def test_change_feed():
+    """Test clients can sync changes since a version instead of full lists"""
+    print("Testing change feed...")
+    
+    assistant = make_temp_assistant()
+    start = assistant.get_changes_since(0)
+    assert start["resync"] and start["changes"] == [], "Unknown versions should resync"
+    version = start["version"]
+    assert assistant.get_changes_since(version) == {"version": version, "resync": False,
+                                                    "changes": [], "has_more": False}
+    
+    user_id = assistant.create_user("Dana", "UTC", "Mornings")["user_id"]
+    meeting_id = assistant.schedule_meeting("Intro", [1, user_id], "2030-01-07T09:00:00Z", 30, "Hello")["meeting_id"]
+    assistant.update_meeting_effectiveness(meeting_id, 9)
+    assistant.update_meeting_effectiveness("A", 5)
+    
+    feed = assistant.get_changes_since(version)
+    assert [(c["type"], c["id"], c["action"]) for c in feed["changes"]] == [
+        ("user", user_id, "created"), ("meeting", meeting_id, "updated"), ("meeting", "A", "updated")
+    ], "Each record should appear once, at its latest change"
+    assert feed["changes"][1]["meeting"]["effectiveness_score"] == 9
+    assert feed["changes"][0]["user"]["name"] == "Dana"
+    assert assistant.get_changes_since(feed["version"])["changes"] == []
+    
+    # Paging continues from the last returned change
+    page = assistant.get_changes_since(version, limit=2)
+    assert page["has_more"] and len(page["changes"]) == 2
+    rest = assistant.get_changes_since(page["version"], limit=2)
+    assert [c["id"] for c in rest["changes"]] == ["A"] and not rest["has_more"]
+    
+    # Full reloads and overflowing the log force a resync
+    assistant.load_data()
+    assert assistant.get_changes_since(feed["version"])["resync"]
+    log = ChangeLog(max_entries=2)
+    before = log.version
+    for meeting in ("X", "Y", "Z"):
+        log.record(("meeting", meeting), "created")
+    assert log.since(before) is None
+    assert [entry[1] for entry in log.since(before + 1)] == [("meeting", "Y"), ("meeting", "Z")]
+    
+    print("✓ Change feed test passed")
+
+def test_trend_before_index_build():
+    """Test window aggregates built before the indexes are not counted twice"""
+    print("Testing trend before index build...")
+    
+    assistant = make_temp_assistant()
+    before = assistant.get_effectiveness_trend(granularity="month")["trend"]
+    assert before[0]["total_meetings"] == 4
+    
+    # Builds the indexes after window_stats already exists
+    assistant.list_upcoming_meetings(days_ahead=1)
+    after = assistant.get_effectiveness_trend(granularity="month")["trend"]
+    assert after == before, "Bulk indexing should not re-add meetings to the windows"
+    
+    print("✓ Trend before index build test passed")
+
 def run_all_tests():
     """Run all tests"""
     print("Running Smart Meeting Assistant Tests")
@@ -120,6 +803,24 @@ def run_all_tests():
         test_meeting_suggestions()
         test_meeting_analysis()
         test_new_user_creation()
+        test_background_writer_coalesces_saves()
+        test_snapshot_view_is_point_in_time()
+        test_upcoming_meetings_pagination()
+        test_rolling_effectiveness_aggregates()
+        test_meeting_history_derived_from_index()
+        test_recurring_meetings()
+        test_batch_scheduling()
+        test_benchmark_harness_smoke()
+        test_lazy_loading_and_binary_snapshot()
+        test_normalized_start_times()
+        test_tool_metrics()
+        test_sampled_profiling()
+        test_paged_responses_and_projection()
+        test_single_flight_result_cache()
+        test_hot_reload_of_data_file()
+        test_free_busy_cache()
+        test_change_feed()
+        test_trend_before_index_build()
         
         print("\n" + "="*40)
         print("🎉 All tests passed!")